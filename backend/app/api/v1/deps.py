@@ -7,11 +7,11 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from jose import jwt, JWTError
 import httpx
 
-from app.db.database import get_session
+from app.db.database import async_session_maker, get_read_session
+from app.db.repository import get_user_by_clerk_id
 from app.db.models import User
 from app.core.config import settings
 from app.core.logging import get_logger
@@ -48,12 +48,41 @@ async def verify_clerk_token(token: str) -> dict:
         )
 
 
+async def _create_user_from_token(clerk_id: str, token_data: dict) -> User:
+    """
+    Create the user for a first-seen Clerk subject on the primary.
+
+    Looks again first: the read session may be on a replica that hasn't
+    received a user created moments ago.
+    """
+    async with async_session_maker() as session:
+        user = await get_user_by_clerk_id(session, clerk_id)
+        if user:
+            return user
+        # Auto-create user from token data (for demo)
+        user = User(
+            clerk_id=clerk_id,
+            email=token_data.get("email", f"{clerk_id}@temp.veriassets.io"),
+            username=token_data.get("username"),
+            full_name=token_data.get("name"),
+            avatar_url=token_data.get("picture"),
+        )
+        session.add(user)
+        await session.commit()
+        logger.info(f"Auto-created user for Clerk ID: {clerk_id}")
+        return user
+
+
 async def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ) -> User:
     """
     Get the current authenticated user from the JWT token.
+
+    Looked up through a read-only session, so authenticating doesn't open
+    a committing transaction. Handlers that change the user load it into
+    their own session first.
     """
     if not credentials:
         raise HTTPException(
@@ -73,30 +102,17 @@ async def get_current_user(
         )
     
     # Get user from database
-    result = await session.execute(
-        select(User).where(User.clerk_id == clerk_id)
-    )
-    user = result.scalar_one_or_none()
+    user = await get_user_by_clerk_id(session, clerk_id)
     
     if not user:
-        # Auto-create user from token data (for demo)
-        user = User(
-            clerk_id=clerk_id,
-            email=token_data.get("email", f"{clerk_id}@temp.veriassets.io"),
-            username=token_data.get("username"),
-            full_name=token_data.get("name"),
-            avatar_url=token_data.get("picture"),
-        )
-        session.add(user)
-        await session.flush()
-        logger.info(f"Auto-created user for Clerk ID: {clerk_id}")
+        user = await _create_user_from_token(clerk_id, token_data)
     
     return user
 
 
 async def get_optional_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ) -> Optional[User]:
     """
     Get the current user if authenticated, otherwise None.
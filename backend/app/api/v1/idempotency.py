@@ -0,0 +1,230 @@
+"""
+Idempotency Keys
+Replays the stored response when a client retries a write with the same Idempotency-Key
+"""
+
+from datetime import datetime, timedelta
+from typing import AsyncGenerator, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import time
+
+from fastapi import Header, HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.database import async_session_maker
+from app.db.models import IdempotencyKey, User
+
+logger = get_logger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# How often a duplicate re-checks a key held by another process
+_POLL_SECONDS = 0.1
+
+# Keys held by requests in this process; local duplicates wait on the event
+_inflight: Dict[Tuple[str, str], asyncio.Event] = {}
+
+_KEY_LOOKUP = select(IdempotencyKey).where(
+    IdempotencyKey.user_id == bindparam("user_id"),
+    IdempotencyKey.key == bindparam("key"),
+)
+
+
+def request_hash(method: str, path: str, body: Optional[BaseModel] = None) -> str:
+    """Fingerprint of a request, so a key can't be replayed for a different one."""
+    payload = body.model_dump_json() if body is not None else ""
+    return hashlib.sha256(f"{method} {path}\n{payload}".encode()).hexdigest()
+
+
+class Idempotency:
+    """
+    Idempotency-Key handling for one request.
+
+    begin() either claims the key for this request or returns the stored
+    response to replay, waiting for a duplicate that is still in flight;
+    store() writes the handler's response in the handler's own transaction,
+    so the response is saved if and only if the write it describes commits.
+    A claimed key whose request fails before committing is released, so
+    the client can retry. Keys are scoped to the user, and without the
+    header every call is a no-op.
+    """
+
+    def __init__(self, request: Request, key: Optional[str]):
+        self.request = request
+        self.key = key
+        self.session_maker = async_session_maker
+        self._claimed: Optional[Tuple[str, str]] = None
+
+    async def begin(self, user: User, body: Optional[BaseModel] = None) -> Optional[JSONResponse]:
+        """Claim the key, or return the response to replay for it."""
+        if not self.key:
+            return None
+        fingerprint = request_hash(self.request.method, self.request.url.path, body)
+        deadline = time.monotonic() + settings.idempotency_wait_seconds
+
+        while True:
+            async with self.session_maker() as session:
+                record = (await session.execute(
+                    _KEY_LOOKUP, {"user_id": user.id, "key": self.key}
+                )).scalar_one_or_none()
+                now = datetime.utcnow()
+                if record is None or self._reclaimable(record, now):
+                    if await self._claim(session, user.id, fingerprint, record, now):
+                        return None
+                    continue  # another request got there first
+
+            if record.request_hash != fingerprint:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"{IDEMPOTENCY_HEADER} was already used for a different request"
+                )
+            if record.status_code is not None:
+                return JSONResponse(
+                    status_code=record.status_code,
+                    content=record.response_body,
+                    headers={REPLAYED_HEADER: "true"},
+                )
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"A request with this {IDEMPOTENCY_HEADER} is still in progress"
+                )
+            await self._wait((user.id, self.key), remaining)
+
+    async def store(
+        self,
+        session: AsyncSession,
+        response: BaseModel,
+        status_code: int = status.HTTP_200_OK,
+    ) -> BaseModel:
+        """
+        Save the response for replays in the caller's transaction and hand it back.
+
+        The caller commits, before returning: the key is then settled by
+        the same commit as the write, and released if that rolls back.
+        """
+        if self._claimed is None:
+            return response
+        user_id, key = self._claimed
+        await session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+            .values(
+                status_code=status_code,
+                response_body=jsonable_encoder(response),
+                expires_at=datetime.utcnow() + timedelta(seconds=settings.idempotency_key_ttl_seconds),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return response
+
+    async def release(self) -> None:
+        """Give up a claimed key unless its response was committed, and wake local duplicates."""
+        if self._claimed is None:
+            return
+        user_id, key = self._claimed
+        try:
+            async with self.session_maker() as session:
+                await session.execute(
+                    delete(IdempotencyKey).where(
+                        IdempotencyKey.user_id == user_id,
+                        IdempotencyKey.key == key,
+                        IdempotencyKey.status_code.is_(None),
+                    )
+                )
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"Failed to release {IDEMPOTENCY_HEADER} {key}: {e}")
+        self._finish()
+
+    def _reclaimable(self, record: IdempotencyKey, now: datetime) -> bool:
+        if record.expires_at <= now:
+            return True
+        # The request holding it died without storing or releasing
+        return (
+            record.status_code is None
+            and record.created_at <= now - timedelta(seconds=settings.idempotency_lock_seconds)
+        )
+
+    async def _claim(self, session, user_id: str, fingerprint: str, record, now: datetime) -> bool:
+        values = {
+            "request_hash": fingerprint,
+            "status_code": None,
+            "response_body": None,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=settings.idempotency_key_ttl_seconds),
+        }
+        if record is None:
+            result = await session.execute(
+                insert(IdempotencyKey)
+                .values(user_id=user_id, key=self.key, **values)
+                .on_conflict_do_nothing()
+            )
+        else:
+            # Only succeeds if nobody reclaimed it since we looked
+            result = await session.execute(
+                update(IdempotencyKey)
+                .where(
+                    IdempotencyKey.user_id == user_id,
+                    IdempotencyKey.key == self.key,
+                    IdempotencyKey.created_at == record.created_at,
+                )
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+        await session.commit()
+        if result.rowcount != 1:
+            return False
+        self._claimed = (user_id, self.key)
+        _inflight[self._claimed] = asyncio.Event()
+        return True
+
+    async def _wait(self, ident: Tuple[str, str], timeout: float) -> None:
+        event = _inflight.get(ident)
+        if event is None:
+            await asyncio.sleep(min(_POLL_SECONDS, timeout))
+            return
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _finish(self) -> None:
+        event = _inflight.pop(self._claimed, None)
+        if event is not None:
+            event.set()
+        self._claimed = None
+
+
+async def get_idempotency(
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER, max_length=255),
+) -> AsyncGenerator[Idempotency, None]:
+    """Dependency for write endpoints that honour the Idempotency-Key header."""
+    idempotency = Idempotency(request, idempotency_key)
+    try:
+        yield idempotency
+    finally:
+        await idempotency.release()
+
+
+async def purge_expired_idempotency_keys() -> None:
+    """Delete stored responses past their TTL."""
+    async with async_session_maker() as session:
+        result = await session.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.expires_at < datetime.utcnow())
+        )
+        await session.commit()
+    if result.rowcount:
+        logger.info(f"Purged {result.rowcount} expired idempotency keys")
@@ -3,15 +3,19 @@ Nostromo Launchpad API Routes
 Endpoints for proposals, voting, and Dutch Auction IPO
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+import asyncio
 import math
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
-from app.db.database import get_session
+from app.db.database import get_session, get_read_session
+from app.db.repository import add_votes, get_asset_by_id, get_proposal_by_id
+from app.db.counting import count_rows
+from app.db.pagination import CursorError, paginate_keyset
 from app.db.models import (
     NostromoProposal, RWAAsset, User,
     ProposalStatus, VerificationStatus
@@ -32,8 +36,10 @@ from app.services.qubic_rpc import QubicRPCClient
 from app.services.nostromo import NostromoService, get_nostromo_service
 from app.services.easyconnect import EasyConnectService, get_easyconnect_service
 from app.api.v1.deps import get_current_user
+from app.api.v1.idempotency import Idempotency, get_idempotency
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.snapshot import Snapshot, invalidate_on_commit
 
 logger = get_logger(__name__)
 
@@ -54,10 +60,7 @@ async def create_proposal(
     Proposals require community voting before proceeding to IPO.
     """
     # Get asset
-    result = await session.execute(
-        select(RWAAsset).where(RWAAsset.id == proposal_data.asset_id)
-    )
-    asset = result.scalar_one_or_none()
+    asset = await get_asset_by_id(session, proposal_data.asset_id)
     
     if not asset:
         raise HTTPException(
@@ -109,6 +112,7 @@ async def create_proposal(
     
     session.add(proposal)
     await session.flush()
+    invalidate_on_commit(session, launchpad_stats)
     
     # Register with Nostromo service
     try:
@@ -129,13 +133,15 @@ async def create_proposal(
 
 @router.get("/proposals", response_model=ProposalListResponse)
 async def list_proposals(
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     status_filter: Optional[ProposalStatus] = Query(None, alias="status"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page"),
+    with_total: bool = Query(True, description="Include the total count"),
 ):
     """
-    List all Nostromo proposals.
+    List all Nostromo proposals, newest first.
     """
     query = select(NostromoProposal)
     
@@ -143,37 +149,49 @@ async def list_proposals(
         query = query.where(NostromoProposal.status == status_filter)
     
     # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await session.execute(count_query)).scalar() or 0
+    total = total_strategy = None
+    if with_total:
+        counted = await count_rows(session, query, NostromoProposal, {"status": status_filter})
+        total, total_strategy = counted.total, counted.strategy.value
     
     # Apply pagination
-    query = query.order_by(NostromoProposal.created_at.desc())
-    offset = (page - 1) * page_size
-    query = query.offset(offset).limit(page_size)
-    
-    result = await session.execute(query)
-    proposals = result.scalars().all()
+    try:
+        result = await paginate_keyset(
+            session,
+            query,
+            sort_column=NostromoProposal.created_at,
+            id_column=NostromoProposal.id,
+            sort_order="desc",
+            page_size=page_size,
+            cursor=cursor,
+            offset=(page - 1) * page_size,
+        )
+    except CursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     return ProposalListResponse(
-        items=[ProposalResponse.model_validate(p) for p in proposals],
+        items=[ProposalResponse.model_validate(p) for p in result.items],
         total=total,
+        total_strategy=total_strategy,
         page=page,
         page_size=page_size,
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor,
     )
 
 
 @router.get("/proposals/{proposal_id}", response_model=ProposalResponse)
 async def get_proposal(
     proposal_id: str,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
     Get details of a specific proposal.
     """
-    result = await session.execute(
-        select(NostromoProposal).where(NostromoProposal.id == proposal_id)
-    )
-    proposal = result.scalar_one_or_none()
+    proposal = await get_proposal_by_id(session, proposal_id)
     
     if not proposal:
         raise HTTPException(
@@ -198,10 +216,7 @@ async def vote_on_proposal(
     
     Voting power is determined by VERI token holdings.
     """
-    result = await session.execute(
-        select(NostromoProposal).where(NostromoProposal.id == proposal_id)
-    )
-    proposal = result.scalar_one_or_none()
+    proposal = await get_proposal_by_id(session, proposal_id)
     
     if not proposal:
         raise HTTPException(
@@ -234,11 +249,15 @@ async def vote_on_proposal(
                 voting_power=voting_power,
             )
             
-            # Update proposal counts
-            if vote_data.vote_for:
-                proposal.votes_for += voting_power
-            else:
-                proposal.votes_against += voting_power
+            # Update proposal counts in place; re-checks the voting window atomically
+            totals = await add_votes(session, proposal.id, vote_data.vote_for, voting_power)
+            if totals is None:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Voting closed while the vote was being submitted"
+                )
+            votes_for, votes_against = totals
+            invalidate_on_commit(session, launchpad_stats)
             
             logger.info(
                 f"Vote recorded: {proposal_id} - "
@@ -250,11 +269,13 @@ async def vote_on_proposal(
                 proposal_id=proposal.id,
                 voted_for=vote_data.vote_for,
                 voting_power=voting_power,
-                current_votes_for=proposal.votes_for,
-                current_votes_against=proposal.votes_against,
+                current_votes_for=votes_for,
+                current_votes_against=votes_against,
                 message="Vote recorded successfully",
             )
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Vote submission failed: {e}")
         raise HTTPException(
@@ -276,10 +297,7 @@ async def start_dutch_auction_ipo(
     
     The price decreases over time from start_price to reserve_price.
     """
-    result = await session.execute(
-        select(NostromoProposal).where(NostromoProposal.id == proposal_id)
-    )
-    proposal = result.scalar_one_or_none()
+    proposal = await get_proposal_by_id(session, proposal_id)
     
     if not proposal:
         raise HTTPException(
@@ -288,10 +306,7 @@ async def start_dutch_auction_ipo(
         )
     
     # Get asset to check ownership
-    result = await session.execute(
-        select(RWAAsset).where(RWAAsset.id == proposal.asset_id)
-    )
-    asset = result.scalar_one_or_none()
+    asset = await get_asset_by_id(session, proposal.asset_id)
     
     if not asset or asset.creator_id != current_user.id:
         raise HTTPException(
@@ -317,6 +332,7 @@ async def start_dutch_auction_ipo(
             
             # Update proposal status
             proposal.status = ProposalStatus.IPO_ACTIVE
+            invalidate_on_commit(session, launchpad_stats)
             proposal.ipo_start_time = datetime.utcnow()
             proposal.ipo_end_time = datetime.utcnow() + timedelta(hours=24)  # 24h auction
             
@@ -360,41 +376,13 @@ async def start_dutch_auction_ipo(
         )
 
 
-@router.get("/ipo/{proposal_id}", response_model=DutchAuctionIPO)
-async def get_ipo_status(
-    proposal_id: str,
-    session: AsyncSession = Depends(get_session),
-):
-    """
-    Get current Dutch Auction IPO status and price.
-    """
-    result = await session.execute(
-        select(NostromoProposal).where(NostromoProposal.id == proposal_id)
-    )
-    proposal = result.scalar_one_or_none()
-    
-    if not proposal:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Proposal not found"
-        )
-    
-    if proposal.status not in [ProposalStatus.IPO_ACTIVE, ProposalStatus.IPO_COMPLETED]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="No IPO found for this proposal"
-        )
-    
-    # Get asset
-    result = await session.execute(
-        select(RWAAsset).where(RWAAsset.id == proposal.asset_id)
-    )
-    asset = result.scalar_one_or_none()
-    
-    # Calculate current Dutch Auction price
+def _ipo_view(
+    proposal: NostromoProposal,
+    asset: Optional[RWAAsset],
+    tokens_remaining: Optional[int] = None,
+) -> DutchAuctionIPO:
+    """An IPO's state with its current Dutch Auction price (linear decay to the reserve)."""
     current_price = proposal.ipo_start_price or 0
-    tokens_remaining = proposal.ipo_total_shares or 0
-    ipo_status = IPOStatus.ACTIVE if proposal.status == ProposalStatus.IPO_ACTIVE else IPOStatus.COMPLETED
     
     if proposal.ipo_start_time and proposal.ipo_end_time:
         total_duration = (proposal.ipo_end_time - proposal.ipo_start_time).total_seconds()
@@ -407,15 +395,6 @@ async def get_ipo_status(
         price_decay = price_range * (elapsed / total_duration) if total_duration > 0 else 0
         current_price = (proposal.ipo_start_price or 0) - price_decay
         current_price = max(current_price, reserve_price)
-        
-        # Get actual remaining from service
-        try:
-            async with get_nostromo_service() as nostromo:
-                ipo_status = await nostromo.get_ipo_status(proposal.id)
-                if ipo_status.get("tokens_remaining"):
-                    tokens_remaining = ipo_status["tokens_remaining"]
-        except Exception:
-            pass
     
     return DutchAuctionIPO(
         proposal_id=proposal.id,
@@ -426,29 +405,84 @@ async def get_ipo_status(
         current_price=current_price,
         reserve_price=proposal.ipo_end_price or 0,
         token_allocation=proposal.ipo_total_shares or 0,
-        tokens_remaining=tokens_remaining,
+        tokens_remaining=tokens_remaining or proposal.ipo_total_shares or 0,
         started_at=proposal.ipo_start_time,
         ends_at=proposal.ipo_end_time,
-        status=ipo_status,
+        status=IPOStatus.ACTIVE if proposal.status == ProposalStatus.IPO_ACTIVE else IPOStatus.COMPLETED,
     )
 
 
+async def _onchain_tokens_remaining(proposals: List[NostromoProposal]) -> Dict[str, int]:
+    """
+    Remaining tokens reported by Nostromo for scheduled IPOs.
+    
+    One service connection for all of them, queried concurrently; IPOs it
+    can't answer for are left out and fall back to their allocation.
+    """
+    scheduled = [p.id for p in proposals if p.ipo_start_time and p.ipo_end_time]
+    if not scheduled:
+        return {}
+    try:
+        async with get_nostromo_service() as nostromo:
+            statuses = await asyncio.gather(
+                *(nostromo.get_ipo_status(proposal_id) for proposal_id in scheduled),
+                return_exceptions=True,
+            )
+    except Exception:
+        return {}
+    return {
+        proposal_id: ipo_status["tokens_remaining"]
+        for proposal_id, ipo_status in zip(scheduled, statuses)
+        if isinstance(ipo_status, dict) and ipo_status.get("tokens_remaining")
+    }
+
+
+@router.get("/ipo/{proposal_id}", response_model=DutchAuctionIPO)
+async def get_ipo_status(
+    proposal_id: str,
+    session: AsyncSession = Depends(get_read_session),
+):
+    """
+    Get current Dutch Auction IPO status and price.
+    """
+    proposal = await get_proposal_by_id(session, proposal_id)
+    
+    if not proposal:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Proposal not found"
+        )
+    
+    if proposal.status not in [ProposalStatus.IPO_ACTIVE, ProposalStatus.IPO_COMPLETED]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No IPO found for this proposal"
+        )
+    
+    asset = await get_asset_by_id(session, proposal.asset_id)
+    remaining = await _onchain_tokens_remaining([proposal])
+    return _ipo_view(proposal, asset, remaining.get(proposal.id))
+
+
 @router.post("/ipo/{proposal_id}/bid", response_model=IPOBidResponse)
 async def place_ipo_bid(
     proposal_id: str,
     bid_data: IPOBidRequest,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
+    idempotency: Idempotency = Depends(get_idempotency),
 ):
     """
     Place a bid in the Dutch Auction IPO.
     
-    Bid is executed at current price if sufficient funds.
+    Bid is executed at current price if sufficient funds. Retries with the
+    same Idempotency-Key get the original response instead of bidding again.
     """
-    result = await session.execute(
-        select(NostromoProposal).where(NostromoProposal.id == proposal_id)
-    )
-    proposal = result.scalar_one_or_none()
+    replay = await idempotency.begin(current_user, bid_data)
+    if replay:
+        return replay
+    
+    proposal = await get_proposal_by_id(session, proposal_id)
     
     if not proposal:
         raise HTTPException(
@@ -468,13 +502,15 @@ async def place_ipo_bid(
     
     # Check if bid meets current price
     if bid_data.max_price < current_price:
-        return IPOBidResponse(
+        response = await idempotency.store(session, IPOBidResponse(
             proposal_id=proposal.id,
             status="rejected",
             message=f"Bid price {bid_data.max_price} below current price {current_price}",
             tokens_received=0,
             price_paid=0,
-        )
+        ))
+        await session.commit()
+        return response
     
     # Execute bid
     try:
@@ -497,10 +533,7 @@ async def place_ipo_bid(
             # EasyConnect notification
             try:
                 async with get_easyconnect_service() as ec:
-                    result = await session.execute(
-                        select(RWAAsset).where(RWAAsset.id == proposal.asset_id)
-                    )
-                    asset = result.scalar_one_or_none()
+                    asset = await get_asset_by_id(session, proposal.asset_id)
                     
                     await ec.notify_ipo_participation(
                         proposal_id=proposal.id,
@@ -514,7 +547,7 @@ async def place_ipo_bid(
             except Exception as e:
                 logger.warning(f"Failed to send IPO bid notification: {e}")
             
-            return IPOBidResponse(
+            response = await idempotency.store(session, IPOBidResponse(
                 proposal_id=proposal.id,
                 status="executed",
                 tokens_received=tokens_received,
@@ -522,7 +555,10 @@ async def place_ipo_bid(
                 execution_price=current_price,
                 qubic_tx_hash=bid_result.get("tx_hash"),
                 message=f"Successfully purchased {tokens_received} tokens",
-            )
+            ))
+            # Before the key is released at teardown, which would wait on this row
+            await session.commit()
+            return response
             
     except Exception as e:
         logger.error(f"IPO bid failed: {e}")
@@ -534,79 +570,75 @@ async def place_ipo_bid(
 
 # ==================== Launchpad Stats ====================
 
-@router.get("/stats", response_model=LaunchpadStats)
-async def get_launchpad_stats(
-    session: AsyncSession = Depends(get_session),
-):
-    """
-    Get overall Nostromo launchpad statistics.
-    """
-    # Count proposals by status
-    total_proposals = (await session.execute(
-        select(func.count()).select_from(NostromoProposal)
-    )).scalar() or 0
-    
-    active_ipos = (await session.execute(
-        select(func.count()).select_from(NostromoProposal).where(
-            NostromoProposal.status == ProposalStatus.IPO_ACTIVE
-        )
-    )).scalar() or 0
+async def compute_launchpad_stats(session: AsyncSession) -> LaunchpadStats:
+    """Every launchpad counter in one pass over nostromo_proposals."""
+    def with_status(aggregate, proposal_status: ProposalStatus):
+        return aggregate.filter(NostromoProposal.status == proposal_status)
     
-    completed_ipos = (await session.execute(
-        select(func.count()).select_from(NostromoProposal).where(
-            NostromoProposal.status == ProposalStatus.IPO_COMPLETED
-        )
-    )).scalar() or 0
-    
-    pending_votes = (await session.execute(
-        select(func.count()).select_from(NostromoProposal).where(
-            NostromoProposal.status == ProposalStatus.VOTING
-        )
-    )).scalar() or 0
-    
-    # Calculate totals
-    total_raised = (await session.execute(
-        select(func.sum(NostromoProposal.total_raised)).where(
-            NostromoProposal.status == ProposalStatus.IPO_COMPLETED
-        )
-    )).scalar() or 0
-    
-    total_votes = (await session.execute(
+    row = (await session.execute(
         select(
-            func.sum(NostromoProposal.votes_for + NostromoProposal.votes_against)
-        )
-    )).scalar() or 0
+            func.count(),
+            with_status(func.count(), ProposalStatus.VOTING),
+            with_status(func.count(), ProposalStatus.APPROVED),
+            with_status(func.count(), ProposalStatus.REJECTED),
+            with_status(func.count(), ProposalStatus.IPO_ACTIVE),
+            with_status(func.count(), ProposalStatus.IPO_COMPLETED),
+            with_status(func.sum(NostromoProposal.total_raised), ProposalStatus.IPO_COMPLETED),
+            func.sum(NostromoProposal.votes_for + NostromoProposal.votes_against),
+        ).select_from(NostromoProposal)
+    )).one()
+    total, voting, approved, rejected, active_ipos, completed_ipos, total_raised, total_votes = row
     
     return LaunchpadStats(
-        total_proposals=total_proposals,
+        total_proposals=total,
+        proposals_voting=voting,
+        proposals_approved=approved,
+        proposals_rejected=rejected,
         active_ipos=active_ipos,
         completed_ipos=completed_ipos,
-        pending_votes=pending_votes,
-        total_raised=float(total_raised) if total_raised else 0,
-        total_votes=int(total_votes) if total_votes else 0,
-        average_funding_success_rate=(
-            completed_ipos / total_proposals * 100 if total_proposals > 0 else 0
-        ),
+        total_raised=float(total_raised or 0),
+        # Voting power cast; individual voters and bidders are not recorded
+        total_participants=int(total_votes or 0),
     )
 
 
+# Proposal writes below invalidate it on commit, and it reloads from the
+# primary so the write is seen; the max age bounds how long writes made
+# by other processes go unseen
+launchpad_stats: Snapshot[LaunchpadStats] = Snapshot(
+    "launchpad-stats",
+    compute_launchpad_stats,
+    max_age_seconds=settings.launchpad_stats_max_age_seconds,
+    on_primary=True,
+)
+
+
+@router.get("/stats", response_model=LaunchpadStats)
+async def get_launchpad_stats():
+    """
+    Get overall Nostromo launchpad statistics.
+    
+    Cached until a proposal is created, voted on or changes status.
+    """
+    return await launchpad_stats.get()
+
+
 @router.get("/active-ipos", response_model=List[DutchAuctionIPO])
 async def list_active_ipos(
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
     List all currently active Dutch Auction IPOs.
     """
+    # Assets come with their proposals in one query rather than one lookup per IPO
     result = await session.execute(
-        select(NostromoProposal).where(
+        select(NostromoProposal, RWAAsset).outerjoin(
+            RWAAsset, RWAAsset.id == NostromoProposal.asset_id
+        ).where(
             NostromoProposal.status == ProposalStatus.IPO_ACTIVE
         ).order_by(NostromoProposal.ipo_end_time.asc())
     )
-    proposals = result.scalars().all()
-    
-    ipos = []
-    for proposal in proposals:
-        ipo = await get_ipo_status(proposal.id, session)
-        ipos.append(ipo)
+    rows = result.all()
     
-    return ipos
+    remaining = await _onchain_tokens_remaining([proposal for proposal, _ in rows])
+    return [_ipo_view(proposal, asset, remaining.get(proposal.id)) for proposal, asset in rows]
@@ -7,11 +7,20 @@ from typing import List, Optional
 from datetime import datetime
 import hashlib
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
+from sqlalchemy import select
 
-from app.db.database import get_session
+from app.db.database import get_session, get_read_session
+from app.db.repository import get_asset_by_id
+from app.db.counting import count_rows
+from app.db.pagination import CursorError, KeysetPage, paginate_keyset
+from app.db.search import (
+    asset_metadata_filter,
+    asset_search_filter,
+    asset_search_rank,
+    parse_metadata_filters,
+)
 from app.db.models import (
     RWAAsset, 
     User, 
@@ -26,14 +35,17 @@ from app.models.rwa import (
     AssetResponse,
     AssetListResponse,
     AssetDetailResponse,
+    AssetImportResponse,
     VerificationRequest,
     VerificationResponse,
     AssetFilters,
     PaginationParams,
+    ASSET_SORT_PATTERN,
 )
 from app.services.gemini_ai import GeminiAIService, get_gemini_service
 from app.services.easyconnect import EasyConnectService, get_easyconnect_service
 from app.services.qubic_rpc import QubicRPCClient
+from app.services.bulk_import import BulkAssetImporter, iter_csv_rows, iter_ndjson_rows
 from app.core.logging import get_logger
 from app.api.v1.deps import get_current_user
 
@@ -79,7 +91,7 @@ async def create_asset(
         image_url=asset_data.image_url,
         document_urls=asset_data.document_urls,
         external_data_sources=asset_data.external_data_sources,
-        metadata=asset_data.metadata,
+        asset_metadata=asset_data.metadata,
     )
     
     session.add(asset)
@@ -90,9 +102,40 @@ async def create_asset(
     return AssetResponse.model_validate(asset)
 
 
+@router.post("/import", response_model=AssetImportResponse)
+async def import_assets(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+    import_format: Optional[str] = Query(
+        None,
+        alias="format",
+        pattern="^(ndjson|csv)$",
+        description="Body format; defaults to the Content-Type (text/csv or application/x-ndjson)",
+    ),
+):
+    """
+    Bulk-create RWA assets from a streamed NDJSON or CSV body.
+    
+    Every row is validated like `POST /rwa` and created as a DRAFT owned by
+    the caller. Rows are inserted in batches as the body arrives; invalid
+    rows and duplicate symbols are reported per line without stopping the
+    import. CSV needs a header row with AssetCreate field names;
+    `document_urls` is "|"-separated and `metadata` /
+    `external_data_sources` are JSON.
+    """
+    if import_format is None:
+        content_type = request.headers.get("content-type", "")
+        import_format = "csv" if "csv" in content_type else "ndjson"
+    
+    parse_rows = iter_csv_rows if import_format == "csv" else iter_ndjson_rows
+    importer = BulkAssetImporter(session, creator_id=current_user.id)
+    return await importer.run(parse_rows(request.stream()))
+
+
 @router.get("", response_model=AssetListResponse)
 async def list_assets(
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     # Filters
     asset_type: Optional[AssetType] = Query(None, description="Filter by asset type"),
     status_filter: Optional[AssetStatus] = Query(None, alias="status", description="Filter by status"),
@@ -100,16 +143,48 @@ async def list_assets(
     max_price: Optional[float] = Query(None, ge=0, description="Maximum price"),
     min_verification_score: Optional[float] = Query(None, ge=0, le=100, description="Minimum verification score"),
     creator_id: Optional[str] = Query(None, description="Filter by creator"),
-    search: Optional[str] = Query(None, description="Search in name and description"),
+    search: Optional[str] = Query(None, max_length=200, description="Search in name, symbol and description"),
+    metadata: Optional[List[str]] = Query(
+        None,
+        description="Metadata filters as key:value, repeatable; dotted keys reach nested fields (e.g. registry:Verra)",
+    ),
     # Pagination
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, description="Page number (ignored when a cursor is given)"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
-    sort_by: str = Query("created_at", description="Sort field"),
+    sort_by: Optional[str] = Query(
+        None,
+        pattern=ASSET_SORT_PATTERN,
+        description="Sort field (default: relevance when searching, otherwise created_at)",
+    ),
     sort_order: str = Query("desc", pattern="^(asc|desc)$", description="Sort order"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page"),
+    with_total: bool = Query(True, description="Include the total count"),
 ):
     """
     List RWA assets with filtering and pagination.
+    
+    Prefer following `next_cursor` / `prev_cursor` over page numbers: cursor
+    pages are served by an index seek and stay fast however deep they go.
+    
+    `search` matches word prefixes in name, symbol and description and
+    substrings of name and symbol. Relevance-ordered results are paged by
+    page number only.
     """
+    if sort_by is None:
+        sort_by = "relevance" if search else "created_at"
+    try:
+        metadata_filters = parse_metadata_filters(metadata or [])
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if sort_by == "relevance" and (not search or cursor):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="sort_by=relevance requires a search term and does not support cursors"
+        )
+    
     # Build query
     query = select(RWAAsset)
     
@@ -127,55 +202,74 @@ async def list_assets(
     if creator_id:
         query = query.where(RWAAsset.creator_id == creator_id)
     if search:
-        search_term = f"%{search}%"
-        query = query.where(
-            or_(
-                RWAAsset.name.ilike(search_term),
-                RWAAsset.description.ilike(search_term),
-                RWAAsset.symbol.ilike(search_term),
-            )
-        )
+        search_clause = asset_search_filter(search)
+        if search_clause is not None:
+            query = query.where(search_clause)
+    if metadata_filters:
+        query = query.where(asset_metadata_filter(metadata_filters))
     
     # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await session.execute(count_query)).scalar() or 0
-    
-    # Apply sorting
-    sort_column = getattr(RWAAsset, sort_by, RWAAsset.created_at)
-    if sort_order == "desc":
-        query = query.order_by(sort_column.desc())
+    total = total_strategy = None
+    if with_total:
+        counted = await count_rows(session, query, RWAAsset, {
+            "asset_type": asset_type,
+            "status": status_filter,
+            "min_price": min_price,
+            "max_price": max_price,
+            "min_verification_score": min_verification_score,
+            "creator_id": creator_id,
+            "search": search,
+            "metadata": sorted(metadata) if metadata else None,
+        })
+        total, total_strategy = counted.total, counted.strategy.value
+    
+    # Apply sorting and pagination
+    if sort_by == "relevance":
+        ranked = await session.execute(
+            query.order_by(asset_search_rank(search).desc(), RWAAsset.id)
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+        )
+        result = KeysetPage(items=list(ranked.scalars().all()))
     else:
-        query = query.order_by(sort_column.asc())
-    
-    # Apply pagination
-    offset = (page - 1) * page_size
-    query = query.offset(offset).limit(page_size)
-    
-    # Execute
-    result = await session.execute(query)
-    assets = result.scalars().all()
+        try:
+            result = await paginate_keyset(
+                session,
+                query,
+                sort_column=getattr(RWAAsset, sort_by),
+                id_column=RWAAsset.id,
+                sort_order=sort_order,
+                page_size=page_size,
+                cursor=cursor,
+                offset=(page - 1) * page_size,
+            )
+        except CursorError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
     
     return AssetListResponse(
-        items=[AssetResponse.model_validate(a) for a in assets],
+        items=[AssetResponse.model_validate(a) for a in result.items],
         total=total,
+        total_strategy=total_strategy,
         page=page,
         page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size,
+        total_pages=(total + page_size - 1) // page_size if total is not None else None,
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor,
     )
 
 
 @router.get("/{asset_id}", response_model=AssetDetailResponse)
 async def get_asset(
     asset_id: str,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
     Get detailed information about a specific asset.
     """
-    result = await session.execute(
-        select(RWAAsset).where(RWAAsset.id == asset_id)
-    )
-    asset = result.scalar_one_or_none()
+    asset = await get_asset_by_id(session, asset_id)
     
     if not asset:
         raise HTTPException(
@@ -196,10 +290,7 @@ async def update_asset(
     """
     Update an RWA asset. Only the creator can update their asset.
     """
-    result = await session.execute(
-        select(RWAAsset).where(RWAAsset.id == asset_id)
-    )
-    asset = result.scalar_one_or_none()
+    asset = await get_asset_by_id(session, asset_id)
     
     if not asset:
         raise HTTPException(
@@ -215,6 +306,8 @@ async def update_asset(
     
     # Update fields
     update_dict = update_data.model_dump(exclude_unset=True)
+    if "metadata" in update_dict:
+        update_dict["asset_metadata"] = update_dict.pop("metadata")
     for field, value in update_dict.items():
         setattr(asset, field, value)
     
@@ -232,10 +325,7 @@ async def delete_asset(
     """
     Delete an RWA asset. Only drafts can be deleted.
     """
-    result = await session.execute(
-        select(RWAAsset).where(RWAAsset.id == asset_id)
-    )
-    asset = result.scalar_one_or_none()
+    asset = await get_asset_by_id(session, asset_id)
     
     if not asset:
         raise HTTPException(
@@ -273,10 +363,7 @@ async def verify_asset(
     This triggers Gemini AI analysis and generates an oracle proof.
     """
     # Get asset
-    result = await session.execute(
-        select(RWAAsset).where(RWAAsset.id == asset_id)
-    )
-    asset = result.scalar_one_or_none()
+    asset = await get_asset_by_id(session, asset_id)
     
     if not asset:
         raise HTTPException(
@@ -399,7 +486,7 @@ async def verify_asset(
 @router.get("/{asset_id}/verifications", response_model=List[VerificationResponse])
 async def get_asset_verifications(
     asset_id: str,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
     Get all verifications for an asset.
@@ -425,10 +512,7 @@ async def list_asset_for_trading(
     """
     List a verified asset for trading on the marketplace.
     """
-    result = await session.execute(
-        select(RWAAsset).where(RWAAsset.id == asset_id)
-    )
-    asset = result.scalar_one_or_none()
+    asset = await get_asset_by_id(session, asset_id)
     
     if not asset:
         raise HTTPException(
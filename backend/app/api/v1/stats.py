@@ -3,16 +3,24 @@ Market Statistics API Routes
 Real-time market data and analytics endpoints
 """
 
-from typing import List, Optional
+from dataclasses import asdict
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+import asyncio
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, desc
 
-from app.db.database import get_session
-from app.db.models import RWAAsset, Trade, AssetType, AssetStatus, TradeStatus
+from app.db.database import get_analytics_session
+from app.db.models import RWAAsset, Trade, AssetType, AssetStatus, TradeStatus, User
+from app.api.v1.deps import get_optional_user
+from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.snapshot import Snapshot
+from app.services.trade_analytics import compute_metrics, empty_metrics, load_trade_arrays
+from app.services.trades import COUNTS_TOWARD_VOLUME
+from app.services.volume_buckets import RANKING_SORTS, RANKING_WINDOWS, ranking_query
 from pydantic import BaseModel
 
 logger = get_logger(__name__)
@@ -43,6 +51,17 @@ class TopAsset(BaseModel):
     asset_type: str
 
 
+class RankedAsset(BaseModel):
+    id: str
+    name: str
+    symbol: str
+    price: float
+    price_change: float
+    volume: float
+    trade_count: int
+    asset_type: str
+
+
 class RecentTrade(BaseModel):
     id: str
     asset_symbol: str
@@ -60,6 +79,20 @@ class AssetDistribution(BaseModel):
     total_value: float
 
 
+class AssetAnalytics(BaseModel):
+    asset_id: str
+    window: str
+    trade_count: int
+    volume: float
+    notional: float
+    vwap: Optional[float]
+    realized_volatility: float
+    max_drawdown: float
+    turnover: Optional[float]
+    first_trade_at: Optional[datetime]
+    last_trade_at: Optional[datetime]
+
+
 class MarketAnalytics(BaseModel):
     market_stats: MarketStats
     top_assets: List[TopAsset]
@@ -68,14 +101,11 @@ class MarketAnalytics(BaseModel):
     last_updated: datetime
 
 
-# ==================== Endpoints ====================
+# ==================== Market Analytics ====================
 
-@router.get("/market", response_model=MarketAnalytics)
-async def get_market_analytics(
-    session: AsyncSession = Depends(get_session),
-):
+async def compute_market_analytics(session: AsyncSession) -> MarketAnalytics:
     """
-    Get comprehensive market analytics including:
+    Compute the market analytics from scratch:
     - Overall market statistics (24h volume, trades, etc.)
     - Top performing assets
     - Recent trades
@@ -87,14 +117,15 @@ async def get_market_analytics(
     
     # ==================== Market Stats ====================
     
-    # Get 24h trade volume and count
+    # Get 24h trade volume and count, one fill per match
     trades_24h_query = select(
         func.count(Trade.id).label('trade_count'),
-        func.coalesce(func.sum(Trade.total_value), 0).label('total_volume')
+        func.coalesce(func.sum(Trade.total_amount), 0).label('total_volume')
     ).where(
         and_(
-            Trade.status == TradeStatus.EXECUTED,
-            Trade.executed_at >= yesterday
+            Trade.status == TradeStatus.COMPLETED,
+            COUNTS_TOWARD_VOLUME,
+            Trade.settled_at >= yesterday
         )
     )
     trades_24h_result = await session.execute(trades_24h_query)
@@ -103,12 +134,13 @@ async def get_market_analytics(
     # Get previous 24h for comparison
     trades_prev_query = select(
         func.count(Trade.id).label('trade_count'),
-        func.coalesce(func.sum(Trade.total_value), 0).label('total_volume')
+        func.coalesce(func.sum(Trade.total_amount), 0).label('total_volume')
     ).where(
         and_(
-            Trade.status == TradeStatus.EXECUTED,
-            Trade.executed_at >= two_days_ago,
-            Trade.executed_at < yesterday
+            Trade.status == TradeStatus.COMPLETED,
+            COUNTS_TOWARD_VOLUME,
+            Trade.settled_at >= two_days_ago,
+            Trade.settled_at < yesterday
         )
     )
     trades_prev_result = await session.execute(trades_prev_query)
@@ -125,14 +157,14 @@ async def get_market_analytics(
     
     # Get active listings count
     listings_query = select(func.count(RWAAsset.id)).where(
-        RWAAsset.status == AssetStatus.ACTIVE
+        RWAAsset.status == AssetStatus.LISTED
     )
     listings_result = await session.execute(listings_query)
     active_listings = listings_result.scalar() or 0
     
     # Get average price
     avg_price_query = select(func.avg(RWAAsset.price_per_unit)).where(
-        RWAAsset.status == AssetStatus.ACTIVE
+        RWAAsset.status == AssetStatus.LISTED
     )
     avg_price_result = await session.execute(avg_price_query)
     avg_price = float(avg_price_result.scalar() or 0)
@@ -150,66 +182,45 @@ async def get_market_analytics(
     
     # ==================== Top Assets ====================
     
-    # Get top assets by 24h volume
-    top_assets_query = select(
-        RWAAsset,
-        func.coalesce(func.sum(Trade.total_value), 0).label('volume_24h')
-    ).outerjoin(
-        Trade,
-        and_(
-            Trade.asset_id == RWAAsset.id,
-            Trade.status == TradeStatus.EXECUTED,
-            Trade.executed_at >= yesterday
-        )
-    ).where(
-        RWAAsset.status == AssetStatus.ACTIVE
-    ).group_by(
-        RWAAsset.id
-    ).order_by(
-        desc('volume_24h')
-    ).limit(5)
-    
-    top_assets_result = await session.execute(top_assets_query)
+    # Get top assets by 24h volume, summed from the hourly volume buckets
+    top_assets_result = await session.execute(ranking_query("24h", "volume", limit=5, now=now))
     top_assets = []
     
-    for row in top_assets_result:
-        asset = row[0]
-        volume = float(row[1] or 0)
+    for asset, volume, _, price_change in top_assets_result.all():
         top_assets.append(TopAsset(
             id=str(asset.id),
             name=asset.name,
             symbol=asset.symbol,
             price=float(asset.price_per_unit),
-            change_24h=0,  # Would need price history
-            volume_24h=volume,
+            change_24h=round(float(price_change or 0), 2),
+            volume_24h=float(volume or 0),
             asset_type=asset.asset_type.value,
         ))
     
     # ==================== Recent Trades ====================
     
-    recent_trades_query = select(Trade).where(
-        Trade.status == TradeStatus.EXECUTED
+    # Symbols come with the trades in one query rather than one lookup per trade
+    recent_trades_query = select(Trade, RWAAsset.symbol).outerjoin(
+        RWAAsset, RWAAsset.id == Trade.asset_id
+    ).where(
+        Trade.status == TradeStatus.COMPLETED,
+        COUNTS_TOWARD_VOLUME,
     ).order_by(
-        desc(Trade.executed_at)
+        desc(Trade.settled_at)
     ).limit(10)
     
     recent_trades_result = await session.execute(recent_trades_query)
     recent_trades = []
     
-    for trade in recent_trades_result.scalars():
-        # Get asset symbol
-        asset_query = select(RWAAsset.symbol).where(RWAAsset.id == trade.asset_id)
-        asset_result = await session.execute(asset_query)
-        asset_symbol = asset_result.scalar() or "UNKNOWN"
-        
+    for trade, asset_symbol in recent_trades_result.all():
         recent_trades.append(RecentTrade(
             id=str(trade.id),
-            asset_symbol=asset_symbol,
-            trade_type=trade.trade_type.value,
+            asset_symbol=asset_symbol or "UNKNOWN",
+            trade_type=trade.trade_type,
             quantity=float(trade.quantity),
             price=float(trade.price_per_unit),
-            total_value=float(trade.total_value),
-            executed_at=trade.executed_at or trade.created_at,
+            total_value=float(trade.total_amount),
+            executed_at=trade.settled_at or trade.created_at,
         ))
     
     # ==================== Asset Distribution ====================
@@ -219,7 +230,7 @@ async def get_market_analytics(
         func.count(RWAAsset.id).label('count'),
         func.coalesce(func.sum(RWAAsset.price_per_unit * RWAAsset.total_supply), 0).label('total_value')
     ).where(
-        RWAAsset.status == AssetStatus.ACTIVE
+        RWAAsset.status == AssetStatus.LISTED
     ).group_by(
         RWAAsset.asset_type
     )
@@ -247,32 +258,162 @@ async def get_market_analytics(
     )
 
 
+market_analytics: Snapshot[MarketAnalytics] = Snapshot(
+    "market-analytics",
+    compute_market_analytics,
+    refresh_seconds=settings.market_analytics_refresh_seconds,
+    max_age_seconds=settings.market_analytics_max_age_seconds,
+)
+
+
+# ==================== Endpoints ====================
+
+@router.get("/market", response_model=MarketAnalytics)
+async def get_market_analytics(
+    refresh: bool = Query(False, description="Recompute before answering (admins only)"),
+    current_user: Optional[User] = Depends(get_optional_user),
+):
+    """
+    Get comprehensive market analytics: 24h market statistics, top
+    assets, recent trades and the asset type distribution.
+    
+    Served from a snapshot recomputed in the background every few
+    seconds; `last_updated` says when it was taken, and it is never older
+    than MARKET_ANALYTICS_MAX_AGE_SECONDS.
+    """
+    if refresh:
+        if current_user is None or not current_user.is_admin:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Admin access required to force a refresh"
+            )
+        return await market_analytics.refresh()
+    return await market_analytics.get()
+
+
+@router.get("/top-assets", response_model=List[RankedAsset])
+async def get_top_assets(
+    window: str = Query("24h", pattern=f"^({'|'.join(RANKING_WINDOWS)})$", description="24h, 7d or 30d"),
+    sort: str = Query("volume", pattern=f"^({'|'.join(RANKING_SORTS)})$", description="volume or gainers"),
+    limit: int = Query(10, ge=1, le=50),
+    session: AsyncSession = Depends(get_analytics_session),
+):
+    """
+    Rank listed assets by traded volume or price gain over a window.
+    
+    Summed from hourly volume buckets kept current by settlement, so
+    the window includes fills settled up to the moment of the request.
+    Assets without fills in the window are not ranked.
+    """
+    result = await session.execute(ranking_query(window, sort, limit=limit))
+    return [
+        RankedAsset(
+            id=str(asset.id),
+            name=asset.name,
+            symbol=asset.symbol,
+            price=float(asset.price_per_unit),
+            price_change=round(float(price_change or 0), 2),
+            volume=float(volume or 0),
+            trade_count=int(trade_count or 0),
+            asset_type=asset.asset_type.value,
+        )
+        for asset, volume, trade_count, price_change in result.all()
+    ]
+
+
 @router.get("/summary")
 async def get_quick_stats(
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_analytics_session),
 ):
     """
     Get quick summary stats for dashboard header
+    
+    One round trip: the listed-asset count rides along with a single pass
+    over completed trades, counting each match once.
     """
-    # Total assets
-    assets_count = await session.execute(
-        select(func.count(RWAAsset.id)).where(RWAAsset.status == AssetStatus.ACTIVE)
-    )
+    listed_assets = select(func.count(RWAAsset.id)).where(
+        RWAAsset.status == AssetStatus.LISTED
+    ).scalar_subquery()
     
-    # Total trades
-    trades_count = await session.execute(
-        select(func.count(Trade.id)).where(Trade.status == TradeStatus.EXECUTED)
-    )
-    
-    # Total volume
-    total_volume = await session.execute(
-        select(func.coalesce(func.sum(Trade.total_value), 0))
-        .where(Trade.status == TradeStatus.EXECUTED)
-    )
+    totals = (await session.execute(
+        select(
+            listed_assets,
+            func.count(Trade.id),
+            func.coalesce(func.sum(Trade.total_amount), 0),
+        ).where(Trade.status == TradeStatus.COMPLETED, COUNTS_TOWARD_VOLUME)
+    )).one()
+    total_assets, total_trades, total_volume = totals
     
     return {
-        "total_assets": assets_count.scalar() or 0,
-        "total_trades": trades_count.scalar() or 0,
-        "total_volume": float(total_volume.scalar() or 0),
+        "total_assets": total_assets or 0,
+        "total_trades": total_trades or 0,
+        "total_volume": float(total_volume or 0),
         "last_updated": datetime.utcnow(),
     }
+
+
+# ==================== Asset Analytics ====================
+
+WINDOW_PATTERN = f"^({'|'.join(RANKING_WINDOWS)})$"
+
+
+async def _asset_analytics(session: AsyncSession, asset_ids: List[str], window: str) -> List[AssetAnalytics]:
+    """Risk metrics for the assets over the window, in the order asked for."""
+    supply: Dict[str, int] = dict((await session.execute(
+        select(RWAAsset.id, RWAAsset.circulating_supply).where(RWAAsset.id.in_(asset_ids))
+    )).all())
+    missing = [asset_id for asset_id in asset_ids if asset_id not in supply]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Asset not found: {', '.join(missing)}"
+        )
+    
+    end = datetime.utcnow()
+    start = end - timedelta(hours=RANKING_WINDOWS[window])
+    trades = await load_trade_arrays(session, asset_ids, start, end)
+    # The reductions are CPU-bound; keep them off the event loop
+    computed = await asyncio.to_thread(compute_metrics, trades, supply)
+    by_asset = {metrics.asset_id: metrics for metrics in computed}
+    return [
+        AssetAnalytics(window=window, **asdict(by_asset.get(asset_id) or empty_metrics(asset_id)))
+        for asset_id in asset_ids
+    ]
+
+
+@router.get("/assets/analytics", response_model=List[AssetAnalytics])
+async def get_assets_analytics(
+    asset_ids: List[str] = Query(..., alias="asset_id", description="Asset id, repeatable"),
+    window: str = Query("30d", pattern=WINDOW_PATTERN, description="24h, 7d or 30d"),
+    session: AsyncSession = Depends(get_analytics_session),
+):
+    """
+    VWAP, realized volatility, max drawdown and turnover for several assets.
+    
+    All assets are computed together from one pass over their fills.
+    """
+    asset_ids = list(dict.fromkeys(asset_ids))
+    if len(asset_ids) > settings.trade_analytics_max_assets:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.trade_analytics_max_assets} assets per request"
+        )
+    return await _asset_analytics(session, asset_ids, window)
+
+
+@router.get("/assets/{asset_id}/analytics", response_model=AssetAnalytics)
+async def get_asset_analytics(
+    asset_id: str,
+    window: str = Query("30d", pattern=WINDOW_PATTERN, description="24h, 7d or 30d"),
+    session: AsyncSession = Depends(get_analytics_session),
+):
+    """
+    VWAP, realized volatility, max drawdown and turnover of one asset.
+    
+    Computed from the buy side of each fill settled in the window.
+    Volatility is the square root of the summed squared trade-to-trade
+    log returns, not annualized; drawdown is the largest fall from a
+    running high, as a fraction; turnover is units traded over
+    circulating supply.
+    """
+    return (await _asset_analytics(session, [asset_id], window))[0]
@@ -3,29 +3,44 @@ Trading API Routes
 Endpoints for buying, selling, and trading RWA assets
 """
 
-from typing import List, Optional
-from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 import math
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 
-from app.db.database import get_session
-from app.db.models import RWAAsset, User, Trade, AssetStatus, TradeStatus
+from app.db.database import get_session, get_read_session, open_read_session
+from app.db.repository import get_asset_by_id, get_holding, get_trade_by_id, reserve_holding
+from app.db.counting import count_rows
+from app.db.pagination import CursorError, paginate_keyset
+from app.db.models import User, Trade, PriceCandle, AssetStatus, TradeStatus
 from app.models.trade import (
     TradeCreate,
     TradeResponse,
     TradeListResponse,
     TradeExecuteRequest,
     TradeExecuteResponse,
+    TradeBatchExecuteRequest,
+    TradeBatchExecuteResult,
+    TradeBatchExecuteResponse,
+    SettlementResponse,
     MarketStats,
     OrderBook,
     OrderBookEntry,
+    PriceHistory,
+    PriceHistoryResponse,
 )
-from app.services.qubic_rpc import QubicRPCClient
-from app.services.easyconnect import EasyConnectService, get_easyconnect_service
+from app.services.matching_engine import TRADE_FEE_PERCENTAGE, get_matching_engine
+from app.services.holdings import is_issuer_sale
+from app.services.candles import INTERVAL_SECONDS
+from app.services.market_stats import get_market_stats_tracker
+from app.services.settlement import enqueue_settlement, get_settlement_worker
+from app.services.trade_export import EXPORT_FORMATS, build_export_query, export_filename, stream_export
 from app.api.v1.deps import get_current_user
+from app.api.v1.idempotency import Idempotency, get_idempotency
 from app.core.config import settings
 from app.core.logging import get_logger
 
@@ -33,8 +48,28 @@ logger = get_logger(__name__)
 
 router = APIRouter(prefix="/trade", tags=["Trading"])
 
-# Fee configuration (0.3% burned as per PRD)
-TRADE_FEE_PERCENTAGE = 0.003
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Timestamps are stored in naive UTC; convert aware query parameters."""
+    if value and value.tzinfo:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _execution_error(trade: Optional[Trade], user: User) -> Optional[Tuple[int, str]]:
+    """Why a trade can't be executed by the user, as (status code, detail), or None."""
+    if not trade:
+        return status.HTTP_404_NOT_FOUND, "Trade not found"
+    if trade.user_id != user.id:
+        return status.HTTP_403_FORBIDDEN, "Not authorized to execute this trade"
+    if trade.order_id is None:
+        return (
+            status.HTTP_400_BAD_REQUEST,
+            "Orders settle through their fills; execute the fill trades instead",
+        )
+    if trade.status != TradeStatus.PENDING:
+        return status.HTTP_400_BAD_REQUEST, f"Trade is already {trade.status.value}"
+    return None
 
 
 # ==================== Trade Operations ====================
@@ -44,15 +79,27 @@ async def create_trade(
     trade_data: TradeCreate,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
+    idempotency: Idempotency = Depends(get_idempotency),
 ):
     """
-    Create a new trade order (buy or sell).
+    Place a limit order (buy or sell).
+    
+    The order is matched against the asset's order book at once, best
+    price first and oldest first within a price. Each match is recorded as
+    a fill trade for both sides; any unfilled quantity rests on the book
+    until it is matched or cancelled. Send an Idempotency-Key header to make
+    retries safe.
+    
+    A sell must be covered by holdings not already committed to other
+    sells; its units stay reserved until it settles or is cancelled. The
+    asset's creator sells from the unissued supply instead.
     """
+    replay = await idempotency.begin(current_user, trade_data)
+    if replay:
+        return replay
+    
     # Get asset
-    result = await session.execute(
-        select(RWAAsset).where(RWAAsset.id == trade_data.asset_id)
-    )
-    asset = result.scalar_one_or_none()
+    asset = await get_asset_by_id(session, trade_data.asset_id)
     
     if not asset:
         raise HTTPException(
@@ -71,12 +118,18 @@ async def create_trade(
     fee_amount = total_amount * TRADE_FEE_PERCENTAGE
     fee_burned = fee_amount  # 100% of fee is burned
     
-    # Validate quantity for sells
-    if trade_data.trade_type == "sell":
-        # In production: check user's holdings
-        pass
+    # Sells set their units aside now, committed with the order below
+    if trade_data.trade_type == "sell" and not is_issuer_sale("sell", current_user.id, asset.creator_id):
+        reserved = await reserve_holding(session, current_user.id, asset.id, trade_data.quantity)
+        if reserved is None:
+            holding = await get_holding(session, current_user.id, asset.id)
+            available = holding.quantity - holding.reserved_quantity if holding else 0
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Insufficient holdings: {available} {asset.symbol} available to sell"
+            )
     
-    # Create trade record
+    # Create order record
     trade = Trade(
         asset_id=trade_data.asset_id,
         user_id=current_user.id,
@@ -89,130 +142,186 @@ async def create_trade(
         fee_burned=fee_burned,
     )
     
-    session.add(trade)
-    await session.flush()
+    async def store_response():
+        # Committed with the order, so a retry replays it instead of placing again
+        await idempotency.store(session, TradeResponse.model_validate(trade), status.HTTP_201_CREATED)
+    
+    await get_matching_engine().place(session, trade, before_commit=store_response)
     
     logger.info(
-        f"Trade created: {trade.id} - {trade_data.trade_type} {trade_data.quantity} "
-        f"{asset.symbol} @ {trade_data.price_per_unit} QUBIC"
+        f"Order placed: {trade.id} - {trade_data.trade_type} {trade_data.quantity} "
+        f"{asset.symbol} @ {trade_data.price_per_unit} QUBIC, {trade.filled_quantity} filled"
     )
     
     return TradeResponse.model_validate(trade)
 
 
-@router.post("/{trade_id}/execute", response_model=TradeExecuteResponse)
+@router.post(
+    "/{trade_id}/execute",
+    response_model=TradeExecuteResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 async def execute_trade(
     trade_id: str,
     execute_data: TradeExecuteRequest,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
+    idempotency: Idempotency = Depends(get_idempotency),
 ):
     """
-    Execute a pending trade on the Qubic network.
-    
-    This creates and broadcasts the transaction to Qubic.
+    Queue a pending fill for settlement on the Qubic network.
+    
+    The settlement worker broadcasts the transaction, waits for its tick and
+    marks the trade completed, retrying if it doesn't land. Progress is
+    pushed to the user's notifications WebSocket as settlement_update
+    messages and can be polled at /trade/settlements/{settlement_id}.
+    Orders themselves are not executed; each of their fills is, and the
+    other fill of the match is queued and settled along with it. Retries
+    with the same Idempotency-Key get the original response.
     """
+    replay = await idempotency.begin(current_user, execute_data)
+    if replay:
+        return replay
+    
     # Get trade
-    result = await session.execute(
-        select(Trade).where(Trade.id == trade_id)
-    )
-    trade = result.scalar_one_or_none()
+    trade = await get_trade_by_id(session, trade_id)
     
-    if not trade:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Trade not found"
-        )
+    error = _execution_error(trade, current_user)
+    if error:
+        raise HTTPException(status_code=error[0], detail=error[1])
     
-    if trade.user_id != current_user.id:
+    settlement_id, queued = await enqueue_settlement(session, [trade.id])
+    if not queued:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to execute this trade"
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Trade is no longer pending"
         )
+    response = await idempotency.store(session, TradeExecuteResponse(
+        trade_id=trade.id,
+        status=TradeStatus.SETTLING.value,
+        settlement_id=settlement_id,
+        qubic_tx_hash=None,
+        qubic_tick=None,
+        message=f"Trade queued for settlement. {trade.fee_burned} QUBIC will be burned.",
+        fee_burned=trade.fee_burned,
+    ), status.HTTP_202_ACCEPTED)
+    await session.commit()
+    get_settlement_worker().wake()
+    
+    logger.info(f"Trade queued for settlement: {trade_id} ({settlement_id})")
+    
+    return response
+
+
+@router.post(
+    "/execute/batch",
+    response_model=TradeBatchExecuteResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def execute_trades_batch(
+    batch: TradeBatchExecuteRequest,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+    idempotency: Idempotency = Depends(get_idempotency),
+):
+    """
+    Queue many pending fills for settlement under one settlement ID.
     
-    if trade.status != TradeStatus.PENDING:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Trade is already {trade.status.value}"
+    All trades are checked in one query and queued with a single UPDATE;
+    the worker then submits them together on one tick lookup. Trades that
+    can't be executed are reported as rejected instead of failing the batch.
+    Honours Idempotency-Key like the single execute endpoint.
+    """
+    replay = await idempotency.begin(current_user, batch)
+    if replay:
+        return replay
+    
+    trade_ids = list(dict.fromkeys(batch.trade_ids))
+    result = await session.execute(select(Trade).where(Trade.id.in_(trade_ids)))
+    trades = {trade.id: trade for trade in result.scalars()}
+    
+    rejected: Dict[str, str] = {}
+    runnable: List[str] = []
+    for trade_id in trade_ids:
+        error = _execution_error(trades.get(trade_id), current_user)
+        if error:
+            rejected[trade_id] = error[1]
+        else:
+            runnable.append(trade_id)
+    
+    settlement_id = None
+    queued: List[str] = []
+    if runnable:
+        settlement_id, queued = await enqueue_settlement(session, runnable)
+        for trade_id in set(runnable) - set(queued):
+            rejected[trade_id] = "Trade is no longer pending"
+    
+    results = [
+        TradeBatchExecuteResult(
+            trade_id=trade_id,
+            status=TradeStatus.SETTLING.value,
+            fee_burned=trades[trade_id].fee_burned,
         )
-    
-    # Get asset
+        if trade_id not in rejected else
+        TradeBatchExecuteResult(trade_id=trade_id, status="rejected", error=rejected[trade_id])
+        for trade_id in trade_ids
+    ]
+    
+    response = await idempotency.store(session, TradeBatchExecuteResponse(
+        settlement_id=settlement_id,
+        results=results,
+        queued=len(queued),
+        rejected=len(rejected),
+        fee_burned=sum(trades[trade_id].fee_burned for trade_id in queued),
+    ), status.HTTP_202_ACCEPTED)
+    # The queued fills and the stored response commit together
+    await session.commit()
+    if queued:
+        get_settlement_worker().wake()
+        logger.info(f"Batch queued {len(queued)}/{len(trade_ids)} trades for settlement ({settlement_id})")
+    
+    return response
+
+
+@router.get("/settlements/{settlement_id}", response_model=SettlementResponse)
+async def get_settlement(
+    settlement_id: str,
+    session: AsyncSession = Depends(get_read_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Get the progress of a settlement started by an execute call.
+    """
     result = await session.execute(
-        select(RWAAsset).where(RWAAsset.id == trade.asset_id)
+        select(Trade).where(
+            Trade.settlement_id == settlement_id,
+            Trade.user_id == current_user.id,
+        ).order_by(Trade.created_at, Trade.id)
     )
-    asset = result.scalar_one_or_none()
+    trades = result.scalars().all()
     
-    try:
-        # Execute on Qubic network
-        async with QubicRPCClient() as qubic:
-            # Get current tick
-            current_tick = await qubic.get_current_tick()
-            target_tick = current_tick + 30  # Schedule for future tick
-            
-            # In production: Create and sign actual transaction
-            # For demo: simulate execution
-            
-            # Simulate successful execution
-            tx_hash = f"QT{trade_id[:16].upper()}"
-            
-            # Update trade status
-            trade.status = TradeStatus.COMPLETED
-            trade.qubic_tx_hash = tx_hash
-            trade.qubic_tick = target_tick
-            trade.settled_at = datetime.utcnow()
-            
-            # Update asset circulating supply
-            if trade.trade_type == "buy":
-                asset.circulating_supply += trade.quantity
-            
-            # Send EasyConnect notification
-            try:
-                async with get_easyconnect_service() as ec:
-                    await ec.notify_trade_completed(
-                        trade_id=trade.id,
-                        asset_id=asset.id,
-                        asset_name=asset.name,
-                        trade_type=trade.trade_type,
-                        quantity=trade.quantity,
-                        price=trade.price_per_unit,
-                        total_amount=trade.total_amount,
-                        buyer_address=current_user.qubic_public_key or "unknown",
-                        qubic_tx_hash=tx_hash,
-                    )
-                    
-                    # Check for milestone
-                    if trade.total_amount >= 1000:
-                        await ec.notify_trade_milestone(
-                            asset_id=asset.id,
-                            asset_name=asset.name,
-                            milestone_amount=1000,
-                            total_volume=trade.total_amount,
-                            trader_address=current_user.qubic_public_key or "unknown",
-                            airdrop_amount=10,  # VERI airdrop
-                        )
-            except Exception as e:
-                logger.warning(f"Failed to send EasyConnect notification: {e}")
-            
-            logger.info(f"Trade executed: {trade_id} at tick {target_tick}")
-            
-            return TradeExecuteResponse(
+    if not trades:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Settlement not found"
+        )
+    
+    statuses = {trade.status for trade in trades}
+    return SettlementResponse(
+        settlement_id=settlement_id,
+        status=statuses.pop().value if len(statuses) == 1 else "partial",
+        trades=[
+            TradeBatchExecuteResult(
                 trade_id=trade.id,
-                status="completed",
-                qubic_tx_hash=tx_hash,
-                qubic_tick=target_tick,
-                message=f"Trade executed successfully. {trade.fee_burned} QUBIC burned.",
+                status=trade.status.value,
+                qubic_tx_hash=trade.qubic_tx_hash,
+                qubic_tick=trade.qubic_tick,
                 fee_burned=trade.fee_burned,
+                error=(trade.settlement_data or {}).get("error"),
             )
-            
-    except Exception as e:
-        logger.error(f"Trade execution failed: {e}")
-        trade.status = TradeStatus.FAILED
-        trade.settlement_data = {"error": str(e)}
-        
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Trade execution failed: {str(e)}"
-        )
+            for trade in trades
+        ],
+    )
 
 
 @router.post("/{trade_id}/cancel", response_model=TradeResponse)
@@ -222,12 +331,9 @@ async def cancel_trade(
     current_user: User = Depends(get_current_user),
 ):
     """
-    Cancel a pending trade.
+    Cancel an open order, leaving any fills it already has in place.
     """
-    result = await session.execute(
-        select(Trade).where(Trade.id == trade_id)
-    )
-    trade = result.scalar_one_or_none()
+    trade = await get_trade_by_id(session, trade_id)
     
     if not trade:
         raise HTTPException(
@@ -241,14 +347,24 @@ async def cancel_trade(
             detail="Not authorized to cancel this trade"
         )
     
+    if trade.order_id is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Fills cannot be cancelled"
+        )
+    
     if trade.status != TradeStatus.PENDING:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Cannot cancel trade with status {trade.status.value}"
         )
     
-    trade.status = TradeStatus.CANCELLED
-    trade.updated_at = datetime.utcnow()
+    if not await get_matching_engine().cancel(session, trade):
+        # Filled or cancelled since it was loaded
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Order is no longer open"
+        )
     
     logger.info(f"Trade cancelled: {trade_id}")
     
@@ -259,16 +375,18 @@ async def cancel_trade(
 
 @router.get("", response_model=TradeListResponse)
 async def list_trades(
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user),
     asset_id: Optional[str] = Query(None, description="Filter by asset"),
     trade_type: Optional[str] = Query(None, pattern="^(buy|sell)$"),
     status_filter: Optional[TradeStatus] = Query(None, alias="status"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page"),
+    with_total: bool = Query(True, description="Include the total count"),
 ):
     """
-    List trades for the current user.
+    List trades for the current user, newest first.
     """
     query = select(Trade).where(Trade.user_id == current_user.id)
     
@@ -280,38 +398,99 @@ async def list_trades(
         query = query.where(Trade.status == status_filter)
     
     # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await session.execute(count_query)).scalar() or 0
+    total = total_strategy = None
+    if with_total:
+        counted = await count_rows(session, query, Trade, {
+            "user_id": current_user.id,
+            "asset_id": asset_id,
+            "trade_type": trade_type,
+            "status": status_filter,
+        })
+        total, total_strategy = counted.total, counted.strategy.value
     
     # Apply pagination
-    query = query.order_by(Trade.created_at.desc())
-    offset = (page - 1) * page_size
-    query = query.offset(offset).limit(page_size)
-    
-    result = await session.execute(query)
-    trades = result.scalars().all()
+    try:
+        result = await paginate_keyset(
+            session,
+            query,
+            sort_column=Trade.created_at,
+            id_column=Trade.id,
+            sort_order="desc",
+            page_size=page_size,
+            cursor=cursor,
+            offset=(page - 1) * page_size,
+        )
+    except CursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     return TradeListResponse(
-        items=[TradeResponse.model_validate(t) for t in trades],
+        items=[TradeResponse.model_validate(t) for t in result.items],
         total=total,
+        total_strategy=total_strategy,
         page=page,
         page_size=page_size,
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor,
+    )
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_trades(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$", description="csv or ndjson"),
+    asset_id: Optional[str] = Query(None, description="Filter by asset"),
+    start: Optional[datetime] = Query(None, description="Earliest created_at (inclusive)"),
+    end: Optional[datetime] = Query(None, description="Latest created_at (exclusive)"),
+):
+    """
+    Download the current user's full trade history, oldest first.
+    
+    The file is streamed as it is read from a server-side cursor, so
+    exports of any size take one request and constant server memory. All
+    rows come from one consistent snapshot. If the stream is cut short by
+    an error the download ends early; compare row counts when it matters.
+    """
+    start, end = _naive_utc(start), _naive_utc(end)
+    if start and end and start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end"
+        )
+    
+    query = build_export_query(current_user.id, asset_id=asset_id, start=start, end=end)
+    user_id = current_user.id
+    
+    async def body():
+        # Opened here: the handler's dependencies close before the body is sent
+        async with open_read_session(request, analytics=True) as session:
+            try:
+                async for chunk in stream_export(session, query, export_format):
+                    yield chunk
+            except Exception as e:
+                logger.error(f"Trade export for {user_id} failed mid-stream: {e}")
+                raise
+    
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(export_format)}"'},
     )
 
 
 @router.get("/{trade_id}", response_model=TradeResponse)
 async def get_trade(
     trade_id: str,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user),
 ):
     """
     Get details of a specific trade.
     """
-    result = await session.execute(
-        select(Trade).where(Trade.id == trade_id)
-    )
-    trade = result.scalar_one_or_none()
+    trade = await get_trade_by_id(session, trade_id)
     
     if not trade:
         raise HTTPException(
@@ -333,16 +512,16 @@ async def get_trade(
 @router.get("/market/{asset_id}/stats", response_model=MarketStats)
 async def get_market_stats(
     asset_id: str,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
     Get market statistics for an asset.
+    
+    24h figures come from the in-memory rolling window and bid/ask from the
+    live order book, so apart from the asset lookup this reads no rows.
     """
     # Get asset
-    result = await session.execute(
-        select(RWAAsset).where(RWAAsset.id == asset_id)
-    )
-    asset = result.scalar_one_or_none()
+    asset = await get_asset_by_id(session, asset_id)
     
     if not asset:
         raise HTTPException(
@@ -350,27 +529,15 @@ async def get_market_stats(
             detail="Asset not found"
         )
     
-    # Calculate 24h stats
-    yesterday = datetime.utcnow() - timedelta(days=1)
-    
-    # Get trades in last 24h
-    trades_query = select(Trade).where(
-        Trade.asset_id == asset_id,
-        Trade.status == TradeStatus.COMPLETED,
-        Trade.created_at >= yesterday,
-    )
-    result = await session.execute(trades_query)
-    recent_trades = result.scalars().all()
-    
-    volume_24h = sum(t.total_amount for t in recent_trades)
-    total_trades_24h = len(recent_trades)
+    rolling = await get_market_stats_tracker().get(asset_id)
+    book = await get_matching_engine().snapshot(asset_id, depth=1)
     
-    # Calculate price change (simplified)
+    # Change from the last price before the window to the latest trade
     price_change_24h = 0.0
-    if recent_trades:
-        first_price = recent_trades[-1].price_per_unit if recent_trades else asset.price_per_unit
-        current_price = asset.price_per_unit
-        price_change_24h = current_price - first_price
+    price_change_percentage_24h = 0.0
+    if rolling.last is not None and rolling.reference_price:
+        price_change_24h = rolling.last - rolling.reference_price
+        price_change_percentage_24h = price_change_24h / rolling.reference_price * 100
     
     return MarketStats(
         asset_id=asset_id,
@@ -378,64 +545,48 @@ async def get_market_stats(
         symbol=asset.symbol,
         current_price=asset.price_per_unit,
         price_change_24h=price_change_24h,
-        price_change_percentage_24h=(
-            (price_change_24h / asset.price_per_unit * 100) 
-            if asset.price_per_unit > 0 else 0
-        ),
-        volume_24h=volume_24h,
-        total_trades_24h=total_trades_24h,
+        price_change_percentage_24h=price_change_percentage_24h,
+        open_24h=rolling.open,
+        high_24h=rolling.high,
+        low_24h=rolling.low,
+        volume_24h=rolling.volume,
+        total_trades_24h=rolling.trade_count,
         market_cap=asset.price_per_unit * asset.circulating_supply,
         circulating_supply=asset.circulating_supply,
         total_supply=asset.total_supply,
-        highest_bid=None,  # Would come from order book
-        lowest_ask=None,
+        highest_bid=book.bids[0].price if book.bids else None,
+        lowest_ask=book.asks[0].price if book.asks else None,
     )
 
 
 @router.get("/market/{asset_id}/orderbook", response_model=OrderBook)
 async def get_order_book(
     asset_id: str,
-    session: AsyncSession = Depends(get_session),
+    depth: int = Query(20, ge=1, le=100, description="Price levels per side"),
 ):
     """
-    Get the order book for an asset.
+    Get the aggregated order book for an asset.
+    
+    Served from the matching engine's in-memory book: one entry per price
+    level, best first, with cumulative totals. `sequence` increases with
+    every change to the book, so a client can tell whether it missed one.
     """
-    # Get pending trades (simplified order book)
-    buy_orders_query = select(Trade).where(
-        Trade.asset_id == asset_id,
-        Trade.status == TradeStatus.PENDING,
-        Trade.trade_type == "buy",
-    ).order_by(Trade.price_per_unit.desc())
-    
-    sell_orders_query = select(Trade).where(
-        Trade.asset_id == asset_id,
-        Trade.status == TradeStatus.PENDING,
-        Trade.trade_type == "sell",
-    ).order_by(Trade.price_per_unit.asc())
-    
-    buy_result = await session.execute(buy_orders_query)
-    sell_result = await session.execute(sell_orders_query)
-    
-    buy_orders = buy_result.scalars().all()
-    sell_orders = sell_result.scalars().all()
-    
-    # Build order book entries
-    def build_entries(orders: List[Trade]) -> List[OrderBookEntry]:
-        entries = []
-        cumulative = 0.0
-        for order in orders:
-            total = order.quantity * order.price_per_unit
-            cumulative += total
-            entries.append(OrderBookEntry(
-                price=order.price_per_unit,
-                quantity=order.quantity,
-                total=total,
-                cumulative=cumulative,
-            ))
-        return entries
-    
-    bids = build_entries(buy_orders)
-    asks = build_entries(sell_orders)
+    snapshot = await get_matching_engine().snapshot(asset_id, depth)
+    
+    def build_entries(levels) -> List[OrderBookEntry]:
+        return [
+            OrderBookEntry(
+                price=level.price,
+                quantity=level.quantity,
+                orders=level.orders,
+                total=level.total,
+                cumulative=level.cumulative,
+            )
+            for level in levels
+        ]
+    
+    bids = build_entries(snapshot.bids)
+    asks = build_entries(snapshot.asks)
     
     # Calculate spread
     highest_bid = bids[0].price if bids else 0
@@ -449,5 +600,59 @@ async def get_order_book(
         asks=asks,
         spread=spread,
         spread_percentage=spread_percentage,
+        sequence=snapshot.sequence,
         last_updated=datetime.utcnow(),
     )
+
+
+@router.get("/market/{asset_id}/history", response_model=PriceHistoryResponse)
+async def get_price_history(
+    asset_id: str,
+    interval: str = Query("1h", pattern="^(1m|1h|4h|1d|1w)$", description="Candle interval"),
+    start: Optional[datetime] = Query(None, description="Earliest candle start (default: `limit` candles back)"),
+    end: Optional[datetime] = Query(None, description="Latest candle start (default: now)"),
+    limit: int = Query(500, ge=1, le=5000, description="Maximum candles; the most recent are kept"),
+    session: AsyncSession = Depends(get_read_session),
+):
+    """
+    Get OHLCV candles for an asset, oldest first.
+    
+    Candles are rolled up from completed trades about once a minute, so
+    the newest one may lag slightly. Volume is traded value in QUBIC.
+    """
+    start, end = _naive_utc(start), _naive_utc(end)
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(seconds=INTERVAL_SECONDS[interval] * limit)
+    
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must not be after end"
+        )
+    
+    # Primary key range scan; newest first so the limit keeps the latest candles
+    result = await session.execute(
+        select(PriceCandle).where(
+            PriceCandle.asset_id == asset_id,
+            PriceCandle.timeframe == interval,
+            PriceCandle.bucket_start >= start,
+            PriceCandle.bucket_start <= end,
+        ).order_by(PriceCandle.bucket_start.desc()).limit(limit)
+    )
+    candles = result.scalars().all()
+    
+    return PriceHistoryResponse(
+        asset_id=asset_id,
+        interval=interval,
+        data=[
+            PriceHistory(
+                timestamp=candle.bucket_start,
+                open=candle.open,
+                high=candle.high,
+                low=candle.low,
+                close=candle.close,
+                volume=candle.volume,
+            )
+            for candle in reversed(candles)
+        ],
+    )
@@ -3,15 +3,16 @@ User Management API Routes
 Endpoints for user profile, settings, and wallet management
 """
 
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Row, select
 
-from app.db.database import get_session
-from app.db.models import User
+from app.db.database import get_session, get_read_session
+from app.db.repository import get_user_by_clerk_id, get_user_by_id as load_user_by_id
+from app.db.models import Holding, RWAAsset, User
 from app.models.user import (
     UserProfile,
     UserProfileUpdate,
@@ -20,9 +21,12 @@ from app.models.user import (
     UserSettings,
     UserSettingsUpdate,
     UserStatsResponse,
+    HoldingResponse,
+    PortfolioResponse,
     ClerkWebhookPayload,
 )
 from app.api.v1.deps import get_current_user
+from app.services.market_stats import get_market_stats_tracker
 from app.core.config import settings
 from app.core.logging import get_logger
 
@@ -63,27 +67,29 @@ async def update_current_user_profile(
     """
     Update the current user's profile.
     """
+    # Authenticated through a read-only session; change the row through this one
+    user = await load_user_by_id(session, current_user.id)
     if update_data.name is not None:
-        current_user.name = update_data.name
+        user.name = update_data.name
     
     if update_data.avatar_url is not None:
-        current_user.avatar_url = update_data.avatar_url
+        user.avatar_url = update_data.avatar_url
     
-    current_user.updated_at = datetime.utcnow()
+    user.updated_at = datetime.utcnow()
     
     logger.info(f"User profile updated: {current_user.id}")
     
     return UserProfile(
         id=current_user.id,
-        clerk_id=current_user.clerk_id,
-        email=current_user.email,
-        name=current_user.name,
-        avatar_url=current_user.avatar_url,
-        qubic_public_key=current_user.qubic_public_key,
-        is_verified=current_user.is_verified,
-        is_admin=current_user.is_admin,
-        created_at=current_user.created_at,
-        wallet_connected=bool(current_user.qubic_public_key),
+        clerk_id=user.clerk_id,
+        email=user.email,
+        name=user.name,
+        avatar_url=user.avatar_url,
+        qubic_public_key=user.qubic_public_key,
+        is_verified=user.is_verified,
+        is_admin=user.is_admin,
+        created_at=user.created_at,
+        wallet_connected=bool(user.qubic_public_key),
     )
 
 
@@ -127,13 +133,14 @@ async def connect_wallet(
     #     wallet_data.message
     # )
     
-    current_user.qubic_public_key = wallet_data.qubic_public_key
-    current_user.updated_at = datetime.utcnow()
+    user = await load_user_by_id(session, current_user.id)
+    user.qubic_public_key = wallet_data.qubic_public_key
+    user.updated_at = datetime.utcnow()
     
     logger.info(f"Wallet connected for user {current_user.id}: {wallet_data.qubic_public_key[:16]}...")
     
     return UserWalletResponse(
-        qubic_public_key=current_user.qubic_public_key,
+        qubic_public_key=user.qubic_public_key,
         connected_at=datetime.utcnow(),
         message="Wallet connected successfully",
     )
@@ -147,14 +154,15 @@ async def disconnect_wallet(
     """
     Disconnect the Qubic wallet from the user's account.
     """
-    if not current_user.qubic_public_key:
+    user = await load_user_by_id(session, current_user.id)
+    if not user.qubic_public_key:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No wallet connected"
         )
     
-    current_user.qubic_public_key = None
-    current_user.updated_at = datetime.utcnow()
+    user.qubic_public_key = None
+    user.updated_at = datetime.utcnow()
     
     logger.info(f"Wallet disconnected for user {current_user.id}")
     
@@ -225,51 +233,97 @@ async def update_user_settings(
 
 # ==================== User Statistics ====================
 
-@router.get("/me/stats", response_model=UserStatsResponse)
-async def get_user_stats(
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
-):
+async def _load_positions(session: AsyncSession, user_id: str) -> List[Row]:
+    """The user's ledger rows with asset details, closed positions included: one primary key range scan."""
+    result = await session.execute(
+        select(Holding, RWAAsset.symbol, RWAAsset.name, RWAAsset.price_per_unit)
+        .join(RWAAsset, RWAAsset.id == Holding.asset_id)
+        .where(Holding.user_id == user_id)
+    )
+    return list(result.all())
+
+
+async def _value_portfolio(positions: List[Row]) -> PortfolioResponse:
     """
-    Get the current user's trading and activity statistics.
+    Value ledger rows from _load_positions.
+    
+    Prices come from the in-memory 24h market stats, falling back to the
+    listing price.
     """
-    from app.db.models import RWAAsset, Trade, NostromoProposal
-    from sqlalchemy import func
+    tracker = get_market_stats_tracker()
     
-    # Count assets owned
-    assets_count = (await session.execute(
-        select(func.count()).select_from(RWAAsset).where(
-            RWAAsset.owner_id == current_user.id
-        )
-    )).scalar() or 0
+    holdings = []
+    realized_pnl = 0.0
+    for holding, symbol, name, listing_price in positions:
+        realized_pnl += holding.realized_pnl
+        if not holding.quantity and not holding.reserved_quantity:
+            continue  # closed position; only its realized P&L counts
+        stats = await tracker.get(holding.asset_id)
+        market_price = stats.last if stats.last is not None else listing_price
+        market_value = holding.quantity * market_price
+        holdings.append(HoldingResponse(
+            asset_id=holding.asset_id,
+            symbol=symbol,
+            name=name,
+            quantity=holding.quantity,
+            reserved_quantity=holding.reserved_quantity,
+            available_quantity=max(holding.quantity - holding.reserved_quantity, 0),
+            cost_basis=holding.cost_basis,
+            average_cost=holding.cost_basis / holding.quantity if holding.quantity else 0.0,
+            market_price=market_price,
+            market_value=market_value,
+            unrealized_pnl=market_value - holding.cost_basis,
+            realized_pnl=holding.realized_pnl,
+            # At today's quantity, from the price 24h ago
+            pnl_24h=holding.quantity * (market_price - stats.reference_price) if stats.reference_price else 0.0,
+        ))
     
-    # Count trades
-    trades_count = (await session.execute(
-        select(func.count()).select_from(Trade).where(
-            Trade.user_id == current_user.id
-        )
-    )).scalar() or 0
+    return PortfolioResponse(
+        holdings=holdings,
+        total_value=sum(h.market_value for h in holdings),
+        total_cost_basis=sum(h.cost_basis for h in holdings),
+        unrealized_pnl=sum(h.unrealized_pnl for h in holdings),
+        realized_pnl=realized_pnl,
+        pnl_24h=sum(h.pnl_24h for h in holdings),
+    )
+
+
+@router.get("/me/portfolio", response_model=PortfolioResponse)
+async def get_portfolio(
+    session: AsyncSession = Depends(get_read_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Get the current user's positions with cost basis and P&L.
     
-    # Calculate total trade volume
-    total_volume = (await session.execute(
-        select(func.sum(Trade.total_amount)).where(
-            Trade.user_id == current_user.id
-        )
-    )).scalar() or 0
+    Positions are updated as fills settle, so units bought in a fill that
+    is still settling are not included yet.
+    """
+    return await _value_portfolio(await _load_positions(session, current_user.id))
+
+
+@router.get("/me/stats", response_model=UserStatsResponse)
+async def get_user_stats(
+    session: AsyncSession = Depends(get_read_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Get the current user's trading statistics.
     
-    # Count proposals
-    proposals_count = (await session.execute(
-        select(func.count()).select_from(NostromoProposal).where(
-            NostromoProposal.proposer_id == current_user.id
-        )
-    )).scalar() or 0
+    Read from the holdings ledger in one query; trades and volume count
+    completed fills, closed positions included.
+    """
+    positions = await _load_positions(session, current_user.id)
+    portfolio = await _value_portfolio(positions)
     
+    cost_basis = portfolio.total_cost_basis
     return UserStatsResponse(
-        total_assets_owned=assets_count,
-        total_trades=trades_count,
-        total_volume=float(total_volume) if total_volume else 0,
-        total_proposals=proposals_count,
-        member_since=current_user.created_at,
+        total_assets=sum(1 for h in portfolio.holdings if h.quantity),
+        total_trades=sum(holding.trade_count for holding, *_ in positions),
+        total_volume=sum(holding.traded_volume for holding, *_ in positions),
+        portfolio_value=portfolio.total_value,
+        pnl_24h=portfolio.pnl_24h,
+        pnl_percentage=portfolio.unrealized_pnl / cost_basis * 100 if cost_basis else 0.0,
     )
 
 
@@ -311,10 +365,7 @@ async def clerk_webhook(
             
         elif event_type == "user.updated":
             # Update existing user
-            result = await session.execute(
-                select(User).where(User.clerk_id == data.get("id"))
-            )
-            user = result.scalar_one_or_none()
+            user = await get_user_by_clerk_id(session, data.get("id"))
             
             if user:
                 user.email = data.get("email_addresses", [{}])[0].get("email_address", user.email)
@@ -325,10 +376,7 @@ async def clerk_webhook(
                 
         elif event_type == "user.deleted":
             # Soft delete user (mark as inactive)
-            result = await session.execute(
-                select(User).where(User.clerk_id == data.get("id"))
-            )
-            user = result.scalar_one_or_none()
+            user = await get_user_by_clerk_id(session, data.get("id"))
             
             if user:
                 user.is_active = False
@@ -350,7 +398,7 @@ async def clerk_webhook(
 @router.get("/{user_id}", response_model=UserProfile)
 async def get_user_by_id(
     user_id: str,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -362,10 +410,7 @@ async def get_user_by_id(
             detail="Not authorized to view this user"
         )
     
-    result = await session.execute(
-        select(User).where(User.id == user_id)
-    )
-    user = result.scalar_one_or_none()
+    user = await load_user_by_id(session, user_id)
     
     if not user:
         raise HTTPException(
@@ -0,0 +1,66 @@
+"""
+VeriAssets Background Tasks
+Periodic jobs run inside the API process
+"""
+
+from typing import Awaitable, Callable, Optional
+import asyncio
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class PeriodicTask:
+    """
+    Runs a coroutine function every `interval_seconds` until stopped.
+
+    A failing run is logged and retried on the next tick; runs never
+    overlap. trigger() starts the next run early. An interval of 0
+    disables the task, for deployments that schedule the job externally.
+    """
+
+    def __init__(self, name: str, func: Callable[[], Awaitable[object]], interval_seconds: float):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.func()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Background task {self.name} failed: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def trigger(self) -> None:
+        """Run as soon as the current run (or wait) is over."""
+        self._wake.set()
+
+    def start(self) -> None:
+        if self.interval_seconds <= 0 or self.running:
+            return
+        self._task = asyncio.create_task(self._run(), name=self.name)
+        logger.info(f"Background task {self.name} started (every {self.interval_seconds:g}s)")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
@@ -4,7 +4,7 @@ Centralized configuration management using Pydantic Settings
 """
 
 from functools import lru_cache
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, field_validator
 import json
@@ -37,6 +37,164 @@ class Settings(BaseSettings):
         description="Sync database URL for migrations"
     )
     
+    # Database Connection Pool
+    database_engine_mode: Literal["pooled", "serverless"] = Field(
+        default="pooled",
+        description="pooled keeps a long-lived connection pool; serverless opens a connection per session (NullPool)"
+    )
+    database_pool_size: int = Field(default=10, ge=1, description="Persistent connections per worker")
+    database_max_overflow: int = Field(default=5, ge=0, description="Extra connections per worker under burst load")
+    database_pool_timeout: float = Field(default=10.0, gt=0, description="Seconds to wait for a free connection")
+    database_pool_recycle: int = Field(default=1800, description="Recycle connections older than N seconds (-1 disables)")
+    database_pool_pre_ping: bool = Field(default=True, description="Test connections for liveness on checkout")
+    database_pool_workers: int = Field(default=1, ge=1, description="Worker processes sharing the connection budget")
+    database_max_connections: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Total connection budget across all workers; overrides pool size/overflow when set"
+    )
+    database_statement_cache_size: int = Field(
+        default=500,
+        ge=0,
+        description="asyncpg prepared statements kept per pooled connection (0 disables)"
+    )
+    database_query_cache_size: int = Field(
+        default=1200,
+        ge=0,
+        description="Compiled SQL strings kept by SQLAlchemy per engine"
+    )
+    
+    # Read Replicas
+    database_replica_urls: List[str] = Field(
+        default=[],
+        description="Async read replica URLs for read-only endpoints"
+    )
+    database_replica_max_lag_seconds: float = Field(
+        default=5.0,
+        description="Replicas lagging further behind the primary are skipped"
+    )
+    database_replica_lag_check_seconds: float = Field(
+        default=5.0,
+        description="How often each replica's replication lag is re-checked"
+    )
+    database_read_your_writes_seconds: float = Field(
+        default=10.0,
+        description="Pin a client's reads to the primary for N seconds after it writes"
+    )
+    database_analytics_deferrable: bool = Field(
+        default=True,
+        description="Run analytics reads on the primary as SERIALIZABLE READ ONLY DEFERRABLE"
+    )
+    
+    # List Totals
+    list_count_exact_threshold: int = Field(
+        default=5000,
+        description="Results the planner expects to exceed this size get an estimated total"
+    )
+    list_count_cache_ttl_seconds: float = Field(
+        default=30.0,
+        description="How long a list total is reused for the same filters (0 disables)"
+    )
+    
+    # Bulk Import
+    bulk_import_batch_size: int = Field(
+        default=500,
+        ge=1,
+        le=1500,
+        description="Rows per multi-row INSERT; kept under the driver's bind parameter limit"
+    )
+    
+    # Price Candles
+    candle_rollup_interval_seconds: float = Field(
+        default=60.0,
+        ge=0,
+        description="How often completed trades are folded into candles (0 disables the in-process task)"
+    )
+    candle_rollup_overlap_seconds: float = Field(
+        default=120.0,
+        ge=0,
+        description="Re-aggregate this far behind the newest candle to catch trades committed late"
+    )
+    
+    # Settlement Worker
+    settlement_worker_interval_seconds: float = Field(
+        default=2.0,
+        ge=0,
+        description="How often queued fills are submitted and confirmed (0 disables the in-process worker)"
+    )
+    settlement_batch_size: int = Field(
+        default=200,
+        ge=1,
+        description="Fills claimed per worker pass"
+    )
+    settlement_max_attempts: int = Field(
+        default=8,
+        ge=1,
+        description="Submissions of a fill before it is marked failed"
+    )
+    settlement_retry_backoff_seconds: float = Field(
+        default=2.0,
+        ge=0,
+        description="First retry delay; doubles with each attempt up to five minutes"
+    )
+    
+    # Idempotency Keys
+    idempotency_key_ttl_seconds: int = Field(
+        default=86400,
+        ge=60,
+        description="How long a stored response is replayed for its Idempotency-Key"
+    )
+    idempotency_wait_seconds: float = Field(
+        default=10.0,
+        ge=0,
+        description="How long a duplicate waits for the in-flight original before getting 409"
+    )
+    idempotency_lock_seconds: float = Field(
+        default=60.0,
+        ge=1,
+        description="After this an unfinished key is presumed abandoned and may be reclaimed"
+    )
+    
+    # Trade Export
+    trade_export_batch_size: int = Field(
+        default=1000,
+        ge=1,
+        le=50000,
+        description="Rows fetched per server-side cursor round trip and written per chunk"
+    )
+    
+    # Trade Analytics
+    trade_analytics_batch_size: int = Field(
+        default=50000,
+        ge=1,
+        le=500000,
+        description="Rows fetched per server-side cursor round trip when loading trade arrays"
+    )
+    trade_analytics_max_assets: int = Field(
+        default=100,
+        ge=1,
+        description="Most assets one batch analytics request may ask for"
+    )
+    
+    # Market Analytics Snapshot
+    market_analytics_refresh_seconds: float = Field(
+        default=15.0,
+        ge=0,
+        description="How often GET /stats/market is recomputed in the background (0 disables the task)"
+    )
+    market_analytics_max_age_seconds: float = Field(
+        default=60.0,
+        gt=0,
+        description="Oldest snapshot served; a read past this recomputes it first"
+    )
+    
+    # Launchpad Stats Cache
+    launchpad_stats_max_age_seconds: float = Field(
+        default=300.0,
+        gt=0,
+        description="Oldest cached GET /nostromo/stats served; proposal writes in this process invalidate it at once"
+    )
+    
     # Clerk Authentication
     clerk_secret_key: str = Field(default="", description="Clerk secret key")
     clerk_publishable_key: str = Field(default="", description="Clerk publishable key")
@@ -87,14 +245,14 @@ class Settings(BaseSettings):
     # Logging
     log_level: str = Field(default="INFO", description="Logging level")
     
-    @field_validator("cors_origins", mode="before")
+    @field_validator("cors_origins", "database_replica_urls", mode="before")
     @classmethod
-    def parse_cors_origins(cls, v):
+    def parse_list(cls, v):
         if isinstance(v, str):
             try:
                 return json.loads(v)
             except json.JSONDecodeError:
-                return [origin.strip() for origin in v.split(",")]
+                return [item.strip() for item in v.split(",") if item.strip()]
         return v
     
     @property
@@ -0,0 +1,136 @@
+"""
+VeriAssets Snapshots
+Expensive read-only results recomputed in the background and served from memory
+"""
+
+from datetime import datetime
+from typing import Any, AsyncContextManager, Awaitable, Callable, Generic, Optional, TypeVar
+import asyncio
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.background import PeriodicTask
+from app.core.logging import get_logger
+from app.db.database import open_read_session
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Session.info key for the snapshots a transaction's writes make stale
+_STALE_ON_COMMIT = "stale_snapshots"
+
+
+class Snapshot(Generic[T]):
+    """
+    The latest result of `loader`, kept in process memory.
+
+    `task` recomputes it every refresh_seconds; add it to the app's
+    background tasks. get() serves the held value while it is younger than
+    max_age_seconds and otherwise recomputes it first, so a stalled or
+    disabled task makes reads slower but never staler than the bound.
+    Concurrent recomputes are collapsed into one. Each process holds its
+    own copy.
+
+    For values that only change on known writes, leave refresh_seconds at
+    0 and call invalidate_on_commit() from the writers instead, and set
+    on_primary: a replica may not have the write yet when the value is
+    reloaded, and the stale result would be held for max_age_seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[AsyncSession], Awaitable[T]],
+        max_age_seconds: float,
+        refresh_seconds: float = 0,
+        on_primary: bool = False,
+    ):
+        self.name = name
+        self.loader = loader
+        self.max_age_seconds = max_age_seconds
+        # One consistent read-only snapshot, on a replica when there is one
+        # unless the value must reflect the write that invalidated it
+        self.session_maker: Callable[[], AsyncContextManager[Any]] = lambda: open_read_session(
+            analytics=True, primary=on_primary
+        )
+        self.task = PeriodicTask(name, self.refresh, refresh_seconds)
+        self.value: Optional[T] = None
+        self.updated_at: Optional[datetime] = None
+        self._loaded_at = float("-inf")
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def age_seconds(self) -> float:
+        return time.monotonic() - self._loaded_at
+
+    def reset(self) -> None:
+        """Forget the held value so the next read recomputes it."""
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """
+        Drop the held value after a write made it wrong.
+
+        A recompute already in flight may have read from before the write,
+        so its result is returned to its caller but not kept.
+        """
+        self._generation += 1
+        self.value = None
+        self.updated_at = None
+        self._loaded_at = float("-inf")
+
+    def _fresh(self, max_age_seconds: float) -> bool:
+        return self.value is not None and self.age_seconds <= max_age_seconds
+
+    async def get(self, max_age_seconds: Optional[float] = None) -> T:
+        """The held value, recomputed first if it is older than the bound."""
+        max_age_seconds = self.max_age_seconds if max_age_seconds is None else max_age_seconds
+        if self._fresh(max_age_seconds):
+            return self.value
+        async with self._lock:
+            # Whoever held the lock may have just refreshed it
+            if self._fresh(max_age_seconds):
+                return self.value
+            return await self._load()
+
+    async def refresh(self) -> T:
+        """Recompute now, whatever the age of the held value."""
+        async with self._lock:
+            return await self._load()
+
+    async def _load(self) -> T:
+        started = time.monotonic()
+        generation = self._generation
+        async with self.session_maker() as session:
+            value = await self.loader(session)
+        if generation != self._generation:
+            logger.debug(f"Snapshot {self.name} invalidated while loading; not kept")
+            return value
+        self.value = value
+        self.updated_at = datetime.utcnow()
+        self._loaded_at = time.monotonic()
+        logger.debug(f"Snapshot {self.name} refreshed in {(self._loaded_at - started) * 1000:.0f}ms")
+        return value
+
+
+# ==================== Invalidation ====================
+
+def invalidate_on_commit(session: AsyncSession, *snapshots: Snapshot) -> None:
+    """Invalidate the snapshots once the session's current transaction commits."""
+    session.info.setdefault(_STALE_ON_COMMIT, set()).update(snapshots)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):  # type: ignore[no-untyped-def]
+    for snapshot in session.info.pop(_STALE_ON_COMMIT, ()):
+        snapshot.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session):  # type: ignore[no-untyped-def]
+    session.info.pop(_STALE_ON_COMMIT, None)
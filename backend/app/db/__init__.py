@@ -7,6 +7,10 @@ from app.db.database import (
     async_session_maker,
     init_db,
     get_session,
+    get_read_session,
+    get_analytics_session,
+    ReadOnlySessionError,
+    get_pool_stats,
     close_db,
 )
 from app.db.models import (
@@ -16,6 +20,10 @@ from app.db.models import (
     Trade,
     NostromoProposal,
     EasyConnectEvent,
+    PriceCandle,
+    IdempotencyKey,
+    Holding,
+    AssetVolumeBucket,
     AssetType,
     AssetStatus,
     VerificationStatus,
@@ -28,6 +36,10 @@ __all__ = [
     "async_session_maker",
     "init_db",
     "get_session",
+    "get_read_session",
+    "get_analytics_session",
+    "ReadOnlySessionError",
+    "get_pool_stats",
     "close_db",
     "User",
     "RWAAsset",
@@ -35,6 +47,10 @@ __all__ = [
     "Trade",
     "NostromoProposal",
     "EasyConnectEvent",
+    "PriceCandle",
+    "IdempotencyKey",
+    "Holding",
+    "AssetVolumeBucket",
     "AssetType",
     "AssetStatus",
     "VerificationStatus",
@@ -0,0 +1,141 @@
+"""
+VeriAssets Count Strategies
+Exact, planner-estimated and cached totals for paginated list endpoints
+"""
+
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, Hashable, Optional, Tuple
+import json
+
+from sqlalchemy import Select, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlmodel import SQLModel
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class CountStrategy(str, Enum):
+    """How a list total was obtained"""
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    CACHED = "cached"
+
+
+@dataclass
+class CountResult:
+    total: int
+    strategy: CountStrategy
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) wrapper that keeps the wrapped statement's bind parameters."""
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw) -> str:  # type: ignore[no-untyped-def]
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+# Totals keyed by (table, normalized filters); shared by all list endpoints
+_count_cache: TTLCache[int] = TTLCache(ttl_seconds=settings.list_count_cache_ttl_seconds)
+
+
+def count_cache_key(table: str, filters: Dict[str, Any]) -> Tuple[Hashable, ...]:
+    """
+    Build a cache key from the filters that shaped a list query.
+
+    Unset filters are dropped and the rest sorted, so the same filter set
+    hits the same entry whatever order or defaults the request used.
+    """
+    normalized = []
+    for name, value in filters.items():
+        if value is None or value == "":
+            continue
+        if isinstance(value, Enum):
+            value = value.value
+        normalized.append((name, str(value)))
+    return (table, tuple(sorted(normalized)))
+
+
+async def _planner_estimate(
+    session: AsyncSession,
+    query: Select,
+    table: str,
+    filtered: bool,
+) -> Optional[int]:
+    """
+    Ask Postgres how many rows it expects the query to return.
+
+    Unfiltered scans read pg_class.reltuples; filtered ones use the row
+    estimate of the top plan node from EXPLAIN. Returns None when no
+    estimate is available (other dialects, never-analyzed tables).
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        return None
+
+    try:
+        # Savepoint so a failed EXPLAIN does not abort the request's transaction
+        async with session.begin_nested():
+            if not filtered:
+                reltuples = (await session.execute(
+                    text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)"),
+                    {"table": table},
+                )).scalar()
+                # -1 means the table has never been vacuumed or analyzed
+                if reltuples is None or reltuples < 0:
+                    return None
+                return int(reltuples)
+
+            plan = (await session.execute(Explain(query))).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.debug(f"Row estimate unavailable for {table}: {e}")
+        return None
+
+
+async def count_rows(
+    session: AsyncSession,
+    query: Select,
+    model: type[SQLModel],
+    filters: Dict[str, Any],
+) -> CountResult:
+    """
+    Get the total for a filtered list query using the cheapest adequate strategy.
+
+    Recent totals for the same filter set are served from a short-TTL
+    cache. Otherwise, when the planner expects more rows than
+    list_count_exact_threshold the estimate is returned as is; smaller
+    results are counted exactly.
+    """
+    table = model.__tablename__
+    key = count_cache_key(table, filters)
+
+    cached = _count_cache.get(key)
+    if cached is not None:
+        return CountResult(cached, CountStrategy.CACHED)
+
+    filtered = bool(key[1])
+    estimate = await _planner_estimate(session, query, table, filtered)
+    if estimate is not None and estimate >= settings.list_count_exact_threshold:
+        result = CountResult(estimate, CountStrategy.ESTIMATE)
+    else:
+        count_query = select(func.count()).select_from(query.subquery())
+        total = (await session.execute(count_query)).scalar() or 0
+        result = CountResult(total, CountStrategy.EXACT)
+
+    _count_cache.set(key, result.total)
+    return result
+
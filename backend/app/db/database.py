@@ -3,23 +3,33 @@ VeriAssets Database Configuration
 SQLModel with async support for Neon Postgres
 """
 
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, AsyncContextManager, AsyncGenerator, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import itertools
+import ssl
+import time
+
+from fastapi import Request
 from sqlmodel import SQLModel
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from app.core.config import settings
 from app.core.logging import get_logger
-import ssl
 
 logger = get_logger(__name__)
 
 
-def get_database_url() -> str:
+def get_database_url(db_url: Optional[str] = None) -> str:
     """
     Get the database URL with proper SSL handling for asyncpg.
     asyncpg doesn't support sslmode in the URL, so we need to clean it.
     """
-    db_url = settings.database_url
+    db_url = db_url or settings.database_url
     # Remove sslmode and channel_binding from URL as asyncpg handles these differently
     if "?" in db_url:
         base_url = db_url.split("?")[0]
@@ -27,23 +37,149 @@ def get_database_url() -> str:
     return db_url
 
 
-def get_connect_args() -> dict:
-    """Get connection arguments for asyncpg with SSL support."""
-    # Create SSL context for secure connection to Neon
+@lru_cache()
+def get_ssl_context() -> ssl.SSLContext:
+    """
+    Build the SSL context for Neon once per process.
+
+    Loading the default CA bundle is expensive, so every engine and every
+    new pooled connection reuses the same context.
+    """
     ssl_context = ssl.create_default_context()
     ssl_context.check_hostname = False
     ssl_context.verify_mode = ssl.CERT_NONE
-    return {"ssl": ssl_context}
+    return ssl_context
 
 
-# Create async engine for Neon (use NullPool for serverless)
-engine = create_async_engine(
-    get_database_url(),
-    echo=settings.app_debug,
-    poolclass=NullPool,  # Required for serverless Postgres like Neon
-    future=True,
-    connect_args=get_connect_args(),
-)
+def get_connect_args(db_url: Optional[str] = None) -> dict:
+    """Get connection arguments for asyncpg with SSL support."""
+    connect_args: Dict[str, Any] = {"ssl": get_ssl_context()}
+    if "+asyncpg" in (db_url or settings.database_url):
+        # Per-connection LRU of prepared statements. It lives as long as the
+        # pooled connection, so hot queries are parsed and planned once per
+        # connection rather than once per request (lost with NullPool).
+        connect_args["prepared_statement_cache_size"] = settings.database_statement_cache_size
+    return connect_args
+
+
+# ==================== Connection Pool ====================
+
+@dataclass
+class PoolStats:
+    """Counters collected from the connection pool for sizing decisions."""
+    connects: int = 0
+    checkouts: int = 0
+    checkins: int = 0
+    invalidations: int = 0
+    waits: int = 0
+    timeouts: int = 0
+    total_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+
+    # Checkouts faster than this are served from idle connections, not queued
+    WAIT_THRESHOLD_MS = 1.0
+
+    def record_wait(self, elapsed_ms: float) -> None:
+        if elapsed_ms >= self.WAIT_THRESHOLD_MS:
+            self.waits += 1
+            self.total_wait_ms += elapsed_ms
+            self.max_wait_ms = max(self.max_wait_ms, elapsed_ms)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):  # type: ignore[no-untyped-def]
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.record_wait((time.perf_counter() - start) * 1000)
+
+
+def get_pool_sizing() -> Tuple[int, int]:
+    """
+    Resolve (pool_size, max_overflow) for this worker.
+
+    When a total connection budget is configured it is split evenly across
+    workers so that every process together stays under the server limit.
+    """
+    if not settings.database_max_connections:
+        return settings.database_pool_size, settings.database_max_overflow
+
+    per_worker = max(1, settings.database_max_connections // settings.database_pool_workers)
+    max_overflow = min(settings.database_max_overflow, per_worker // 4)
+    return per_worker - max_overflow, max_overflow
+
+
+def get_engine_options() -> Dict[str, Any]:
+    """Get pool options for the configured engine mode."""
+    if settings.database_engine_mode == "serverless":
+        # Every session opens its own connection - required behind
+        # scale-to-zero Postgres where idle connections are killed
+        return {"poolclass": NullPool}
+
+    pool_size, max_overflow = get_pool_sizing()
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.database_pool_timeout,
+        "pool_recycle": settings.database_pool_recycle,
+        "pool_pre_ping": settings.database_pool_pre_ping,
+        # LIFO keeps a small hot set of connections and lets the rest idle out
+        "pool_use_lifo": True,
+    }
+
+
+def _instrument_pool(async_engine: AsyncEngine) -> None:
+    """Attach connection lifecycle counters to a pooled engine."""
+    pool = async_engine.sync_engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return
+
+    stats = pool.stats
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):  # type: ignore[no-untyped-def]
+        stats.connects += 1
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):  # type: ignore[no-untyped-def]
+        stats.checkouts += 1
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):  # type: ignore[no-untyped-def]
+        stats.checkins += 1
+
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):  # type: ignore[no-untyped-def]
+        stats.invalidations += 1
+
+
+def create_engine_for(db_url: str) -> AsyncEngine:
+    """Create an async engine with the shared pool and SSL configuration."""
+    async_engine = create_async_engine(
+        get_database_url(db_url),
+        echo=settings.app_debug,
+        future=True,
+        connect_args=get_connect_args(db_url),
+        query_cache_size=settings.database_query_cache_size,
+        **get_engine_options(),
+    )
+    _instrument_pool(async_engine)
+    return async_engine
+
+
+# Create async engine for Neon (pooled by default, NullPool in serverless mode)
+engine = create_engine_for(settings.database_url)
 
 # Create async session factory
 async_session_maker = async_sessionmaker(
@@ -55,12 +191,153 @@ async_session_maker = async_sessionmaker(
 )
 
 
+# ==================== Read Replicas ====================
+
+# Cookie set on responses to write requests; while it is in the future the
+# client's reads are served by the primary so it always sees its own writes
+READ_YOUR_WRITES_COOKIE = "va_primary_until"
+READ_CONSISTENCY_HEADER = "X-Read-Consistency"
+
+# Zero when the replica has replayed everything it received, otherwise the
+# age of the last replayed transaction
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class Replica:
+    """A read replica engine with its last observed replication lag."""
+
+    def __init__(self, db_url: str):
+        self.engine = create_engine_for(db_url)
+        self.session_maker = async_sessionmaker(
+            self.engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autocommit=False,
+            autoflush=False,
+        )
+        self.lag_seconds: float = 0.0
+        self.checked_at: float = float("-inf")
+        self.healthy: bool = True
+        self._lock = asyncio.Lock()
+
+    async def refresh_lag(self) -> None:
+        """Re-check replication lag if the last probe is older than the check interval."""
+        if time.monotonic() - self.checked_at < settings.database_replica_lag_check_seconds:
+            return
+
+        async with self._lock:
+            # Another request may have probed while we waited for the lock
+            if time.monotonic() - self.checked_at < settings.database_replica_lag_check_seconds:
+                return
+            try:
+                async with self.engine.connect() as conn:
+                    lag = (await conn.execute(REPLICA_LAG_SQL)).scalar()
+                self.lag_seconds = float(lag or 0)
+                self.healthy = True
+            except Exception as e:
+                logger.warning(f"Replica lag check failed: {e}")
+                self.healthy = False
+            finally:
+                self.checked_at = time.monotonic()
+
+    @property
+    def usable(self) -> bool:
+        return self.healthy and self.lag_seconds <= settings.database_replica_max_lag_seconds
+
+
+class ReplicaRouter:
+    """Round-robins reads across replicas, falling back to the primary."""
+
+    def __init__(self, replica_urls: List[str]):
+        self.replicas = [Replica(url) for url in replica_urls]
+        self._cycle = itertools.cycle(range(len(self.replicas))) if self.replicas else None
+
+    async def select(self) -> async_sessionmaker:
+        """Get the session factory of the next usable replica, or the primary."""
+        if self._cycle is None:
+            return async_session_maker
+
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._cycle)]
+            await replica.refresh_lag()
+            if replica.usable:
+                return replica.session_maker
+
+        logger.warning("No replica within lag budget, reading from primary")
+        return async_session_maker
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+replica_router = ReplicaRouter(settings.database_replica_urls)
+
+
+def requires_primary(request: Request) -> bool:
+    """Check whether this request must read from the primary."""
+    if request.headers.get(READ_CONSISTENCY_HEADER, "").lower() == "strong":
+        return True
+
+    pinned_until = request.cookies.get(READ_YOUR_WRITES_COOKIE)
+    try:
+        return pinned_until is not None and float(pinned_until) > time.time()
+    except ValueError:
+        return False
+
+
+def _engine_pool_stats(async_engine: AsyncEngine) -> Dict[str, Any]:
+    """Get a snapshot of connection pool usage for one engine."""
+    pool = async_engine.sync_engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return {"mode": settings.database_engine_mode, "pooled": False}
+
+    stats = pool.stats
+    return {
+        "mode": settings.database_engine_mode,
+        "pooled": True,
+        "pool_size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "connects": stats.connects,
+        "checkouts": stats.checkouts,
+        "checkins": stats.checkins,
+        "invalidations": stats.invalidations,
+        "waits": stats.waits,
+        "timeouts": stats.timeouts,
+        "avg_wait_ms": round(stats.total_wait_ms / stats.waits, 2) if stats.waits else 0.0,
+        "max_wait_ms": round(stats.max_wait_ms, 2),
+    }
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Get a snapshot of connection pool usage for monitoring and sizing."""
+    pool_stats = _engine_pool_stats(engine)
+    if replica_router.replicas:
+        pool_stats["replicas"] = [
+            {
+                **_engine_pool_stats(replica.engine),
+                "lag_seconds": round(replica.lag_seconds, 3),
+                "healthy": replica.healthy,
+            }
+            for replica in replica_router.replicas
+        ]
+    return pool_stats
+
+
 async def init_db() -> None:
     """Initialize database tables"""
     async with engine.begin() as conn:
         # Import all models to ensure they're registered
         from app.db import models  # noqa: F401
-        
+
+        # Trigram indexes on rwa_assets need pg_trgm
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(SQLModel.metadata.create_all)
         logger.info("Database tables initialized")
 
@@ -78,7 +355,100 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+# ==================== Read-Only Sessions ====================
+
+class ReadOnlySessionError(RuntimeError):
+    """Raised when code tries to write through a read-only session"""
+
+
+@event.listens_for(Session, "before_flush")
+def _forbid_read_only_flush(session, flush_context, instances):  # type: ignore[no-untyped-def]
+    if session.info.get("read_only"):
+        raise ReadOnlySessionError("Attempted to flush changes through a read-only session")
+
+
+def get_read_only_options(analytics: bool = False, on_primary: bool = True) -> Dict[str, Any]:
+    """
+    Transaction options for read-only sessions.
+
+    The flags travel with BEGIN, so they cost no extra round trip.
+    Analytics reads on the primary additionally run SERIALIZABLE
+    DEFERRABLE: they wait for a safe snapshot once and then never take
+    predicate locks or risk serialization failures. Hot standbys do not
+    allow SERIALIZABLE, so replicas get a REPEATABLE READ snapshot instead.
+    """
+    options: Dict[str, Any] = {"postgresql_readonly": True}
+    if analytics:
+        if on_primary and settings.database_analytics_deferrable:
+            options.update(isolation_level="SERIALIZABLE", postgresql_deferrable=True)
+        else:
+            options["isolation_level"] = "REPEATABLE READ"
+    return options
+
+
+# Option engines share their parent's pool; cached so each is built once
+_read_only_engines: Dict[Tuple[int, bool], AsyncEngine] = {}
+
+
+def _read_only_engine(async_engine: AsyncEngine, analytics: bool) -> AsyncEngine:
+    key = (id(async_engine), analytics)
+    if key not in _read_only_engines:
+        _read_only_engines[key] = async_engine.execution_options(
+            **get_read_only_options(analytics, on_primary=async_engine is engine)
+        )
+    return _read_only_engines[key]
+
+
+@asynccontextmanager
+async def _read_only_session(
+    request: Optional[Request], analytics: bool, primary: bool = False
+) -> AsyncIterator[AsyncSession]:
+    if primary or (request is not None and requires_primary(request)):
+        session_maker = async_session_maker
+    else:
+        session_maker = await replica_router.select()
+
+    # Bound to an engine whose connections begin READ ONLY transactions;
+    # like any session, no connection is checked out until the first query
+    async with session_maker(bind=_read_only_engine(session_maker.kw["bind"], analytics)) as session:
+        session.info["read_only"] = True
+        # Never committed: the pool rolls the transaction back on checkin
+        yield session
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get a session for read-only endpoints.
+
+    Opens a READ ONLY transaction that is never flushed or committed.
+    Served by a read replica when one is configured and within its lag
+    budget. Clients that recently wrote, or that ask for strong
+    consistency, are kept on the primary.
+    """
+    async with _read_only_session(request, analytics=False) as session:
+        yield session
+
+
+async def get_analytics_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Dependency like get_read_session, with one consistent snapshot for multi-query aggregates."""
+    async with _read_only_session(request, analytics=True) as session:
+        yield session
+
+
+def open_read_session(
+    request: Optional[Request] = None, analytics: bool = False, primary: bool = False
+) -> AsyncContextManager[AsyncSession]:
+    """
+    Read-only session as a context manager, for work that outlives the
+    handler (a streaming response body runs after its dependencies close)
+    or has no request at all, like background refreshes. `primary` skips
+    the replicas, for reads that must see a write that just committed.
+    """
+    return _read_only_session(request, analytics, primary)
+
+
 async def close_db() -> None:
     """Close database connection"""
     await engine.dispose()
+    await replica_router.dispose()
     logger.info("Database connection closed")
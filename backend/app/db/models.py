@@ -6,6 +6,9 @@ SQLModel definitions for RWA assets, users, trades, and verifications
 from datetime import datetime
 from typing import Optional, List
 from sqlmodel import SQLModel, Field, Relationship, Column, JSON
+from sqlalchemy import Computed, Index
+from sqlalchemy.orm import deferred
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from enum import Enum
 import uuid
 
@@ -42,6 +45,8 @@ class VerificationStatus(str, Enum):
 
 class TradeStatus(str, Enum):
     PENDING = "pending"
+    FILLED = "filled"  # order fully matched; its fills carry settlement
+    SETTLING = "settling"  # fill queued for the settlement worker
     COMPLETED = "completed"
     FAILED = "failed"
     CANCELLED = "cancelled"
@@ -84,9 +89,62 @@ class User(TimestampMixin, table=True):
     trades: List["Trade"] = Relationship(back_populates="user")
 
 
+# JSONB on Postgres so documents can be GIN-indexed and filtered in SQL;
+# plain JSON elsewhere (e.g. SQLite in tests)
+JSONB_VARIANT = JSON().with_variant(JSONB(), "postgresql")
+
+
+# Weighted search document: name and symbol rank above description.
+# One text search config throughout, the same one queries are parsed with
+# (SEARCH_CONFIG in app/db/search.py). Must stay in sync with migration
+# 015_asset_search_config.
+ASSET_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(symbol, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+# Maintained by Postgres and only read inside search queries, so it is
+# deferred: loading an asset doesn't fetch the vector
+_search_vector_column = Column(
+    "search_vector", TSVECTOR, Computed(ASSET_SEARCH_VECTOR_SQL, persisted=True)
+)
+
+
 # RWA Asset model
 class RWAAsset(TimestampMixin, table=True):
     __tablename__ = "rwa_assets"
+    __table_args__ = (
+        # Keyset pagination indexes - one per sortable column, tie-broken by id
+        Index("ix_rwa_assets_created_at_id", "created_at", "id"),
+        Index("ix_rwa_assets_price_per_unit_id", "price_per_unit", "id"),
+        Index("ix_rwa_assets_verification_score_id", "verification_score", "id"),
+        Index("ix_rwa_assets_name_id", "name", "id"),
+        # Marketplace search: full-text on the search vector, trigram for substrings
+        Index("ix_rwa_assets_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_rwa_assets_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_rwa_assets_symbol_trgm", "symbol",
+            postgresql_using="gin", postgresql_ops={"symbol": "gin_trgm_ops"},
+        ),
+        # Containment (@>) filters on JSON documents
+        Index(
+            "ix_rwa_assets_asset_metadata", "asset_metadata",
+            postgresql_using="gin", postgresql_ops={"asset_metadata": "jsonb_path_ops"},
+        ),
+        Index(
+            "ix_rwa_assets_verification_data", "verification_data",
+            postgresql_using="gin", postgresql_ops={"verification_data": "jsonb_path_ops"},
+        ),
+        Index(
+            "ix_rwa_assets_external_data_sources", "external_data_sources",
+            postgresql_using="gin", postgresql_ops={"external_data_sources": "jsonb_path_ops"},
+        ),
+    )
+    __mapper_args__ = {"properties": {"search_vector": deferred(_search_vector_column)}}
     
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     name: str = Field(index=True)
@@ -107,7 +165,7 @@ class RWAAsset(TimestampMixin, table=True):
     
     # Verification details
     verification_score: float = Field(default=0.0)  # AI confidence score (0-100)
-    verification_data: dict = Field(default_factory=dict, sa_column=Column(JSON))
+    verification_data: dict = Field(default_factory=dict, sa_column=Column(JSONB_VARIANT))
     verification_hash: Optional[str] = Field(default=None)
     
     # Qubic integration
@@ -118,8 +176,11 @@ class RWAAsset(TimestampMixin, table=True):
     # Asset metadata
     image_url: Optional[str] = Field(default=None)
     document_urls: List[str] = Field(default_factory=list, sa_column=Column(JSON))
-    external_data_sources: List[dict] = Field(default_factory=list, sa_column=Column(JSON))
-    asset_metadata: dict = Field(default_factory=dict, sa_column=Column(JSON))
+    external_data_sources: List[dict] = Field(default_factory=list, sa_column=Column(JSONB_VARIANT))
+    asset_metadata: dict = Field(default_factory=dict, sa_column=Column(JSONB_VARIANT))
+    
+    # Full-text search document, maintained by Postgres
+    search_vector: Optional[str] = Field(default=None, sa_column=_search_vector_column)
     
     # Relationships
     verifications: List["Verification"] = Relationship(back_populates="asset")
@@ -161,6 +222,20 @@ class Verification(TimestampMixin, table=True):
 # Trade model
 class Trade(TimestampMixin, table=True):
     __tablename__ = "trades"
+    __table_args__ = (
+        Index("ix_trades_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Per-asset market stats and order book recovery (see benchmarks/query_plans.py)
+        Index("ix_trades_asset_id_status_created_at", "asset_id", "status", "created_at"),
+        # Marketplace-wide 24h volume and recent trades
+        Index("ix_trades_status_settled_at", "status", "settled_at"),
+        # Asset analytics windows, read index-only in settlement order
+        Index(
+            "ix_trades_asset_id_status_settled_at_id", "asset_id", "status", "settled_at", "id",
+            postgresql_include=["price_per_unit", "quantity", "order_id", "trade_type"],
+        ),
+        # Settlement worker queue
+        Index("ix_trades_status_settle_after", "status", "settle_after"),
+    )
     
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     asset_id: str = Field(foreign_key="rwa_assets.id", index=True)
@@ -171,7 +246,13 @@ class Trade(TimestampMixin, table=True):
     trade_type: str = Field(index=True)  # buy, sell
     status: TradeStatus = Field(default=TradeStatus.PENDING, index=True)
     
+    # Orders have no order_id; each fill points at the order it filled
+    order_id: Optional[str] = Field(default=None, foreign_key="trades.id", index=True)
+    # Both fills of one match share it and settle together
+    match_id: Optional[str] = Field(default=None, index=True)
+    
     quantity: int
+    filled_quantity: int = Field(default=0)
     price_per_unit: float
     total_amount: float
     fee_amount: float = Field(default=0.0)
@@ -182,6 +263,8 @@ class Trade(TimestampMixin, table=True):
     qubic_tick: Optional[int] = Field(default=None)
     
     # Settlement
+    settlement_id: Optional[str] = Field(default=None, index=True)
+    settle_after: Optional[datetime] = Field(default=None)  # retry backoff
     settled_at: Optional[datetime] = Field(default=None)
     settlement_data: dict = Field(default_factory=dict, sa_column=Column(JSON))
 
@@ -189,6 +272,11 @@ class Trade(TimestampMixin, table=True):
 # Nostromo Proposal model
 class NostromoProposal(TimestampMixin, table=True):
     __tablename__ = "nostromo_proposals"
+    __table_args__ = (
+        Index("ix_nostromo_proposals_created_at_id", "created_at", "id"),
+        Index("ix_nostromo_proposals_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_nostromo_proposals_status_ipo_end_time", "status", "ipo_end_time"),
+    )
     
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     asset_id: str = Field(foreign_key="rwa_assets.id", unique=True, index=True)
@@ -224,6 +312,84 @@ class NostromoProposal(TimestampMixin, table=True):
     qubic_tx_hash: Optional[str] = Field(default=None)
 
 
+# OHLCV candle per asset and interval, rolled up from completed trades
+class PriceCandle(SQLModel, table=True):
+    __tablename__ = "price_candles"
+    __table_args__ = (
+        # Finds the newest 1m candle when resuming a rollup
+        Index("ix_price_candles_timeframe_bucket_start", "timeframe", "bucket_start"),
+    )
+    
+    asset_id: str = Field(foreign_key="rwa_assets.id", primary_key=True)
+    timeframe: str = Field(primary_key=True, max_length=4)  # 1m, 1h, 4h, 1d, 1w
+    bucket_start: datetime = Field(primary_key=True)
+    
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float = Field(default=0.0)  # traded value in QUBIC
+    trade_count: int = Field(default=0)
+    
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# Stored response for an Idempotency-Key, scoped to the user who sent it
+class IdempotencyKey(SQLModel, table=True):
+    __tablename__ = "idempotency_keys"
+    
+    user_id: str = Field(foreign_key="users.id", primary_key=True)
+    key: str = Field(primary_key=True, max_length=255)
+    
+    request_hash: str = Field(max_length=64)  # sha256 of method, path and body
+    status_code: Optional[int] = Field(default=None)  # None while in flight
+    response_body: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True)
+
+
+# Position of one user in one asset, kept current by trade settlement
+class Holding(SQLModel, table=True):
+    __tablename__ = "holdings"
+    
+    # The primary key also serves a user's whole portfolio
+    user_id: str = Field(foreign_key="users.id", primary_key=True)
+    asset_id: str = Field(foreign_key="rwa_assets.id", primary_key=True)
+    
+    quantity: int = Field(default=0)
+    reserved_quantity: int = Field(default=0)  # committed to open sell orders and unsettled sell fills
+    cost_basis: float = Field(default=0.0)  # average cost of `quantity`, fees included
+    realized_pnl: float = Field(default=0.0)
+    
+    trade_count: int = Field(default=0)  # completed fills
+    traded_volume: float = Field(default=0.0)
+    
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# Settled volume of one asset in one UTC hour, kept current by trade settlement
+class AssetVolumeBucket(SQLModel, table=True):
+    __tablename__ = "asset_volume_buckets"
+    __table_args__ = (
+        # Rankings read one window of hours across all assets without touching the heap
+        Index(
+            "ix_asset_volume_buckets_bucket_start_asset_id", "bucket_start", "asset_id",
+            postgresql_include=["volume", "trade_count"],
+        ),
+    )
+    
+    asset_id: str = Field(foreign_key="rwa_assets.id", primary_key=True)
+    bucket_start: datetime = Field(primary_key=True)
+    
+    volume: float = Field(default=0.0)  # traded value in QUBIC
+    trade_count: int = Field(default=0)
+    open_price: float  # first fill of the hour
+    close_price: float  # latest fill of the hour
+    
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 # EasyConnect Event Log
 class EasyConnectEvent(TimestampMixin, table=True):
     __tablename__ = "easyconnect_events"
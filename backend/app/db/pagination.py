@@ -0,0 +1,134 @@
+"""
+VeriAssets Keyset Pagination
+Cursor-based paging on (sort column, id) for list endpoints
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+import base64
+import binascii
+import json
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+class CursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+@dataclass
+class Cursor:
+    """Position of a row in a keyset-ordered result set."""
+    sort_by: str
+    value: Any
+    id: str
+    direction: str = "next"  # next | prev
+
+
+@dataclass
+class KeysetPage:
+    """One page of rows plus the cursors to reach its neighbours."""
+    items: List[Any] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    """Encode a cursor as an opaque URL-safe token."""
+    data = {"s": cursor.sort_by, "v": cursor.value, "i": cursor.id, "d": cursor.direction}
+    if isinstance(cursor.value, datetime):
+        data["v"] = cursor.value.isoformat()
+        data["t"] = "dt"
+    payload = json.dumps(data, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, sort_column: InstrumentedAttribute) -> Cursor:
+    """Decode an opaque cursor issued for the given sort column."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value = payload["v"]
+        if payload.get("t") == "dt":
+            value = datetime.fromisoformat(value)
+        cursor = Cursor(
+            sort_by=payload["s"],
+            value=value,
+            id=payload["i"],
+            direction=payload.get("d", "next"),
+        )
+    except (binascii.Error, ValueError, KeyError, TypeError, AttributeError) as e:
+        raise CursorError("Malformed cursor") from e
+
+    if cursor.sort_by != sort_column.key:
+        raise CursorError(f"Cursor was issued for sort_by={cursor.sort_by}")
+    if cursor.direction not in ("next", "prev"):
+        raise CursorError("Malformed cursor")
+    return cursor
+
+
+def _row_key(row: Any, sort_column: InstrumentedAttribute, id_column: InstrumentedAttribute) -> Tuple[Any, str]:
+    return getattr(row, sort_column.key), getattr(row, id_column.key)
+
+
+async def paginate_keyset(
+    session: AsyncSession,
+    query: Select,
+    sort_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    sort_order: str,
+    page_size: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+) -> KeysetPage:
+    """
+    Fetch one page ordered by (sort_column, id_column).
+
+    With a cursor the page is located with a row-value comparison that the
+    composite (sort_column, id) index can seek to directly, so deep pages
+    cost the same as the first one. Without a cursor a plain offset is
+    applied for backwards compatibility with page-numbered clients.
+    """
+    descending = sort_order == "desc"
+    position = decode_cursor(cursor, sort_column) if cursor else None
+    backwards = position is not None and position.direction == "prev"
+
+    # Walking backwards flips both the seek predicate and the ordering
+    scan_descending = descending != backwards
+    if position is not None:
+        key = tuple_(sort_column, id_column)
+        bound = tuple_(position.value, position.id)
+        query = query.where(key < bound if scan_descending else key > bound)
+    elif offset:
+        query = query.offset(offset)
+
+    if scan_descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    # One extra row tells us whether another page exists in this direction
+    rows = list((await session.execute(query.limit(page_size + 1))).scalars().all())
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+
+    page = KeysetPage(items=rows)
+    if not rows:
+        return page
+
+    first_value, first_id = _row_key(rows[0], sort_column, id_column)
+    last_value, last_id = _row_key(rows[-1], sort_column, id_column)
+
+    has_next = has_more if not backwards else True
+    has_prev = (position is not None or offset > 0) if not backwards else has_more
+
+    if has_next:
+        page.next_cursor = encode_cursor(Cursor(sort_column.key, last_value, last_id, "next"))
+    if has_prev:
+        page.prev_cursor = encode_cursor(Cursor(sort_column.key, first_value, first_id, "prev"))
+    return page
@@ -0,0 +1,50 @@
+"""
+VeriAssets Query Counter
+Counts the statements an engine sends while a block runs, for query budgets
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, List, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass
+class QueryCounter:
+    """Statements seen by count_queries(), in the order they were sent."""
+    statements: List[str] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def assert_at_most(self, budget: int) -> None:
+        """Fail with the statements listed when more than `budget` were sent."""
+        if self.count > budget:
+            listing = "\n".join(f"  {i}. {statement}" for i, statement in enumerate(self.statements, 1))
+            raise AssertionError(f"{self.count} queries issued (budget {budget}):\n{listing}")
+
+
+@contextmanager
+def count_queries(engine: Union[Engine, AsyncEngine]) -> Iterator[QueryCounter]:
+    """
+    Record every statement executed through the engine inside the block.
+
+    Hooks before_cursor_execute, so it sees exactly what reaches the
+    driver whichever session or connection sent it. A loop that issues a
+    query per row shows up as a count that grows with the data.
+    """
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    counter = QueryCounter()
+
+    def _record(conn, cursor, statement, parameters, context, executemany):  # type: ignore[no-untyped-def]
+        counter.statements.append(statement)
+
+    event.listen(sync_engine, "before_cursor_execute", _record)
+    try:
+        yield counter
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", _record)
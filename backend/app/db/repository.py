@@ -0,0 +1,175 @@
+"""
+VeriAssets Repository
+Pre-built statements for hot point lookups and counter updates shared by the API routes
+"""
+
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import bindparam, case, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Holding, NostromoProposal, ProposalStatus, RWAAsset, Trade, User
+
+# Built once at import. Reusing the same statement object skips building
+# the query and re-deriving its cache key on every request; SQLAlchemy's
+# compiled cache then returns the SQL string without recompiling, and
+# asyncpg reuses the statement it prepared on that connection.
+_ASSET_BY_ID = select(RWAAsset).where(RWAAsset.id == bindparam("id"))
+_TRADE_BY_ID = select(Trade).where(Trade.id == bindparam("id"))
+_PROPOSAL_BY_ID = select(NostromoProposal).where(NostromoProposal.id == bindparam("id"))
+_USER_BY_ID = select(User).where(User.id == bindparam("id"))
+_USER_BY_CLERK_ID = select(User).where(User.clerk_id == bindparam("clerk_id"))
+_HOLDING = select(Holding).where(Holding.user_id == bindparam("user_id"), Holding.asset_id == bindparam("asset_id"))
+
+# Counters are incremented inside the UPDATE rather than read, changed and
+# written back, so concurrent writers can't lose each other's increments
+# and the row is locked only for the statement itself. Each guard is
+# checked against the row as it is at that moment; no row back means the
+# guard failed and nothing changed.
+_ADD_CIRCULATING_SUPPLY = (
+    update(RWAAsset)
+    .where(
+        RWAAsset.id == bindparam("asset_id"),
+        RWAAsset.circulating_supply + bindparam("amount") <= RWAAsset.total_supply,
+    )
+    .values(circulating_supply=RWAAsset.circulating_supply + bindparam("amount"))
+    .returning(RWAAsset.circulating_supply)
+    .execution_options(synchronize_session=False)
+)
+_VOTE_OPEN = (
+    NostromoProposal.id == bindparam("proposal_id"),
+    NostromoProposal.status == ProposalStatus.VOTING,
+    or_(NostromoProposal.voting_deadline.is_(None), NostromoProposal.voting_deadline >= bindparam("now")),
+)
+_ADD_VOTES_FOR = (
+    update(NostromoProposal)
+    .where(*_VOTE_OPEN)
+    .values(votes_for=NostromoProposal.votes_for + bindparam("power"))
+    .returning(NostromoProposal.votes_for, NostromoProposal.votes_against)
+    .execution_options(synchronize_session=False)
+)
+_ADD_VOTES_AGAINST = (
+    update(NostromoProposal)
+    .where(*_VOTE_OPEN)
+    .values(votes_against=NostromoProposal.votes_against + bindparam("power"))
+    .returning(NostromoProposal.votes_for, NostromoProposal.votes_against)
+    .execution_options(synchronize_session=False)
+)
+_HOLDING_KEY = (
+    Holding.user_id == bindparam("user_id"),
+    Holding.asset_id == bindparam("asset_id"),
+)
+_RESERVE_HOLDING = (
+    update(Holding)
+    .where(*_HOLDING_KEY, Holding.reserved_quantity + bindparam("quantity") <= Holding.quantity)
+    .values(reserved_quantity=Holding.reserved_quantity + bindparam("quantity"))
+    .returning(Holding.quantity - Holding.reserved_quantity)
+    .execution_options(synchronize_session=False)
+)
+# Clamped: orders placed before the ledger was built never reserved anything
+_RELEASE_HOLDING = (
+    update(Holding)
+    .where(*_HOLDING_KEY)
+    .values(reserved_quantity=func.greatest(Holding.reserved_quantity - bindparam("quantity"), 0))
+    .execution_options(synchronize_session=False)
+)
+
+
+async def get_asset_by_id(session: AsyncSession, asset_id: str) -> Optional[RWAAsset]:
+    """Get an asset by id, or None."""
+    return (await session.execute(_ASSET_BY_ID, {"id": asset_id})).scalar_one_or_none()
+
+
+async def get_trade_by_id(session: AsyncSession, trade_id: str) -> Optional[Trade]:
+    """Get a trade by id, or None."""
+    return (await session.execute(_TRADE_BY_ID, {"id": trade_id})).scalar_one_or_none()
+
+
+async def get_proposal_by_id(session: AsyncSession, proposal_id: str) -> Optional[NostromoProposal]:
+    """Get a Nostromo proposal by id, or None."""
+    return (await session.execute(_PROPOSAL_BY_ID, {"id": proposal_id})).scalar_one_or_none()
+
+
+async def get_user_by_id(session: AsyncSession, user_id: str) -> Optional[User]:
+    """Get a user by id, or None."""
+    return (await session.execute(_USER_BY_ID, {"id": user_id})).scalar_one_or_none()
+
+
+async def get_user_by_clerk_id(session: AsyncSession, clerk_id: Optional[str]) -> Optional[User]:
+    """Get a user by Clerk subject, or None."""
+    return (await session.execute(_USER_BY_CLERK_ID, {"clerk_id": clerk_id})).scalar_one_or_none()
+
+
+async def get_holding(session: AsyncSession, user_id: str, asset_id: str) -> Optional[Holding]:
+    """Get a user's position in an asset, or None if they never held it."""
+    return (await session.execute(_HOLDING, {"user_id": user_id, "asset_id": asset_id})).scalar_one_or_none()
+
+
+# ==================== Counters ====================
+
+async def add_circulating_supply(session: AsyncSession, asset_id: str, amount: int) -> Optional[int]:
+    """Add to an asset's circulating supply unless it would pass total supply; returns the new supply, or None."""
+    result = await session.execute(_ADD_CIRCULATING_SUPPLY, {"asset_id": asset_id, "amount": amount})
+    return result.scalar_one_or_none()
+
+
+async def add_circulating_supply_many(session: AsyncSession, amounts: Dict[str, int]) -> Dict[str, int]:
+    """
+    add_circulating_supply for several assets in one statement.
+
+    Returns the new supply of each asset that was updated; assets missing
+    from the result would have passed their total supply and are unchanged.
+    """
+    if not amounts:
+        return {}
+    delta = case(amounts, value=RWAAsset.id)
+    result = await session.execute(
+        update(RWAAsset)
+        .where(RWAAsset.id.in_(amounts), RWAAsset.circulating_supply + delta <= RWAAsset.total_supply)
+        .values(circulating_supply=RWAAsset.circulating_supply + delta)
+        .returning(RWAAsset.id, RWAAsset.circulating_supply)
+        .execution_options(synchronize_session=False)
+    )
+    return {asset_id: supply for asset_id, supply in result.all()}
+
+
+async def add_votes(
+    session: AsyncSession,
+    proposal_id: str,
+    vote_for: bool,
+    power: int,
+    now: Optional[datetime] = None,
+) -> Optional[Tuple[int, int]]:
+    """
+    Count a vote if the proposal is still open for voting.
+
+    Returns the new (votes_for, votes_against), or None if the proposal
+    left the voting phase or passed its deadline.
+    """
+    statement = _ADD_VOTES_FOR if vote_for else _ADD_VOTES_AGAINST
+    result = await session.execute(statement, {
+        "proposal_id": proposal_id,
+        "power": power,
+        "now": now or datetime.utcnow(),
+    })
+    row = result.one_or_none()
+    return tuple(row) if row else None
+
+
+async def reserve_holding(session: AsyncSession, user_id: str, asset_id: str, quantity: int) -> Optional[int]:
+    """
+    Set aside units for a sell order if the user holds enough unreserved.
+
+    Returns the quantity still available afterwards, or None if the
+    position is missing or too small.
+    """
+    result = await session.execute(
+        _RESERVE_HOLDING, {"user_id": user_id, "asset_id": asset_id, "quantity": quantity}
+    )
+    return result.scalar_one_or_none()
+
+
+async def release_holding(session: AsyncSession, user_id: str, asset_id: str, quantity: int) -> None:
+    """Give back units reserved by a cancelled order or failed sell fill."""
+    await session.execute(_RELEASE_HOLDING, {"user_id": user_id, "asset_id": asset_id, "quantity": quantity})
@@ -0,0 +1,154 @@
+"""
+VeriAssets Asset Search
+Full-text and trigram search over rwa_assets with relevance ranking,
+plus JSONB containment filters on asset metadata
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import json
+import re
+
+from sqlalchemy import ColumnElement, and_, func, or_, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.db.models import RWAAsset
+
+# Config used to parse search input; the search vector is built with the same one
+SEARCH_CONFIG = "simple"
+
+# Letters and digits only, so user input can never inject tsquery operators
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+# pg_trgm can only serve a LIKE pattern holding a word of at least three characters
+MIN_SUBSTRING_WORD = 3
+
+
+def build_prefix_tsquery(search: str) -> Optional[str]:
+    """
+    Turn free text into a tsquery string where every word is a prefix match.
+
+    "solar far" becomes "solar:* & far:*", so results narrow as the user
+    types. Returns None when the input has no searchable words.
+    """
+    tokens = [t.lower() for t in _TOKEN_RE.findall(search)]
+    if not tokens:
+        return None
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def asset_search_filter(search: str) -> Optional[ColumnElement[bool]]:
+    """
+    Build the WHERE clause for a marketplace search.
+
+    Words are matched against the GIN-indexed search vector. Name and
+    symbol are also substring-matched so partial tokens like "ARB" in
+    "QUARBON" still hit; those ILIKEs are served by the trigram indexes,
+    so they are only added when the input has a word long enough for
+    them. Shorter input is matched by word prefix alone.
+    """
+    tsquery = build_prefix_tsquery(search)
+    if tsquery is None:
+        return None
+
+    clauses = [RWAAsset.search_vector.op("@@")(func.to_tsquery(SEARCH_CONFIG, tsquery))]
+    if any(len(token) >= MIN_SUBSTRING_WORD for token in _TOKEN_RE.findall(search)):
+        pattern = f"%{_escape_like(search.strip())}%"
+        clauses += [
+            RWAAsset.name.ilike(pattern, escape="\\"),
+            RWAAsset.symbol.ilike(pattern, escape="\\"),
+        ]
+    return or_(*clauses)
+
+
+def asset_search_rank(search: str) -> ColumnElement[float]:
+    """Relevance score: text rank plus how closely the name or symbol resembles the input."""
+    tsquery = build_prefix_tsquery(search)
+    term = search.strip()
+    similarity = func.greatest(
+        func.similarity(RWAAsset.name, term),
+        func.similarity(RWAAsset.symbol, term),
+    )
+    if tsquery is None:
+        return similarity
+    return func.ts_rank_cd(RWAAsset.search_vector, func.to_tsquery(SEARCH_CONFIG, tsquery)) + similarity
+
+
+# ==================== Metadata Filters ====================
+
+def parse_metadata_filters(pairs: List[str]) -> Dict[str, Any]:
+    """
+    Parse "key:value" query strings into a nested containment document.
+
+    Dotted keys address nested objects, so ["registry:Verra",
+    "project.country:BR"] becomes {"registry": "Verra", "project":
+    {"country": "BR"}}. Raises ValueError on malformed pairs.
+    """
+    document: Dict[str, Any] = {}
+    for pair in pairs:
+        key, sep, value = pair.partition(":")
+        path = [part.strip() for part in key.split(".")]
+        if not sep or not all(path):
+            raise ValueError(f"Invalid metadata filter '{pair}', expected key:value")
+
+        node = document
+        for part in path[:-1]:
+            child = node.setdefault(part, {})
+            if not isinstance(child, dict):
+                raise ValueError(f"Conflicting metadata filters for '{key}'")
+            node = child
+        if isinstance(node.get(path[-1]), dict):
+            raise ValueError(f"Conflicting metadata filters for '{key}'")
+        node[path[-1]] = value
+    return document
+
+
+def _leaves(document: Dict[str, Any], path: Tuple[str, ...] = ()) -> Iterator[Tuple[Tuple[str, ...], Any]]:
+    for key, value in document.items():
+        if isinstance(value, dict) and value:
+            yield from _leaves(value, path + (key,))
+        else:
+            yield path + (key,), value
+
+
+def _nest(path: Tuple[str, ...], value: Any) -> Dict[str, Any]:
+    for key in reversed(path):
+        value = {key: value}
+    return value
+
+
+def _value_candidates(value: Any) -> List[Any]:
+    """A query-string value may be stored as a string or as a JSON number/boolean."""
+    if not isinstance(value, str):
+        return [value]
+    try:
+        typed = json.loads(value)
+    except ValueError:
+        return [value]
+    if isinstance(typed, (int, float, bool)):
+        return [value, typed]
+    return [value]
+
+
+def asset_metadata_filter(document: Dict[str, Any]) -> Optional[ColumnElement[bool]]:
+    """
+    Build asset_metadata @> conditions, one per leaf of the document.
+
+    Every condition is a JSONB containment test, which the jsonb_path_ops
+    GIN index on asset_metadata answers without reading the table.
+    "vintage:2021" matches both {"vintage": 2021} and {"vintage": "2021"}.
+    """
+    # The column type is a JSON/JSONB variant; coerce so @> is used
+    metadata = type_coerce(RWAAsset.asset_metadata, JSONB)
+    conditions = []
+    for path, value in _leaves(document):
+        conditions.append(or_(*(
+            metadata.contains(_nest(path, candidate))
+            for candidate in _value_candidates(value)
+        )))
+    if not conditions:
+        return None
+    return and_(*conditions)
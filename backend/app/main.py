@@ -16,13 +16,27 @@ import uvicorn
 
 from app.core.config import settings
 from app.core.logging import get_logger, setup_logging
-from app.db.database import init_db, close_db
+from app.db.database import init_db, close_db, async_session_maker, READ_YOUR_WRITES_COOKIE
 from app.api.v1 import api_router
+from app.services.matching_engine import get_matching_engine
+from app.services.candles import run_candle_rollup
+from app.services.settlement import get_settlement_worker
+from app.core.background import PeriodicTask
+from app.api.v1.idempotency import purge_expired_idempotency_keys
+from app.api.v1.stats import market_analytics
 
 # Setup logging
 setup_logging()
 logger = get_logger(__name__)
 
+# Background jobs (disabled by a 0 interval, e.g. when a scheduler runs them)
+background_tasks = [
+    PeriodicTask("candle-rollup", run_candle_rollup, settings.candle_rollup_interval_seconds),
+    get_settlement_worker().task,
+    PeriodicTask("idempotency-purge", purge_expired_idempotency_keys, 3600),
+    market_analytics.task,
+]
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
@@ -43,12 +57,24 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         logger.error(f"❌ Database initialization failed: {e}")
         raise
     
+    # Rebuild order books from open orders (books also load lazily per asset)
+    try:
+        async with async_session_maker() as session:
+            await get_matching_engine().recover(session)
+    except Exception as e:
+        logger.warning(f"Order book recovery failed, books will load on first use: {e}")
+    
+    for task in background_tasks:
+        task.start()
+    
     logger.info("✅ VeriAssets API started successfully!")
     
     yield
     
     # Shutdown
     logger.info("🛑 Shutting down VeriAssets API...")
+    for task in background_tasks:
+        await task.stop()
     await close_db()
     logger.info("✅ VeriAssets API shutdown complete")
 
@@ -93,6 +119,9 @@ app.add_middleware(
 )
 
 
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
 # Request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -122,6 +151,17 @@ async def log_requests(request: Request, call_next):
     response.headers["X-Request-ID"] = request_id
     response.headers["X-Process-Time"] = f"{process_time:.2f}ms"
     
+    # Keep this client's reads on the primary until replicas catch up
+    if request.method in WRITE_METHODS and response.status_code < 400:
+        pin_seconds = settings.database_read_your_writes_seconds
+        response.set_cookie(
+            READ_YOUR_WRITES_COOKIE,
+            f"{time.time() + pin_seconds:.3f}",
+            max_age=int(pin_seconds) + 1,
+            httponly=True,
+            samesite="lax",
+        )
+    
     return response
 
 
@@ -210,6 +250,14 @@ async def health_check():
     }
 
 
+@app.get("/health/db", tags=["Health"])
+async def database_pool_status():
+    """Connection pool statistics for capacity planning."""
+    from app.db.database import get_pool_stats
+    
+    return get_pool_stats()
+
+
 @app.get("/api/v1/status", tags=["Health"])
 async def api_status():
     """API v1 status endpoint."""
@@ -8,6 +8,8 @@ from app.models.rwa import (
     AssetResponse,
     AssetListResponse,
     AssetDetailResponse,
+    AssetImportError,
+    AssetImportResponse,
     VerificationRequest,
     VerificationResponse,
     AIVerificationResult,
@@ -63,6 +65,8 @@ __all__ = [
     "AssetResponse",
     "AssetListResponse",
     "AssetDetailResponse",
+    "AssetImportError",
+    "AssetImportResponse",
     "VerificationRequest",
     "VerificationResponse",
     "AIVerificationResult",
@@ -72,9 +72,12 @@ class ProposalResponse(BaseSchema):
 class ProposalListResponse(BaseModel):
     """Schema for paginated proposal list"""
     items: List[ProposalResponse]
-    total: int
+    total: Optional[int] = None  # None when the count was skipped
+    total_strategy: Optional[str] = None  # exact | estimate | cached
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
 # ==================== Voting Schemas ====================
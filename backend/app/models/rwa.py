@@ -5,7 +5,7 @@ Request/Response models for the RWA API endpoints
 
 from datetime import datetime
 from typing import Any, Dict, List, Optional
-from pydantic import BaseModel, Field, field_validator
+from pydantic import AliasChoices, BaseModel, Field, field_validator
 from app.db.models import AssetType, AssetStatus, VerificationStatus
 
 
@@ -78,7 +78,11 @@ class AssetResponse(BaseSchema):
     
     image_url: Optional[str]
     document_urls: List[str]
-    metadata: Dict[str, Any]
+    # Stored as asset_metadata; SQLModel reserves `metadata` on table models
+    metadata: Dict[str, Any] = Field(
+        default_factory=dict,
+        validation_alias=AliasChoices("asset_metadata", "metadata"),
+    )
     
     created_at: datetime
     updated_at: datetime
@@ -87,10 +91,28 @@ class AssetResponse(BaseSchema):
 class AssetListResponse(BaseModel):
     """Schema for paginated asset list"""
     items: List[AssetResponse]
-    total: int
+    total: Optional[int] = None  # None when the count was skipped
+    total_strategy: Optional[str] = None  # exact | estimate | cached
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class AssetImportError(BaseModel):
+    """Schema for a row rejected by a bulk import"""
+    line: int
+    symbol: Optional[str] = None
+    error: str
+
+
+class AssetImportResponse(BaseModel):
+    """Schema for bulk import results"""
+    total_rows: int = 0
+    created: int = 0
+    failed: int = 0
+    errors: List[AssetImportError] = Field(default_factory=list)
 
 
 class AssetDetailResponse(AssetResponse):
@@ -159,11 +181,23 @@ class AssetFilters(BaseModel):
     min_verification_score: Optional[float] = Field(None, ge=0, le=100)
     creator_id: Optional[str] = None
     search: Optional[str] = Field(None, description="Search in name and description")
+    metadata: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Only assets whose metadata contains these key/value pairs, e.g. {\"registry\": \"Verra\"}"
+    )
+
+
+# Only columns backed by a (column, id) index can be sorted on
+ASSET_SORT_FIELDS = ("created_at", "price_per_unit", "verification_score", "name")
+# relevance additionally orders search results by match quality
+ASSET_SORT_PATTERN = f"^({'|'.join(ASSET_SORT_FIELDS)}|relevance)$"
 
 
 class PaginationParams(BaseModel):
     """Schema for pagination parameters"""
     page: int = Field(default=1, ge=1)
     page_size: int = Field(default=20, ge=1, le=100)
-    sort_by: str = Field(default="created_at")
+    sort_by: str = Field(default="created_at", pattern=ASSET_SORT_PATTERN)
     sort_order: str = Field(default="desc", pattern="^(asc|desc)$")
+    cursor: Optional[str] = Field(default=None, description="Opaque cursor from a previous page")
+    with_total: bool = Field(default=True, description="Include the total count")
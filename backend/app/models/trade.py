@@ -37,6 +37,8 @@ class TradeResponse(BaseSchema):
     status: TradeStatus
     
     quantity: int
+    filled_quantity: int = 0
+    order_id: Optional[str] = None  # set on fills, pointing at their order
     price_per_unit: float
     total_amount: float
     fee_amount: float
@@ -54,9 +56,12 @@ class TradeResponse(BaseSchema):
 class TradeListResponse(BaseModel):
     """Schema for paginated trade list"""
     items: List[TradeResponse]
-    total: int
+    total: Optional[int] = None  # None when the count was skipped
+    total_strategy: Optional[str] = None  # exact | estimate | cached
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
 class TradeExecuteRequest(BaseModel):
@@ -69,12 +74,45 @@ class TradeExecuteResponse(BaseModel):
     """Schema for trade execution response"""
     trade_id: str
     status: str
+    settlement_id: Optional[str] = None
     qubic_tx_hash: Optional[str]
     qubic_tick: Optional[int]
     message: str
     fee_burned: float
 
 
+class TradeBatchExecuteRequest(BaseModel):
+    """Schema for executing many fills in one call"""
+    trade_ids: List[str] = Field(..., min_length=1, max_length=500, description="Fill trade IDs to execute")
+    qubic_seed: Optional[str] = Field(None, description="Qubic seed for signing (dev only)")
+
+
+class TradeBatchExecuteResult(BaseModel):
+    """Outcome for one trade of a batch execution"""
+    trade_id: str
+    status: str  # trade status, or rejected with the reason in error
+    qubic_tx_hash: Optional[str] = None
+    qubic_tick: Optional[int] = None
+    fee_burned: float = 0.0
+    error: Optional[str] = None
+
+
+class TradeBatchExecuteResponse(BaseModel):
+    """Schema for batch execution response"""
+    settlement_id: Optional[str]  # None when nothing was queued
+    results: List[TradeBatchExecuteResult]
+    queued: int
+    rejected: int
+    fee_burned: float
+
+
+class SettlementResponse(BaseModel):
+    """Schema for settlement progress"""
+    settlement_id: str
+    status: str  # shared trade status, or partial while they differ
+    trades: List[TradeBatchExecuteResult]
+
+
 # ==================== Market Data Schemas ====================
 
 class MarketStats(BaseModel):
@@ -86,6 +124,9 @@ class MarketStats(BaseModel):
     current_price: float
     price_change_24h: float
     price_change_percentage_24h: float
+    open_24h: Optional[float] = None
+    high_24h: Optional[float] = None
+    low_24h: Optional[float] = None
     
     volume_24h: float
     total_trades_24h: int
@@ -99,9 +140,10 @@ class MarketStats(BaseModel):
 
 
 class OrderBookEntry(BaseModel):
-    """Schema for order book entry"""
+    """Schema for an aggregated order book price level"""
     price: float
     quantity: int
+    orders: int = 1  # resting orders at this price
     total: float
     cumulative: float
 
@@ -113,6 +155,7 @@ class OrderBook(BaseModel):
     asks: List[OrderBookEntry]  # Sell orders
     spread: float
     spread_percentage: float
+    sequence: int = 0  # increases with every change to the book
     last_updated: datetime
 
 
@@ -129,5 +172,5 @@ class PriceHistory(BaseModel):
 class PriceHistoryResponse(BaseModel):
     """Schema for price history response"""
     asset_id: str
-    interval: str  # 1h, 4h, 1d, 1w
+    interval: str  # 1m, 1h, 4h, 1d, 1w
     data: List[PriceHistory]
@@ -3,7 +3,7 @@ Pydantic Schemas for User Operations
 """
 
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field, EmailStr
 
 
@@ -96,6 +96,35 @@ class UserStatsResponse(BaseModel):
     pnl_percentage: float
 
 
+# ==================== Portfolio Schemas ====================
+
+class HoldingResponse(BaseModel):
+    """Schema for one position in the user's portfolio"""
+    asset_id: str
+    symbol: str
+    name: str
+    quantity: int
+    reserved_quantity: int  # committed to open sells
+    available_quantity: int
+    cost_basis: float  # fees included
+    average_cost: float
+    market_price: float  # last trade in the past 24h, else the listing price
+    market_value: float
+    unrealized_pnl: float
+    realized_pnl: float
+    pnl_24h: float
+
+
+class PortfolioResponse(BaseModel):
+    """Schema for the user's portfolio"""
+    holdings: List[HoldingResponse]
+    total_value: float
+    total_cost_basis: float
+    unrealized_pnl: float
+    realized_pnl: float  # includes closed positions
+    pnl_24h: float
+
+
 # ==================== Wallet Schemas ====================
 
 class WalletConnectRequest(BaseModel):
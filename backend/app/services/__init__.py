@@ -6,6 +6,10 @@ from app.services.qubic_rpc import QubicRPCClient, get_qubic_client
 from app.services.gemini_ai import GeminiAIService, get_gemini_service
 from app.services.easyconnect import EasyConnectService, get_easyconnect_service
 from app.services.nostromo import NostromoService, get_nostromo_service
+from app.services.bulk_import import BulkAssetImporter
+from app.services.matching_engine import MatchingEngine, get_matching_engine
+from app.services.market_stats import MarketStatsTracker, get_market_stats_tracker
+from app.services.settlement import SettlementWorker, get_settlement_worker
 
 __all__ = [
     "QubicRPCClient",
@@ -16,4 +20,11 @@ __all__ = [
     "get_easyconnect_service",
     "NostromoService",
     "get_nostromo_service",
+    "BulkAssetImporter",
+    "MatchingEngine",
+    "get_matching_engine",
+    "MarketStatsTracker",
+    "get_market_stats_tracker",
+    "SettlementWorker",
+    "get_settlement_worker",
 ]
@@ -0,0 +1,244 @@
+"""
+Bulk Asset Import Service
+Streams NDJSON/CSV asset lots into rwa_assets with batched multi-row inserts
+"""
+
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+import codecs
+import csv
+import json
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.models import AssetStatus, RWAAsset
+from app.models.rwa import AssetCreate, AssetImportError, AssetImportResponse
+
+logger = get_logger(__name__)
+
+# Columns filled by Postgres rather than the importer
+_GENERATED_COLUMNS = {"search_vector"}
+
+# CSV cells holding JSON documents
+_CSV_JSON_FIELDS = ("metadata", "external_data_sources")
+
+# Stop collecting error details past this many; counts stay exact
+MAX_REPORTED_ERRORS = 1000
+
+ParsedRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+# ==================== Parsing ====================
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """Split a byte stream into numbered text lines without buffering the whole body."""
+    # Incremental so multi-byte characters split across chunks decode correctly
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    line_no = 0
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield line_no + 1, buffer.rstrip("\r")
+
+
+async def iter_ndjson_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """Yield (line, object, error) for every non-blank NDJSON line."""
+    async for line_no, line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, None, "Each line must be a JSON object"
+            continue
+        yield line_no, row, None
+
+
+def _csv_row_to_asset(row: Dict[str, str]) -> Dict[str, Any]:
+    """Convert CSV cells to AssetCreate input; empty cells fall back to defaults."""
+    data: Dict[str, Any] = {}
+    for key, value in row.items():
+        if key is None or value is None or value == "":
+            continue
+        if key in _CSV_JSON_FIELDS:
+            data[key] = json.loads(value)
+        elif key == "document_urls":
+            data[key] = [url.strip() for url in value.split("|") if url.strip()]
+        else:
+            data[key] = value
+    return data
+
+
+async def iter_csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """
+    Yield (line, object, error) for every CSV record after the header.
+
+    Quoted cells may span lines: physical lines are joined until the
+    record has balanced quotes. document_urls is "|"-separated, metadata
+    and external_data_sources are JSON.
+    """
+    header: Optional[List[str]] = None
+    pending: List[str] = []
+    start_line = 0
+
+    async for line_no, line in iter_lines(chunks):
+        if not pending:
+            start_line = line_no
+        pending.append(line)
+        record = "\n".join(pending)
+        if record.count('"') % 2:
+            continue
+        pending = []
+
+        if not record.strip():
+            continue
+        cells = next(csv.reader([record]))
+        if header is None:
+            header = [cell.strip() for cell in cells]
+            continue
+        if len(cells) != len(header):
+            yield start_line, None, f"Expected {len(header)} columns, got {len(cells)}"
+            continue
+        try:
+            yield start_line, _csv_row_to_asset(dict(zip(header, cells))), None
+        except ValueError as e:
+            yield start_line, None, f"Invalid JSON cell: {e}"
+
+    if pending:
+        yield start_line, None, "Unterminated quoted field"
+
+
+# ==================== Import ====================
+
+class BulkAssetImporter:
+    """
+    Validates parsed rows and inserts them in batches.
+
+    Symbols are deduplicated within the file as rows arrive, and against
+    existing assets with one lookup per batch. Each batch is a single
+    multi-row INSERT committed on its own. If one fails it is retried row
+    by row, so only the rows the database rejects are reported and their
+    symbols can still be imported by a later, corrected row.
+    """
+
+    def __init__(self, session: AsyncSession, creator_id: str, batch_size: Optional[int] = None):
+        self.session = session
+        self.creator_id = creator_id
+        self.batch_size = batch_size or settings.bulk_import_batch_size
+        self.result = AssetImportResponse()
+        self._seen_symbols: Set[str] = set()
+        self._batch: List[Tuple[int, Dict[str, Any]]] = []
+
+    def _error(self, line: int, error: str, symbol: Optional[str] = None) -> None:
+        self.result.failed += 1
+        if len(self.result.errors) < MAX_REPORTED_ERRORS:
+            self.result.errors.append(AssetImportError(line=line, symbol=symbol, error=error))
+
+    def _asset_row(self, asset_data: AssetCreate) -> Dict[str, Any]:
+        asset = RWAAsset(
+            name=asset_data.name,
+            symbol=asset_data.symbol,
+            description=asset_data.description,
+            asset_type=asset_data.asset_type,
+            status=AssetStatus.DRAFT,
+            creator_id=self.creator_id,
+            total_supply=asset_data.total_supply,
+            circulating_supply=0,
+            price_per_unit=asset_data.price_per_unit,
+            image_url=asset_data.image_url,
+            document_urls=asset_data.document_urls,
+            external_data_sources=asset_data.external_data_sources,
+            asset_metadata=asset_data.metadata,
+        )
+        return asset.model_dump(exclude=_GENERATED_COLUMNS)
+
+    async def add(self, line: int, data: Optional[Dict[str, Any]], error: Optional[str] = None) -> None:
+        """Validate one parsed row and queue it for insertion."""
+        self.result.total_rows += 1
+        if error is not None or data is None:
+            self._error(line, error or "Empty row")
+            return
+
+        try:
+            asset_data = AssetCreate.model_validate(data)
+        except ValidationError as e:
+            details = "; ".join(
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+            self._error(line, details, data.get("symbol") if isinstance(data.get("symbol"), str) else None)
+            return
+
+        if asset_data.symbol in self._seen_symbols:
+            self._error(line, "Duplicate symbol in file", asset_data.symbol)
+            return
+        self._seen_symbols.add(asset_data.symbol)
+
+        self._batch.append((line, self._asset_row(asset_data)))
+        if len(self._batch) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Insert the queued rows whose symbols are not taken yet."""
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+
+        symbols = [row["symbol"] for _, row in batch]
+        existing = set((await self.session.execute(
+            select(RWAAsset.symbol).where(RWAAsset.symbol.in_(symbols))
+        )).scalars().all())
+
+        rows = []
+        for line, row in batch:
+            if row["symbol"] in existing:
+                self._error(line, f"Asset with symbol {row['symbol']} already exists", row["symbol"])
+            else:
+                rows.append((line, row))
+        if not rows:
+            return
+
+        if await self._insert([row for _, row in rows]):
+            self.result.created += len(rows)
+            return
+
+        # Find the rows the database rejects; the rest still go in
+        for line, row in rows:
+            if await self._insert([row]):
+                self.result.created += 1
+            else:
+                self._seen_symbols.discard(row["symbol"])
+                self._error(line, "Insert failed", row["symbol"])
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> bool:
+        """Insert and commit rows in one statement; roll back and return False on failure."""
+        try:
+            await self.session.execute(insert(RWAAsset).values(rows))
+            await self.session.commit()
+        except Exception as e:
+            await self.session.rollback()
+            logger.warning(f"Bulk import insert of {len(rows)} rows failed: {e}")
+            return False
+        return True
+
+    async def run(self, rows: AsyncIterator[ParsedRow]) -> AssetImportResponse:
+        """Consume parsed rows to the end and return the import summary."""
+        async for line, data, error in rows:
+            await self.add(line, data, error)
+        await self.flush()
+        logger.info(
+            f"Bulk import by {self.creator_id}: {self.result.created} created, "
+            f"{self.result.failed} failed of {self.result.total_rows} rows"
+        )
+        return self.result
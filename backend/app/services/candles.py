@@ -0,0 +1,180 @@
+"""
+Price Candle Rollup Service
+Folds completed trades into 1m OHLCV candles and rolls them up to coarser intervals
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import asyncio
+
+from sqlalchemy import Integer, cast, func, literal, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.database import async_session_maker
+from app.db.models import PriceCandle, Trade, TradeStatus
+from app.services.trades import COUNTS_TOWARD_VOLUME
+
+logger = get_logger(__name__)
+
+BASE_INTERVAL = "1m"
+
+# Each coarser interval is built from the finest one that divides it evenly
+ROLLUPS: List[Tuple[str, str]] = [
+    ("1h", "1m"),
+    ("4h", "1h"),
+    ("1d", "1h"),
+    ("1w", "1d"),
+]
+
+INTERVALS = (BASE_INTERVAL,) + tuple(target for target, _ in ROLLUPS)
+
+INTERVAL_SECONDS: Dict[str, int] = {
+    "1m": 60,
+    "1h": 3600,
+    "4h": 4 * 3600,
+    "1d": 86400,
+    "1w": 7 * 86400,
+}
+
+
+# ==================== Buckets ====================
+
+def bucket_start(ts: datetime, interval: str) -> datetime:
+    """Start of the candle containing ts (UTC; weeks start on Monday)."""
+    if interval == "1m":
+        return ts.replace(second=0, microsecond=0)
+    if interval == "1h":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    if interval == "4h":
+        return ts.replace(hour=ts.hour - ts.hour % 4, minute=0, second=0, microsecond=0)
+    day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "1d":
+        return day
+    if interval == "1w":
+        return day - timedelta(days=day.weekday())
+    raise ValueError(f"Unknown interval: {interval}")
+
+
+def bucket_expression(column, interval: str):
+    """SQL equivalent of bucket_start for a timestamp column."""
+    if interval == "1m":
+        return func.date_trunc("minute", column)
+    if interval == "1h":
+        return func.date_trunc("hour", column)
+    if interval == "4h":
+        return func.date_trunc("hour", column) - func.make_interval(
+            0, 0, 0, 0, cast(func.date_part("hour", column), Integer) % 4
+        )
+    if interval == "1d":
+        return func.date_trunc("day", column)
+    if interval == "1w":
+        return func.date_trunc("week", column)
+    raise ValueError(f"Unknown interval: {interval}")
+
+
+# ==================== Rollup ====================
+
+def _upsert(source, columns: List[str]):
+    stmt = insert(PriceCandle).from_select(columns, source)
+    return stmt.on_conflict_do_update(
+        index_elements=["asset_id", "timeframe", "bucket_start"],
+        set_={name: getattr(stmt.excluded, name) for name in columns[3:]},
+    )
+
+
+_COLUMNS = [
+    "asset_id", "timeframe", "bucket_start",
+    "open", "high", "low", "close", "volume", "trade_count", "updated_at",
+]
+
+
+def trades_to_candles(since: Optional[datetime]):
+    """
+    Upsert 1m candles for every trade settled at or after `since`.
+
+    Matches are stored as one fill per side, so only the buy side of a
+    fill is counted; trades from before matching (no order_id) count once
+    each already.
+    """
+    minute = bucket_expression(Trade.settled_at, BASE_INTERVAL)
+    price = Trade.price_per_unit
+    query = select(
+        Trade.asset_id,
+        literal(BASE_INTERVAL),
+        minute,
+        array_agg(aggregate_order_by(price, Trade.settled_at, Trade.id))[1],
+        func.max(price),
+        func.min(price),
+        array_agg(aggregate_order_by(price, Trade.settled_at.desc(), Trade.id.desc()))[1],
+        func.sum(Trade.total_amount),
+        func.count(),
+        func.now(),
+    ).where(
+        Trade.status == TradeStatus.COMPLETED,
+        Trade.settled_at.is_not(None),
+        COUNTS_TOWARD_VOLUME,
+    ).group_by(Trade.asset_id, minute)
+    if since is not None:
+        query = query.where(Trade.settled_at >= since)
+    return _upsert(query, _COLUMNS)
+
+
+def candles_to_candles(target: str, source: str, since: Optional[datetime]):
+    """Upsert `target` candles from the `source` candles at or after `since`."""
+    bucket = bucket_expression(PriceCandle.bucket_start, target)
+    query = select(
+        PriceCandle.asset_id,
+        literal(target),
+        bucket,
+        array_agg(aggregate_order_by(PriceCandle.open, PriceCandle.bucket_start))[1],
+        func.max(PriceCandle.high),
+        func.min(PriceCandle.low),
+        array_agg(aggregate_order_by(PriceCandle.close, PriceCandle.bucket_start.desc()))[1],
+        func.sum(PriceCandle.volume),
+        func.sum(PriceCandle.trade_count),
+        func.now(),
+    ).where(PriceCandle.timeframe == source).group_by(PriceCandle.asset_id, bucket)
+    if since is not None:
+        query = query.where(PriceCandle.bucket_start >= since)
+    return _upsert(query, _COLUMNS)
+
+
+async def rollup_candles(session: AsyncSession) -> Optional[datetime]:
+    """
+    Bring all candle intervals up to date and commit.
+
+    Resumes from the newest 1m candle minus the configured overlap, so
+    trades committed after the previous run's snapshot are still picked
+    up. Every bucket touched is recomputed from scratch, which keeps
+    re-runs idempotent. The first run backfills all history. Returns the
+    point the run resumed from (None for a full backfill).
+    """
+    newest = (await session.execute(
+        select(func.max(PriceCandle.bucket_start)).where(PriceCandle.timeframe == BASE_INTERVAL)
+    )).scalar()
+    since = None
+    if newest is not None:
+        since = bucket_start(newest - timedelta(seconds=settings.candle_rollup_overlap_seconds), BASE_INTERVAL)
+
+    await session.execute(trades_to_candles(since))
+    for target, source in ROLLUPS:
+        # Recompute whole target buckets, starting where the oldest touched one begins
+        await session.execute(
+            candles_to_candles(target, source, bucket_start(since, target) if since else None)
+        )
+    await session.commit()
+    return since
+
+
+async def run_candle_rollup() -> None:
+    """One rollup pass on its own session, for the periodic task and cron."""
+    async with async_session_maker() as session:
+        since = await rollup_candles(session)
+    logger.debug(f"Candle rollup complete (from {since or 'the beginning'})")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_candle_rollup())
@@ -0,0 +1,208 @@
+"""
+Holdings Ledger
+Keeps every user's position per asset current as fills settle, and rebuilds it from the trades
+"""
+
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+import asyncio
+
+from sqlalchemy import delete, func, insert, select, text, tuple_, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import get_logger
+from app.db.database import async_session_maker
+from app.db.models import Holding, RWAAsset, Trade, TradeStatus
+from app.db.repository import release_holding
+
+logger = get_logger(__name__)
+
+# Trades fetched per cursor round trip, and rows per INSERT, when rebuilding
+_REBUILD_BATCH = 1000
+
+
+@dataclass
+class Position:
+    """A holdings row being replayed; same fields as Holding."""
+    quantity: int = 0
+    reserved_quantity: int = 0
+    cost_basis: float = 0.0
+    realized_pnl: float = 0.0
+    trade_count: int = 0
+    traded_volume: float = 0.0
+
+
+def is_issuer_sale(trade_type: str, user_id: str, creator_id: str) -> bool:
+    """
+    Whether a sell is the asset's creator issuing new units.
+
+    The creator sells from the unissued supply rather than from a
+    position, so those sells are neither checked against nor taken out of
+    the ledger; total supply bounds them instead.
+    """
+    return trade_type == "sell" and user_id == creator_id
+
+
+def apply_fill(position, trade) -> None:
+    """
+    Fold one completed fill into a position (Holding or Position).
+
+    Cost basis is average cost with fees included: buys add what they
+    paid, sells take out the average cost of the units sold and realize
+    their proceeds net of fees against it. Units a sell had reserved are
+    released. A sell larger than the position, possible only for trades
+    from before holdings were enforced, closes it out.
+    """
+    position.trade_count += 1
+    position.traded_volume += trade.total_amount
+    if trade.trade_type == "buy":
+        position.quantity += trade.quantity
+        position.cost_basis += trade.total_amount + trade.fee_amount
+        return
+
+    sold = min(trade.quantity, position.quantity)
+    basis = position.cost_basis * sold / position.quantity if position.quantity else 0.0
+    position.quantity -= sold
+    position.cost_basis = position.cost_basis - basis if position.quantity else 0.0
+    position.realized_pnl += trade.total_amount - trade.fee_amount - basis
+    position.reserved_quantity = max(position.reserved_quantity - trade.quantity, 0)
+
+
+# ==================== Settlement ====================
+
+async def get_asset_creators(session: AsyncSession, asset_ids: Iterable[str]) -> Dict[str, str]:
+    """Creator of each asset, by asset id."""
+    result = await session.execute(
+        select(RWAAsset.id, RWAAsset.creator_id).where(RWAAsset.id.in_(set(asset_ids)))
+    )
+    return dict(result.all())
+
+
+async def apply_settled_fills(
+    session: AsyncSession,
+    completed: List[Trade],
+    failed: List[Trade],
+    now: datetime,
+) -> None:
+    """
+    Update the ledger for fills settled in the caller's transaction.
+
+    Completed fills move units and cost basis; failed sell fills give back
+    what they reserved. The positions touched are locked in key order, so
+    concurrent settlement passes queue on them instead of deadlocking,
+    and the caller's commit makes the ledger and the trades change
+    together.
+    """
+    for trade in sorted(failed, key=lambda t: (t.user_id, t.asset_id)):
+        if trade.trade_type == "sell":
+            await release_holding(session, trade.user_id, trade.asset_id, trade.quantity)
+    if not completed:
+        return
+
+    creators = await get_asset_creators(session, (trade.asset_id for trade in completed))
+    fills = [
+        trade for trade in completed
+        if not is_issuer_sale(trade.trade_type, trade.user_id, creators.get(trade.asset_id))
+    ]
+    keys = sorted({(trade.user_id, trade.asset_id) for trade in fills})
+    if not keys:
+        return
+
+    await session.execute(
+        pg_insert(Holding)
+        .values([{"user_id": user_id, "asset_id": asset_id, "updated_at": now} for user_id, asset_id in keys])
+        .on_conflict_do_nothing()
+    )
+    result = await session.execute(
+        select(Holding)
+        .where(tuple_(Holding.user_id, Holding.asset_id).in_(keys))
+        .order_by(Holding.user_id, Holding.asset_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    holdings = {(holding.user_id, holding.asset_id): holding for holding in result.scalars()}
+    for trade in fills:
+        holding = holdings[(trade.user_id, trade.asset_id)]
+        apply_fill(holding, trade)
+        holding.updated_at = now
+
+
+# ==================== Rebuild ====================
+
+def _reserved_query():
+    """Units each non-issuer has committed to open sell orders and unsettled sell fills."""
+    open_orders = select(
+        Trade.user_id, Trade.asset_id, (Trade.quantity - Trade.filled_quantity).label("quantity")
+    ).where(Trade.order_id.is_(None), Trade.status == TradeStatus.PENDING, Trade.trade_type == "sell")
+    unsettled_fills = select(
+        Trade.user_id, Trade.asset_id, Trade.quantity
+    ).where(
+        Trade.order_id.is_not(None),
+        Trade.status.in_([TradeStatus.PENDING, TradeStatus.SETTLING]),
+        Trade.trade_type == "sell",
+    )
+    committed = union_all(open_orders, unsettled_fills).subquery()
+    return (
+        select(committed.c.user_id, committed.c.asset_id, func.sum(committed.c.quantity))
+        .join(RWAAsset, RWAAsset.id == committed.c.asset_id)
+        .where(RWAAsset.creator_id != committed.c.user_id)
+        .group_by(committed.c.user_id, committed.c.asset_id)
+    )
+
+
+async def rebuild_holdings(session: AsyncSession) -> int:
+    """
+    Recompute the whole ledger from the trades and commit it.
+
+    Replays every completed trade in settlement order, then adds the
+    reservations of open sells. Holdings are locked against writes for
+    the duration, so settlement and sell orders wait for the rebuild
+    rather than racing it. Returns the number of positions written.
+    """
+    await session.execute(text("LOCK TABLE holdings IN EXCLUSIVE MODE"))
+
+    positions: Dict[Tuple[str, str], Position] = defaultdict(Position)
+    replayed = 0
+    result = await session.stream(
+        select(
+            Trade.user_id, Trade.asset_id, Trade.trade_type, Trade.quantity,
+            Trade.total_amount, Trade.fee_amount, RWAAsset.creator_id,
+        )
+        .join(RWAAsset, RWAAsset.id == Trade.asset_id)
+        .where(Trade.status == TradeStatus.COMPLETED)
+        .order_by(Trade.settled_at.nulls_first(), Trade.created_at, Trade.id)
+        .execution_options(yield_per=_REBUILD_BATCH)
+    )
+    async for trade in result:
+        if is_issuer_sale(trade.trade_type, trade.user_id, trade.creator_id):
+            continue
+        apply_fill(positions[(trade.user_id, trade.asset_id)], trade)
+        replayed += 1
+
+    for user_id, asset_id, reserved in (await session.execute(_reserved_query())).all():
+        positions[(user_id, asset_id)].reserved_quantity = int(reserved)
+
+    now = datetime.utcnow()
+    rows = [
+        {"user_id": user_id, "asset_id": asset_id, **asdict(position), "updated_at": now}
+        for (user_id, asset_id), position in positions.items()
+    ]
+    await session.execute(delete(Holding))
+    for start in range(0, len(rows), _REBUILD_BATCH):
+        await session.execute(insert(Holding), rows[start:start + _REBUILD_BATCH])
+    await session.commit()
+    logger.info(f"Rebuilt {len(rows)} holdings from {replayed} completed trades")
+    return len(rows)
+
+
+async def run_holdings_rebuild() -> None:
+    """Rebuild the ledger on its own session, for the command line."""
+    async with async_session_maker() as session:
+        await rebuild_holdings(session)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_holdings_rebuild())
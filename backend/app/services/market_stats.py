@@ -0,0 +1,231 @@
+"""
+Rolling Market Statistics
+Per-asset 24h trade statistics kept in minute buckets and updated as trades complete
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Deque, Dict, List, Optional, Tuple
+import asyncio
+
+from sqlalchemy import select
+
+from app.core.logging import get_logger
+from app.db.database import async_session_maker
+from app.db.models import Trade, TradeStatus
+from app.services.trades import COUNTS_TOWARD_VOLUME, counts_toward_volume
+
+logger = get_logger(__name__)
+
+WINDOW_MINUTES = 24 * 60
+
+_EPOCH = datetime(1970, 1, 1)
+
+# (trade id, settled at, price, amount)
+_Entry = Tuple[str, datetime, float, float]
+
+
+def epoch_minute(ts: datetime) -> int:
+    """Whole minutes since the epoch for a naive UTC timestamp."""
+    return int((ts - _EPOCH).total_seconds()) // 60
+
+
+# ==================== Rolling Window ====================
+
+class MinuteBucket:
+    """OHLC, volume and trade count of one minute."""
+    __slots__ = ("minute", "open", "high", "low", "close", "volume", "count")
+
+    def __init__(self, minute: int, price: float):
+        self.minute = minute
+        self.open = self.high = self.low = self.close = price
+        self.volume = 0.0
+        self.count = 0
+
+
+@dataclass(frozen=True)
+class RollingStats:
+    """Statistics of one asset over the trailing window."""
+    volume: float
+    trade_count: int
+    open: Optional[float]
+    high: Optional[float]
+    low: Optional[float]
+    last: Optional[float]
+    reference_price: Optional[float]  # last price before the window, else its open
+
+
+class RollingWindow:
+    """
+    Trailing window of minute buckets for one asset.
+
+    Volume and trade count are running totals, and high/low are kept in
+    monotonic queues of (minute, price), so adding a trade, expiring old
+    minutes and reading the stats are all amortized O(1). Trades must
+    arrive in settlement order; a trade that completes a moment after a
+    later one is folded into the newest minute.
+    """
+
+    def __init__(self, window_minutes: int = WINDOW_MINUTES):
+        self.window_minutes = window_minutes
+        self.buckets: Deque[MinuteBucket] = deque()
+        self._highs: Deque[Tuple[int, float]] = deque()  # prices decreasing
+        self._lows: Deque[Tuple[int, float]] = deque()  # prices increasing
+        self.volume = 0.0
+        self.trade_count = 0
+        self.reference_price: Optional[float] = None
+
+    def add(self, minute: int, price: float, amount: float) -> None:
+        if self.buckets and minute < self.buckets[-1].minute:
+            minute = self.buckets[-1].minute
+        if not self.buckets or self.buckets[-1].minute != minute:
+            self.buckets.append(MinuteBucket(minute, price))
+        bucket = self.buckets[-1]
+        bucket.high = max(bucket.high, price)
+        bucket.low = min(bucket.low, price)
+        bucket.close = price
+        bucket.volume += amount
+        bucket.count += 1
+        self.volume += amount
+        self.trade_count += 1
+
+        while self._highs and self._highs[-1][1] <= price:
+            self._highs.pop()
+        self._highs.append((minute, price))
+        while self._lows and self._lows[-1][1] >= price:
+            self._lows.pop()
+        self._lows.append((minute, price))
+
+    def expire(self, now_minute: int) -> None:
+        """Drop the minutes that fell out of the window ending at now_minute."""
+        start = now_minute - self.window_minutes + 1
+        while self.buckets and self.buckets[0].minute < start:
+            bucket = self.buckets.popleft()
+            self.volume -= bucket.volume
+            self.trade_count -= bucket.count
+            self.reference_price = bucket.close
+        while self._highs and self._highs[0][0] < start:
+            self._highs.popleft()
+        while self._lows and self._lows[0][0] < start:
+            self._lows.popleft()
+        if not self.buckets:
+            self.volume = 0.0  # shed float drift from the running total
+
+    def stats(self) -> RollingStats:
+        if not self.buckets:
+            return RollingStats(0.0, 0, None, None, None, None, self.reference_price)
+        first = self.buckets[0]
+        return RollingStats(
+            volume=self.volume,
+            trade_count=self.trade_count,
+            open=first.open,
+            high=self._highs[0][1],
+            low=self._lows[0][1],
+            last=self.buckets[-1].close,
+            reference_price=self.reference_price if self.reference_price is not None else first.open,
+        )
+
+
+# ==================== Tracker ====================
+
+class MarketStatsTracker:
+    """
+    Rolling 24h statistics for every asset this process has served.
+
+    An asset's window is loaded from its completed trades on first read and
+    then kept current by record(), which the settlement path calls after
+    each trade commits. Trades recorded while a window is loading are held
+    and merged in, skipping any the load already saw. Like the order books
+    this state is per process: with several workers each one only sees the
+    completions it settles itself.
+    """
+
+    def __init__(self, window_minutes: int = WINDOW_MINUTES):
+        self.window_minutes = window_minutes
+        self._windows: Dict[str, RollingWindow] = {}
+        self._pending: Dict[str, List[_Entry]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.session_maker = async_session_maker  # windows load from the primary
+
+    def reset(self, asset_id: Optional[str] = None) -> None:
+        """Drop one window (or all) so it is reloaded from the database."""
+        if asset_id is None:
+            self._windows.clear()
+        else:
+            self._windows.pop(asset_id, None)
+
+    def record(self, trade: Trade) -> None:
+        """Count a trade that has just been committed as COMPLETED."""
+        if trade.status != TradeStatus.COMPLETED or trade.settled_at is None:
+            return
+        if not counts_toward_volume(trade):
+            return
+        window = self._windows.get(trade.asset_id)
+        if window is not None:
+            window.add(epoch_minute(trade.settled_at), trade.price_per_unit, trade.total_amount)
+        elif trade.asset_id in self._pending:
+            self._pending[trade.asset_id].append(
+                (trade.id, trade.settled_at, trade.price_per_unit, trade.total_amount)
+            )
+        # Otherwise the asset is not tracked yet and its first read loads the trade
+
+    async def get(self, asset_id: str, now: Optional[datetime] = None) -> RollingStats:
+        """The asset's stats for the window ending now, loading it if needed."""
+        now = now or datetime.utcnow()
+        window = self._windows.get(asset_id)
+        if window is None:
+            lock = self._locks.setdefault(asset_id, asyncio.Lock())
+            async with lock:
+                window = self._windows.get(asset_id)
+                if window is None:
+                    window = await self._load(asset_id, now)
+        window.expire(epoch_minute(now))
+        return window.stats()
+
+    async def _load(self, asset_id: str, now: datetime) -> RollingWindow:
+        # Start of the oldest minute in the window
+        since = _EPOCH + timedelta(minutes=epoch_minute(now) - self.window_minutes + 1)
+        counted = (
+            Trade.asset_id == asset_id,
+            Trade.status == TradeStatus.COMPLETED,
+            COUNTS_TOWARD_VOLUME,
+        )
+        pending = self._pending[asset_id] = []
+        try:
+            async with self.session_maker() as session:
+                result = await session.execute(
+                    select(Trade.id, Trade.settled_at, Trade.price_per_unit, Trade.total_amount)
+                    .where(*counted, Trade.settled_at >= since)
+                    .order_by(Trade.settled_at, Trade.id)
+                )
+                entries: List[_Entry] = [tuple(row) for row in result.all()]
+                reference = (await session.execute(
+                    select(Trade.price_per_unit)
+                    .where(*counted, Trade.settled_at < since)
+                    .order_by(Trade.settled_at.desc())
+                    .limit(1)
+                )).scalar()
+        finally:
+            del self._pending[asset_id]
+
+        seen = {entry[0] for entry in entries}
+        late = [entry for entry in pending if entry[0] not in seen]
+        if late:
+            entries = sorted(entries + late, key=lambda entry: entry[1])
+
+        window = RollingWindow(self.window_minutes)
+        window.reference_price = reference
+        for _, settled_at, price, amount in entries:
+            window.add(epoch_minute(settled_at), price, amount)
+        self._windows[asset_id] = window
+        logger.debug(f"Loaded {len(entries)} trades into the 24h window of {asset_id}")
+        return window
+
+
+market_stats_tracker = MarketStatsTracker()
+
+
+def get_market_stats_tracker() -> MarketStatsTracker:
+    """Get the process-wide market statistics tracker."""
+    return market_stats_tracker
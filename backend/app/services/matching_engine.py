@@ -0,0 +1,467 @@
+"""
+Order Matching Engine
+In-memory price-time-priority limit order books, one per asset
+"""
+
+from bisect import bisect_left, insort
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+import asyncio
+import itertools
+import uuid
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import get_logger
+from app.db.database import async_session_maker
+from app.db.models import Trade, TradeStatus
+from app.db.repository import release_holding
+
+logger = get_logger(__name__)
+
+BUY = "buy"
+SELL = "sell"
+
+# Share of each fill's value that is burned (0.3% as per PRD)
+TRADE_FEE_PERCENTAGE = 0.003
+
+# Book sequence numbers come from one process-wide counter, so an asset's
+# sequence keeps increasing even when its book is dropped and rebuilt
+_sequence = itertools.count(1)
+
+
+# ==================== Order Book ====================
+
+@dataclass(eq=False)
+class RestingOrder:
+    """An order's live state inside the book."""
+    order_id: str
+    user_id: str
+    side: str
+    price: float
+    quantity: int
+    remaining: int
+    active: bool = True
+
+    @property
+    def filled(self) -> int:
+        return self.quantity - self.remaining
+
+
+@dataclass(frozen=True)
+class Fill:
+    """One match between the incoming (taker) order and a resting (maker) order."""
+    maker_order_id: str
+    maker_user_id: str
+    maker_remaining: int
+    taker_order_id: str
+    taker_user_id: str
+    taker_side: str
+    price: float
+    quantity: int
+
+
+@dataclass(frozen=True)
+class LevelSnapshot:
+    """One aggregated price level as served to clients."""
+    price: float
+    quantity: int
+    orders: int
+    total: float
+    cumulative: float
+
+
+@dataclass(frozen=True)
+class BookSnapshot:
+    """Top levels of both sides of a book at one sequence number."""
+    asset_id: str
+    sequence: int
+    bids: List[LevelSnapshot]
+    asks: List[LevelSnapshot]
+
+
+class PriceLevel:
+    """FIFO queue of orders at one price, with the live quantity kept up to date."""
+    __slots__ = ("price", "orders", "quantity", "live")
+
+    def __init__(self, price: float):
+        self.price = price
+        self.orders: Deque[RestingOrder] = deque()
+        self.quantity = 0
+        self.live = 0
+
+
+class BookSide:
+    """
+    One side of a book: price levels kept in a sorted list for best-price
+    lookups, each level a FIFO queue for time priority.
+    """
+    __slots__ = ("is_bid", "prices", "levels", "_snapshot", "_snapshot_sequence")
+
+    def __init__(self, is_bid: bool):
+        self.is_bid = is_bid
+        self.prices: List[float] = []  # ascending
+        self.levels: Dict[float, PriceLevel] = {}
+        self._snapshot: List[LevelSnapshot] = []
+        self._snapshot_sequence = -1
+
+    def best(self) -> Optional[PriceLevel]:
+        if not self.prices:
+            return None
+        return self.levels[self.prices[-1] if self.is_bid else self.prices[0]]
+
+    def add(self, order: RestingOrder) -> None:
+        level = self.levels.get(order.price)
+        if level is None:
+            level = self.levels[order.price] = PriceLevel(order.price)
+            insort(self.prices, order.price)
+        level.orders.append(order)
+        level.quantity += order.remaining
+        level.live += 1
+
+    def remove_level(self, level: PriceLevel) -> None:
+        del self.levels[level.price]
+        del self.prices[bisect_left(self.prices, level.price)]
+
+    def top(self, depth: int, sequence: int) -> List[LevelSnapshot]:
+        """
+        The best `depth` levels with cumulative totals.
+
+        Built from the best price outwards, so the cost is O(depth) however
+        many orders rest behind it, and kept until the book's sequence
+        moves so repeated reads of an unchanged book are a slice.
+        """
+        if self._snapshot_sequence != sequence:
+            self._snapshot = []
+            self._snapshot_sequence = sequence
+        if len(self._snapshot) < min(depth, len(self.prices)):
+            snapshot = self._snapshot
+            cumulative = snapshot[-1].cumulative if snapshot else 0.0
+            count = len(self.prices)
+            for i in range(len(snapshot), min(depth, count)):
+                level = self.levels[self.prices[count - 1 - i] if self.is_bid else self.prices[i]]
+                total = level.quantity * level.price
+                cumulative += total
+                snapshot.append(LevelSnapshot(level.price, level.quantity, level.live, total, cumulative))
+        return self._snapshot[:depth]
+
+
+class OrderBook:
+    """
+    Limit order book for a single asset.
+
+    Incoming orders match against the opposite side at the resting order's
+    price, best price first and oldest first within a price. Whatever is
+    left rests on the book. Cancelled orders are flagged and skipped when
+    they reach the front of their queue, so a cancel never scans a level.
+    """
+
+    def __init__(self, asset_id: str):
+        self.asset_id = asset_id
+        self.bids = BookSide(is_bid=True)
+        self.asks = BookSide(is_bid=False)
+        self.orders: Dict[str, RestingOrder] = {}
+        # Moves on every change; clients use it to detect missed updates
+        self.sequence = next(_sequence)
+
+    def _side(self, side: str) -> BookSide:
+        return self.bids if side == BUY else self.asks
+
+    def rest(self, order: RestingOrder) -> None:
+        """Put an order on the book without matching it (used for recovery)."""
+        self._side(order.side).add(order)
+        self.orders[order.order_id] = order
+        self.sequence = next(_sequence)
+
+    def submit(self, order: RestingOrder) -> List[Fill]:
+        """Match an incoming order, rest any remainder and return its fills."""
+        self.sequence = next(_sequence)
+        opposite = self.asks if order.side == BUY else self.bids
+        fills: List[Fill] = []
+
+        while order.remaining:
+            level = opposite.best()
+            if level is None:
+                break
+            if (level.price > order.price) if order.side == BUY else (level.price < order.price):
+                break
+
+            queue = level.orders
+            while queue and order.remaining:
+                maker = queue[0]
+                if not maker.active:
+                    queue.popleft()
+                    continue
+                quantity = min(order.remaining, maker.remaining)
+                maker.remaining -= quantity
+                order.remaining -= quantity
+                level.quantity -= quantity
+                fills.append(Fill(
+                    maker_order_id=maker.order_id,
+                    maker_user_id=maker.user_id,
+                    maker_remaining=maker.remaining,
+                    taker_order_id=order.order_id,
+                    taker_user_id=order.user_id,
+                    taker_side=order.side,
+                    price=level.price,
+                    quantity=quantity,
+                ))
+                if not maker.remaining:
+                    queue.popleft()
+                    level.live -= 1
+                    del self.orders[maker.order_id]
+
+            if not level.live:
+                opposite.remove_level(level)
+
+        if order.remaining:
+            self.rest(order)
+        return fills
+
+    def cancel(self, order_id: str) -> Optional[RestingOrder]:
+        """Take an order off the book; None if it is not resting."""
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return None
+        order.active = False
+        self.sequence = next(_sequence)
+        side = self._side(order.side)
+        level = side.levels[order.price]
+        level.quantity -= order.remaining
+        level.live -= 1
+        if not level.live:
+            side.remove_level(level)
+        return order
+
+    def snapshot(self, depth: int) -> BookSnapshot:
+        """Aggregated top `depth` levels per side."""
+        return BookSnapshot(
+            asset_id=self.asset_id,
+            sequence=self.sequence,
+            bids=self.bids.top(depth, self.sequence),
+            asks=self.asks.top(depth, self.sequence),
+        )
+
+
+# ==================== Engine ====================
+
+def _resting_order(trade: Trade) -> RestingOrder:
+    return RestingOrder(
+        order_id=trade.id,
+        user_id=trade.user_id,
+        side=trade.trade_type,
+        price=trade.price_per_unit,
+        quantity=trade.quantity,
+        remaining=trade.quantity - trade.filled_quantity,
+    )
+
+
+def _open_orders_query():
+    return select(Trade).where(
+        Trade.status == TradeStatus.PENDING,
+        Trade.order_id.is_(None),
+    ).order_by(Trade.created_at, Trade.id)
+
+
+def _fill_trade(
+    order_id: str, user_id: str, side: str, asset_id: str, fill: Fill, match_id: str
+) -> Trade:
+    total_amount = fill.quantity * fill.price
+    fee_amount = total_amount * TRADE_FEE_PERCENTAGE
+    return Trade(
+        asset_id=asset_id,
+        user_id=user_id,
+        order_id=order_id,
+        match_id=match_id,
+        trade_type=side,
+        status=TradeStatus.PENDING,
+        quantity=fill.quantity,
+        price_per_unit=fill.price,
+        total_amount=total_amount,
+        fee_amount=fee_amount,
+        fee_burned=fee_amount,  # 100% of fee is burned
+    )
+
+
+class MatchingEngine:
+    """
+    Holds the order books of this process and keeps them in step with the
+    trades table.
+
+    Orders are Trade rows without an order_id; they stay PENDING while they
+    rest and become FILLED or CANCELLED. Every match writes one fill Trade
+    per side, pointing at its order through order_id; fills start PENDING
+    and are settled on Qubic through the execute endpoint.
+
+    A book is rebuilt from the PENDING orders the first time its asset is
+    touched, and again after any failed write, so the database stays the
+    source of truth. Books live in process memory: run a single API worker,
+    or route each asset to one worker, so two books never match the same
+    asset.
+    """
+
+    def __init__(self):
+        self._books: Dict[str, OrderBook] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # Primary sessions for loads outside a request's own session
+        self.session_maker = async_session_maker
+
+    def lock(self, asset_id: str) -> asyncio.Lock:
+        """Serializes matching and persistence for one asset."""
+        lock = self._locks.get(asset_id)
+        if lock is None:
+            lock = self._locks[asset_id] = asyncio.Lock()
+        return lock
+
+    def reset(self, asset_id: Optional[str] = None) -> None:
+        """Drop one book (or all) so it is reloaded from the database."""
+        if asset_id is None:
+            self._books.clear()
+        else:
+            self._books.pop(asset_id, None)
+
+    async def get_book(self, session: AsyncSession, asset_id: str) -> OrderBook:
+        """The asset's book, loaded from its PENDING orders if not in memory."""
+        book = self._books.get(asset_id)
+        if book is None:
+            book = OrderBook(asset_id)
+            result = await session.execute(_open_orders_query().where(Trade.asset_id == asset_id))
+            for trade in result.scalars():
+                book.rest(_resting_order(trade))
+            self._books[asset_id] = book
+        return book
+
+    async def snapshot(self, asset_id: str, depth: int) -> BookSnapshot:
+        """
+        Aggregated top levels of an asset's book.
+
+        A book that is not in memory yet is loaded from the primary, never
+        a replica, since placing orders reuses it. An asset with no open
+        orders, or an id that names no asset, gets an empty snapshot and
+        nothing is cached for it, so reads can't grow the book and lock maps.
+        """
+        book = self._books.get(asset_id)
+        if book is None:
+            async with self.session_maker() as session:
+                first = await session.execute(_open_orders_query().where(Trade.asset_id == asset_id).limit(1))
+                if first.scalars().first() is None:
+                    return BookSnapshot(asset_id=asset_id, sequence=0, bids=[], asks=[])
+                async with self.lock(asset_id):
+                    book = await self.get_book(session, asset_id)
+        return book.snapshot(depth)
+
+    async def recover(self, session: AsyncSession) -> int:
+        """Rebuild every book from PENDING orders; returns the number of orders loaded."""
+        self._books.clear()
+        loaded = 0
+        result = await session.execute(_open_orders_query())
+        for trade in result.scalars():
+            book = self._books.get(trade.asset_id)
+            if book is None:
+                book = self._books[trade.asset_id] = OrderBook(trade.asset_id)
+            book.rest(_resting_order(trade))
+            loaded += 1
+        logger.info(f"Matching engine recovered {loaded} open orders across {len(self._books)} assets")
+        return loaded
+
+    async def place(
+        self,
+        session: AsyncSession,
+        order: Trade,
+        before_commit: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> List[Trade]:
+        """
+        Match a new order and commit it with its fills.
+
+        `before_commit` runs once the order is matched, inside the same
+        transaction, for writes that must commit with it. Returns the fill
+        Trades written for the order's side.
+        """
+        async with self.lock(order.asset_id):
+            try:
+                # Load before adding, so the new order is not read back as resting
+                book = await self.get_book(session, order.asset_id)
+                session.add(order)
+                await session.flush()
+                resting = _resting_order(order)
+                fills = book.submit(resting)
+
+                taker_fills = []
+                for fill in fills:
+                    maker_side = SELL if fill.taker_side == BUY else BUY
+                    match_id = str(uuid.uuid4())
+                    session.add(_fill_trade(
+                        fill.maker_order_id, fill.maker_user_id, maker_side, order.asset_id, fill, match_id
+                    ))
+                    taker_fill = _fill_trade(
+                        order.id, order.user_id, fill.taker_side, order.asset_id, fill, match_id
+                    )
+                    session.add(taker_fill)
+                    taker_fills.append(taker_fill)
+                    # A maker can be hit by several fills; the last one carries its final state
+                    maker_values = {"filled_quantity": Trade.quantity - fill.maker_remaining}
+                    if not fill.maker_remaining:
+                        maker_values["status"] = TradeStatus.FILLED
+                    await session.execute(
+                        update(Trade).where(Trade.id == fill.maker_order_id).values(**maker_values)
+                    )
+
+                order.filled_quantity = resting.filled
+                if not resting.remaining:
+                    order.status = TradeStatus.FILLED
+                if before_commit is not None:
+                    await before_commit()
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                self.reset(order.asset_id)
+                raise
+
+        if fills:
+            logger.info(
+                f"Order {order.id} matched {resting.filled}/{order.quantity} "
+                f"in {len(fills)} fills on {order.asset_id}"
+            )
+        return taker_fills
+
+    async def cancel(self, session: AsyncSession, order: Trade) -> bool:
+        """
+        Take an open order off its book and commit it as CANCELLED.
+
+        The order is read again under the asset lock, so fills that landed
+        since the caller loaded it are seen. Returns False, changing
+        nothing, if it is no longer open. A sell order's unfilled
+        remainder is released back to the seller in the same commit.
+        """
+        async with self.lock(order.asset_id):
+            try:
+                book = await self.get_book(session, order.asset_id)
+                # Rows overwrite the loaded object's attributes as they are fetched
+                (await session.execute(
+                    select(Trade).where(Trade.id == order.id).execution_options(populate_existing=True)
+                )).scalar_one()
+                if order.status != TradeStatus.PENDING or book.cancel(order.id) is None:
+                    return False
+                if order.trade_type == SELL:
+                    await release_holding(
+                        session, order.user_id, order.asset_id, order.quantity - order.filled_quantity
+                    )
+                order.status = TradeStatus.CANCELLED
+                order.updated_at = datetime.utcnow()
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                self.reset(order.asset_id)
+                raise
+        return True
+
+
+matching_engine = MatchingEngine()
+
+
+def get_matching_engine() -> MatchingEngine:
+    """Get the process-wide matching engine"""
+    return matching_engine
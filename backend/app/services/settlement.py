@@ -0,0 +1,510 @@
+"""
+Settlement Worker
+Settles executed fills on Qubic in the background: submit, confirm, retry and complete
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+import asyncio
+import uuid
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.database import async_session_maker
+from app.db.models import RWAAsset, Trade, TradeStatus, User
+from app.db.repository import add_circulating_supply, add_circulating_supply_many
+from app.services.easyconnect import EasyConnectService, get_easyconnect_service
+from app.services.holdings import apply_settled_fills, get_asset_creators, is_issuer_sale
+from app.services.market_stats import get_market_stats_tracker
+from app.services.qubic_rpc import QubicRPCClient, QubicRPCError
+from app.services.volume_buckets import record_settled_volume
+
+logger = get_logger(__name__)
+
+# Transactions are scheduled this many ticks ahead. Qubic takes one
+# transaction per source identity per tick, so each user's fills in a
+# pass go out on consecutive ticks from there.
+SETTLEMENT_TICK_OFFSET = 30
+
+MAX_RETRY_BACKOFF_SECONDS = 300
+
+# Lower bound on tick length, used to park fills until their tick can have passed
+MIN_TICK_SECONDS = 1.0
+
+
+# ==================== Queue ====================
+
+def match_key(trade: Trade) -> str:
+    """The match a fill settles with; fills from before matches were linked stand alone."""
+    return trade.match_id or trade.id
+
+
+async def enqueue_settlement(session: AsyncSession, trade_ids: List[str]) -> Tuple[str, List[str]]:
+    """
+    Queue PENDING fills for the worker under a new settlement id.
+
+    Both fills of a match settle as one, so the other fill of each match
+    is queued along with it. Returns the id and the requested trades
+    actually queued; a trade that stopped being PENDING in the meantime
+    is left out. The caller commits.
+    """
+    settlement_id = str(uuid.uuid4())
+    matches = select(Trade.match_id).where(Trade.id.in_(trade_ids), Trade.match_id.is_not(None))
+    # Lock in id order, so two owners queueing the same match don't deadlock
+    legs = (await session.execute(
+        select(Trade.id)
+        .where(
+            or_(Trade.id.in_(trade_ids), Trade.match_id.in_(matches)),
+            Trade.status == TradeStatus.PENDING,
+        )
+        .order_by(Trade.id)
+        .with_for_update()
+    )).scalars().all()
+    if not legs:
+        return settlement_id, []
+    result = await session.execute(
+        update(Trade)
+        .where(Trade.id.in_(legs), Trade.status == TradeStatus.PENDING)
+        .values(
+            status=TradeStatus.SETTLING,
+            settlement_id=settlement_id,
+            settle_after=None,
+            settlement_data={"attempts": 0, "queued_at": datetime.utcnow().isoformat()},
+        )
+        .returning(Trade.id)
+        .execution_options(synchronize_session=False)
+    )
+    requested = set(trade_ids)
+    return settlement_id, [trade_id for trade_id in result.scalars() if trade_id in requested]
+
+
+async def notify_trade_completed(
+    ec: EasyConnectService,
+    trade: Trade,
+    asset: RWAAsset,
+    buyer: Optional[User],
+    seller: Optional[User],
+) -> None:
+    """Send the EasyConnect completion event, plus the milestone for large trades."""
+    buyer_address = buyer.qubic_public_key if buyer else None
+    seller_address = seller.qubic_public_key if seller else None
+    await ec.notify_trade_completed(
+        trade_id=trade.id,
+        asset_id=asset.id,
+        asset_name=asset.name,
+        trade_type=trade.trade_type,
+        quantity=trade.quantity,
+        price=trade.price_per_unit,
+        total_amount=trade.total_amount,
+        buyer_address=buyer_address or "unknown",
+        seller_address=seller_address,
+        qubic_tx_hash=trade.qubic_tx_hash,
+    )
+
+    # Check for milestone
+    if trade.total_amount >= 1000:
+        await ec.notify_trade_milestone(
+            asset_id=asset.id,
+            asset_name=asset.name,
+            milestone_amount=1000,
+            total_volume=trade.total_amount,
+            trader_address=(buyer_address if buyer else seller_address) or "unknown",
+            airdrop_amount=10,  # VERI airdrop
+        )
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait before the next submission after `attempts` failed ones."""
+    return min(settings.settlement_retry_backoff_seconds * 2 ** (attempts - 1), MAX_RETRY_BACKOFF_SECONDS)
+
+
+# ==================== Worker ====================
+
+class SettlementWorker:
+    """
+    Drains the SETTLING fills.
+
+    Each pass claims up to settlement_batch_size due matches (SKIP LOCKED,
+    so several workers can share the queue), both fills of each, and
+    looks the tick up once:
+
+    - fills without a transaction are submitted, each on its own tick;
+    - fills whose tick has passed are checked with get_transaction_status
+      and resubmitted with backoff if they never landed, until
+      settlement_max_attempts is reached and they fail;
+    - a match completes once both its fills are confirmed, and fails as
+      a whole when either fill fails;
+    - confirmed issuance is added to circulating supply by a guarded
+      atomic UPDATE, and a match that would pass total supply fails;
+    - the holdings ledger takes completed fills and releases the units
+      reserved by failed sells, and completed fills are added to their
+      asset's hourly volume bucket, in the same transaction;
+    - completed matches feed the market stats and notify EasyConnect.
+
+    Every state change is written to settlement_data and pushed to the
+    owner's notifications WebSocket as a settlement_update message.
+    """
+
+    def __init__(self):
+        self.session_maker = async_session_maker
+        self.task = PeriodicTask("settlement", self.run_once, settings.settlement_worker_interval_seconds)
+
+    def wake(self) -> None:
+        """Start the next pass now, e.g. right after fills are queued."""
+        self.task.trigger()
+
+    async def run_once(self) -> int:
+        """One pass over the due fills; returns how many were claimed."""
+        now = datetime.utcnow()
+        async with self.session_maker() as session:
+            matches = await self._claim(session, now)
+            trades = [trade for legs in matches for trade in legs]
+            if not trades:
+                return 0
+
+            updates: List[Tuple[Trade, str, Optional[str]]] = []
+            completed: List[Trade] = []
+            current_tick: Optional[int] = None
+            unsubmitted = [trade for trade in trades if trade.qubic_tx_hash is None]
+            submitted = [trade for trade in trades if trade.qubic_tx_hash is not None]
+            try:
+                async with QubicRPCClient() as qubic:
+                    current_tick = await qubic.get_current_tick()
+                    updates += self._submit(unsubmitted, current_tick, now)
+                    confirmed, missing = await self._confirm(qubic, submitted, current_tick, now)
+            except Exception as e:
+                # Node unreachable: nothing was sent, so no attempt is used up
+                logger.warning(f"Settlement pass could not reach Qubic: {e}")
+                confirmed, missing = [], []
+                for trade in trades:
+                    self._defer(trade, now)
+
+            settled, resolved = self._resolve(matches, confirmed, missing, now)
+            updates += resolved
+            over_supply = await self._add_supply(session, [trade for legs in settled for trade in legs])
+            for legs in settled:
+                if any(trade.id in over_supply for trade in legs):
+                    updates += self._fail_match(legs, "Would exceed the asset's total supply", now)
+                    continue
+                for trade in legs:
+                    self._complete(trade, now)
+                    completed.append(trade)
+                    updates.append((trade, "completed", None))
+            failed = [trade for trade, stage, _ in updates if stage == "failed"]
+            await apply_settled_fills(session, completed, failed, now)
+            await record_settled_volume(session, completed, now)
+            await session.commit()
+
+            if completed:
+                await self._after_completion(session, completed)
+
+        tracker = get_market_stats_tracker()
+        for trade in completed:
+            tracker.record(trade)
+        await asyncio.gather(*(self._push(trade, stage, error) for trade, stage, error in updates))
+        logger.debug(
+            f"Settlement pass at tick {current_tick}: {len(trades)} claimed, {len(completed)} completed"
+        )
+        return len(trades)
+
+    async def _claim(self, session: AsyncSession, now: datetime) -> List[List[Trade]]:
+        """
+        Lock the due matches and return the fills of each.
+
+        The buy fill leads its match, and a fill without a match leads
+        itself. Leaders are claimed with SKIP LOCKED; the other fill of
+        each match is then locked behind its leader, which only the
+        worker holding the leader ever does.
+        """
+        result = await session.execute(
+            select(Trade)
+            .where(
+                Trade.status == TradeStatus.SETTLING,
+                or_(Trade.match_id.is_(None), Trade.trade_type == "buy"),
+                or_(Trade.settle_after.is_(None), Trade.settle_after <= now),
+            )
+            .order_by(Trade.settle_after.nulls_first(), Trade.created_at)
+            .limit(settings.settlement_batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        matches: Dict[str, List[Trade]] = {}
+        for trade in result.scalars():
+            matches[match_key(trade)] = [trade]
+        match_ids = [legs[0].match_id for legs in matches.values() if legs[0].match_id]
+        if match_ids:
+            result = await session.execute(
+                select(Trade)
+                .where(
+                    Trade.match_id.in_(match_ids),
+                    Trade.trade_type != "buy",
+                    Trade.status == TradeStatus.SETTLING,
+                )
+                .order_by(Trade.id)
+                .with_for_update()
+            )
+            for trade in result.scalars():
+                matches[trade.match_id].append(trade)
+        return list(matches.values())
+
+    def _resolve(
+        self,
+        matches: List[List[Trade]],
+        confirmed: List[Trade],
+        missing: List[Tuple[Trade, str]],
+        now: datetime,
+    ) -> Tuple[List[List[Trade]], List[Tuple[Trade, str, Optional[str]]]]:
+        """
+        Decide each match from its fills' outcomes in this pass.
+
+        Returns the matches whose fills are all confirmed, ready to
+        complete, and the updates of the rest: a fill that never landed is
+        retried, and once one runs out of attempts its whole match fails.
+        A match still waiting on a fill keeps all its fills parked until
+        the latest of them is due, so they are picked up together again.
+        """
+        confirmed_ids = {trade.id for trade in confirmed}
+        missing_errors = {trade.id: error for trade, error in missing}
+        settled: List[List[Trade]] = []
+        updates: List[Tuple[Trade, str, Optional[str]]] = []
+        for legs in matches:
+            failure: Optional[str] = None
+            for trade in legs:
+                if trade.id in missing_errors:
+                    outcome = self._retry(trade, missing_errors[trade.id], now)
+                    updates.append(outcome)
+                    if outcome[1] == "failed":
+                        failure = outcome[2]
+            if failure is not None:
+                updates += self._fail_match(legs, f"The other side of the match failed: {failure}", now)
+            elif all(trade.id in confirmed_ids for trade in legs):
+                settled.append(legs)
+            else:
+                due = max((trade.settle_after for trade in legs if trade.settle_after), default=None)
+                for trade in legs:
+                    trade.settle_after = due
+        return settled, updates
+
+    def _submit(self, trades: List[Trade], current_tick: int, now: datetime) -> List[Tuple[Trade, str, Optional[str]]]:
+        next_tick: Dict[str, int] = defaultdict(lambda: current_tick + SETTLEMENT_TICK_OFFSET)
+        updates = []
+        for trade in trades:
+            tick = next_tick[trade.user_id]
+            next_tick[trade.user_id] = tick + 1
+
+            # In production: sign the transfer and broadcast_transaction() it.
+            # For demo: simulate the broadcast; the fill confirms once its tick passes.
+            trade.qubic_tx_hash = f"QT{trade.id[:16].upper()}"
+            trade.qubic_tick = tick
+            trade.settlement_data = {
+                **(trade.settlement_data or {}),
+                "attempts": (trade.settlement_data or {}).get("attempts", 0) + 1,
+                "submitted_at": now.isoformat(),
+                "simulated": True,
+            }
+            self._park(trade, current_tick, now)
+            updates.append((trade, "submitted", None))
+        return updates
+
+    def _park(self, trade: Trade, current_tick: int, now: datetime) -> None:
+        """Leave a submitted fill out of the queue until its tick can have passed."""
+        trade.settle_after = now + timedelta(seconds=(trade.qubic_tick - current_tick + 1) * MIN_TICK_SECONDS)
+
+    async def _confirm(
+        self,
+        qubic: QubicRPCClient,
+        trades: List[Trade],
+        current_tick: int,
+        now: datetime,
+    ) -> Tuple[List[Trade], List[Tuple[Trade, str]]]:
+        """
+        Check submitted fills whose tick has passed.
+
+        Returns the confirmed fills and the ones that never landed. A failed
+        status lookup proves nothing either way, so that fill is only
+        deferred and keeps its transaction.
+        """
+        due = []
+        for trade in trades:
+            if trade.qubic_tick < current_tick:
+                due.append(trade)
+            else:
+                self._park(trade, current_tick, now)
+        live = [trade for trade in due if not (trade.settlement_data or {}).get("simulated")]
+        statuses = await asyncio.gather(
+            *(qubic.get_transaction_status(trade.qubic_tx_hash) for trade in live),
+            return_exceptions=True,
+        )
+        status_by_id: Dict[str, Any] = dict(zip((trade.id for trade in live), statuses))
+
+        confirmed, missing = [], []
+        for trade in due:
+            if trade.id not in status_by_id:
+                confirmed.append(trade)  # simulated broadcast
+                continue
+            tx_status = status_by_id[trade.id]
+            if isinstance(tx_status, QubicRPCError) and tx_status.status_code == 404:
+                missing.append((trade, f"Transaction not included by tick {trade.qubic_tick}"))
+            elif isinstance(tx_status, Exception):
+                logger.warning(f"Status check for trade {trade.id} failed: {tx_status}")
+                self._defer(trade, now)
+            elif tx_status.get("transactionStatus"):
+                confirmed.append(trade)
+            else:
+                missing.append((trade, f"Transaction not included by tick {trade.qubic_tick}"))
+        return confirmed, missing
+
+    def _defer(self, trade: Trade, now: datetime) -> None:
+        trade.settle_after = now + timedelta(seconds=settings.settlement_retry_backoff_seconds)
+
+    def _retry(self, trade: Trade, error: str, now: datetime) -> Tuple[Trade, str, Optional[str]]:
+        data = dict(trade.settlement_data or {})
+        attempts = data.get("attempts", 0)
+        if attempts >= settings.settlement_max_attempts:
+            return self._fail(trade, f"{error} (after {attempts} attempts)", now)
+
+        # Resubmit on a fresh tick once the backoff has passed
+        data["error"] = error
+        trade.qubic_tx_hash = None
+        trade.qubic_tick = None
+        trade.settle_after = now + timedelta(seconds=retry_delay(attempts))
+        trade.settlement_data = data
+        return trade, "retrying", error
+
+    def _fail(self, trade: Trade, error: str, now: datetime) -> Tuple[Trade, str, Optional[str]]:
+        trade.status = TradeStatus.FAILED
+        trade.settlement_data = {**(trade.settlement_data or {}), "error": error, "failed_at": now.isoformat()}
+        logger.error(f"Settlement of trade {trade.id} failed: {error}")
+        return trade, "failed", error
+
+    def _fail_match(self, legs: List[Trade], error: str, now: datetime) -> List[Tuple[Trade, str, Optional[str]]]:
+        """Fail the fills of a match that have not failed already."""
+        return [self._fail(trade, error, now) for trade in legs if trade.status != TradeStatus.FAILED]
+
+    async def _add_supply(self, session: AsyncSession, trades: List[Trade]) -> Set[str]:
+        """
+        Add confirmed issuance to circulating supply; returns the fills that don't fit.
+
+        Every match is a buy fill and a sell fill, and only a match whose
+        sell side is the creator's issues new units; resales move units
+        that already circulate. So supply grows with the creator's sell
+        fills alone, as in the holdings ledger.
+
+        One guarded UPDATE covers every asset. An asset whose whole batch
+        would pass its total supply is retried fill by fill, oldest first,
+        so the fills that still fit go through.
+        """
+        if not trades:
+            return set()
+        creators = await get_asset_creators(session, (trade.asset_id for trade in trades))
+        supply: Dict[str, int] = defaultdict(int)
+        issued: Dict[str, List[Trade]] = defaultdict(list)
+        for trade in trades:
+            if is_issuer_sale(trade.trade_type, trade.user_id, creators.get(trade.asset_id)):
+                supply[trade.asset_id] += trade.quantity
+                issued[trade.asset_id].append(trade)
+
+        applied = await add_circulating_supply_many(session, supply)
+        rejected: Set[str] = set()
+        for asset_id in supply.keys() - applied.keys():
+            for trade in issued[asset_id]:
+                if await add_circulating_supply(session, asset_id, trade.quantity) is None:
+                    rejected.add(trade.id)
+        return rejected
+
+    def _complete(self, trade: Trade, now: datetime) -> None:
+        trade.status = TradeStatus.COMPLETED
+        trade.settled_at = now
+        trade.settle_after = None
+        data = dict(trade.settlement_data or {})
+        data.pop("error", None)
+        data["confirmed_at"] = now.isoformat()
+        trade.settlement_data = data
+
+    async def _after_completion(self, session: AsyncSession, trades: List[Trade]) -> None:
+        """Trade feed and EasyConnect events for completed matches; failures are only logged."""
+        # One event per match, from its buy fill, naming both sides
+        buyers: Dict[str, str] = {}
+        sellers: Dict[str, str] = {}
+        for trade in trades:
+            sides = buyers if trade.trade_type == "buy" else sellers
+            sides[match_key(trade)] = trade.user_id
+        leads = [trade for trade in trades if trade.match_id is None or trade.trade_type == "buy"]
+        try:
+            assets = {
+                asset.id: asset for asset in (await session.execute(
+                    select(RWAAsset).where(RWAAsset.id.in_({t.asset_id for t in trades}))
+                )).scalars()
+            }
+            users = {
+                user.id: user for user in (await session.execute(
+                    select(User).where(User.id.in_({t.user_id for t in trades}))
+                )).scalars()
+            }
+        except Exception as e:
+            logger.warning(f"Failed to load settlement notification details: {e}")
+            return
+
+        # Deferred: the API package imports the trade routes, which import this module
+        from app.api.v1.websocket import broadcast_trade_executed
+
+        await asyncio.gather(*(
+            broadcast_trade_executed({
+                "trade_id": trade.id,
+                "asset_id": trade.asset_id,
+                "trade_type": trade.trade_type,
+                "quantity": trade.quantity,
+                "price": trade.price_per_unit,
+                "total_amount": trade.total_amount,
+                "qubic_tick": trade.qubic_tick,
+            })
+            for trade in leads
+        ), return_exceptions=True)
+        try:
+            async with get_easyconnect_service() as ec:
+                await asyncio.gather(*(
+                    notify_trade_completed(
+                        ec,
+                        trade,
+                        assets[trade.asset_id],
+                        users.get(buyers.get(match_key(trade))),
+                        users.get(sellers.get(match_key(trade))),
+                    )
+                    for trade in leads
+                ), return_exceptions=True)
+        except Exception as e:
+            logger.warning(f"Failed to send EasyConnect notifications: {e}")
+
+    async def _push(self, trade: Trade, stage: str, error: Optional[str]) -> None:
+        from app.api.v1.websocket import manager
+
+        await manager.send_to_user(trade.user_id, {
+            "type": "settlement_update",
+            "data": {
+                "settlement_id": trade.settlement_id,
+                "trade_id": trade.id,
+                "stage": stage,  # submitted, retrying, completed or failed
+                "status": trade.status.value,
+                "qubic_tx_hash": trade.qubic_tx_hash,
+                "qubic_tick": trade.qubic_tick,
+                "attempts": (trade.settlement_data or {}).get("attempts", 0),
+                "error": error,
+            },
+            "timestamp": datetime.utcnow().isoformat(),
+        })
+
+
+settlement_worker = SettlementWorker()
+
+
+def get_settlement_worker() -> SettlementWorker:
+    """Get the process-wide settlement worker."""
+    return settlement_worker
+
+
+if __name__ == "__main__":
+    asyncio.run(settlement_worker.run_once())
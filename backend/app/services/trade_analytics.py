@@ -0,0 +1,201 @@
+"""
+Trade Analytics Engine
+Per-asset VWAP, realized volatility, max drawdown and turnover over columnar trade arrays
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import Trade, TradeStatus
+from app.services.trades import COUNTS_TOWARD_VOLUME
+
+
+@dataclass
+class TradeArrays:
+    """
+    Completed fills as columns, grouped by asset and in settlement order.
+
+    Row i belongs to assets[codes[i]]; each asset's rows are contiguous,
+    and starts holds the first row of each run.
+    """
+    assets: List[str]
+    codes: np.ndarray       # int32 index into assets
+    timestamps: np.ndarray  # float64 seconds since the epoch
+    prices: np.ndarray      # float64
+    quantities: np.ndarray  # float64
+
+    @property
+    def starts(self) -> np.ndarray:
+        if not len(self.codes):
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(np.r_[True, self.codes[1:] != self.codes[:-1]])
+
+
+@dataclass
+class AssetMetrics:
+    asset_id: str
+    trade_count: int
+    volume: float  # units traded
+    notional: float  # traded value in QUBIC
+    vwap: Optional[float]
+    realized_volatility: float  # sqrt of summed squared trade-to-trade log returns
+    max_drawdown: float  # largest fall from a running high, as a fraction of it
+    turnover: Optional[float]  # units traded over circulating supply
+    first_trade_at: Optional[datetime]
+    last_trade_at: Optional[datetime]
+
+
+# ==================== Loading ====================
+
+def trade_arrays_query(asset_ids: Optional[Sequence[str]], start: datetime, end: datetime):
+    """
+    Columns of the fills settled in [start, end), grouped by asset, oldest first.
+
+    Only fills that count toward volume are read (COUNTS_TOWARD_VOLUME),
+    as for candles and volume buckets.
+    """
+    query = select(
+        Trade.asset_id,
+        func.extract("epoch", Trade.settled_at),
+        Trade.price_per_unit,
+        Trade.quantity,
+    ).where(
+        Trade.status == TradeStatus.COMPLETED,
+        Trade.settled_at >= start,
+        Trade.settled_at < end,
+        COUNTS_TOWARD_VOLUME,
+    ).order_by(Trade.asset_id, Trade.settled_at, Trade.id)
+    if asset_ids is not None:
+        query = query.where(Trade.asset_id.in_(asset_ids))
+    return query
+
+
+async def load_trade_arrays(
+    session: AsyncSession,
+    asset_ids: Optional[Sequence[str]],
+    start: datetime,
+    end: datetime,
+) -> TradeArrays:
+    """
+    Stream a window of fills into columnar arrays.
+
+    Rows are fetched through a server-side cursor in batches and each
+    batch is converted to arrays at once, so no ORM objects are built and
+    only one batch of Python tuples is alive at a time.
+    """
+    assets: List[str] = []
+    codes, timestamps, prices, quantities = [], [], [], []
+    result = await session.stream(
+        trade_arrays_query(asset_ids, start, end)
+        .execution_options(yield_per=settings.trade_analytics_batch_size)
+    )
+    async for batch in result.partitions():
+        ids, epochs, batch_prices, batch_quantities = zip(*batch)
+        labels = np.asarray(ids, dtype=object)
+        # Rows arrive grouped by asset: a new code wherever the id changes
+        changed = np.r_[not assets or ids[0] != assets[-1], labels[1:] != labels[:-1]]
+        first_code = len(assets) - 1
+        assets.extend(labels[changed].tolist())
+        codes.append((first_code + np.cumsum(changed)).astype(np.int32))
+        timestamps.append(np.asarray(epochs, dtype=np.float64))
+        prices.append(np.asarray(batch_prices, dtype=np.float64))
+        quantities.append(np.asarray(batch_quantities, dtype=np.float64))
+
+    def _join(parts: List[np.ndarray], dtype) -> np.ndarray:
+        return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+    return TradeArrays(
+        assets=assets,
+        codes=_join(codes, np.int32),
+        timestamps=_join(timestamps, np.float64),
+        prices=_join(prices, np.float64),
+        quantities=_join(quantities, np.float64),
+    )
+
+
+# ==================== Metrics ====================
+
+def _grouped_max_drawdown(log_prices: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Max drawdown per group from one running maximum over all rows.
+
+    Each group is lifted above every earlier one before the accumulate,
+    so its running high starts at its own first price.
+    """
+    span = log_prices.max() - log_prices.min() + 1.0
+    lift = np.repeat(np.arange(len(starts)) * span, counts)
+    running_high = np.maximum.accumulate(log_prices + lift) - lift
+    drawdowns = -np.expm1(log_prices - running_high)
+    return np.maximum.reduceat(drawdowns, starts)
+
+
+def compute_metrics(
+    trades: TradeArrays,
+    circulating_supply: Optional[Dict[str, int]] = None,
+) -> List[AssetMetrics]:
+    """
+    Every metric for every asset in `trades`, as grouped reductions.
+
+    Each metric is a handful of whole-array operations whatever the
+    number of assets; nothing loops over rows.
+    """
+    if not len(trades.codes):
+        return []
+    starts = trades.starts
+    ends = np.r_[starts[1:], len(trades.codes)]
+    counts = ends - starts
+
+    notional_by_row = trades.prices * trades.quantities
+    volume = np.add.reduceat(trades.quantities, starts)
+    notional = np.add.reduceat(notional_by_row, starts)
+
+    log_prices = np.log(trades.prices)
+    squared_returns = np.empty_like(log_prices)
+    squared_returns[0] = 0.0
+    squared_returns[1:] = np.diff(log_prices) ** 2
+    squared_returns[starts] = 0.0  # no return across an asset boundary
+    volatility = np.sqrt(np.add.reduceat(squared_returns, starts))
+
+    max_drawdown = _grouped_max_drawdown(log_prices, starts, counts)
+
+    supply = circulating_supply or {}
+    metrics = []
+    for group, code in enumerate(trades.codes[starts].tolist()):
+        asset_id = trades.assets[code]
+        units = float(volume[group])
+        asset_supply = supply.get(asset_id)
+        metrics.append(AssetMetrics(
+            asset_id=asset_id,
+            trade_count=int(counts[group]),
+            volume=units,
+            notional=float(notional[group]),
+            vwap=float(notional[group]) / units if units else None,
+            realized_volatility=float(volatility[group]),
+            max_drawdown=float(max_drawdown[group]),
+            turnover=units / asset_supply if asset_supply else None,
+            first_trade_at=datetime.utcfromtimestamp(trades.timestamps[starts[group]]),
+            last_trade_at=datetime.utcfromtimestamp(trades.timestamps[ends[group] - 1]),
+        ))
+    return metrics
+
+
+def empty_metrics(asset_id: str) -> AssetMetrics:
+    """Metrics of an asset with no fills in the window."""
+    return AssetMetrics(
+        asset_id=asset_id,
+        trade_count=0,
+        volume=0.0,
+        notional=0.0,
+        vwap=None,
+        realized_volatility=0.0,
+        max_drawdown=0.0,
+        turnover=None,
+        first_trade_at=None,
+        last_trade_at=None,
+    )
@@ -0,0 +1,24 @@
+"""
+Trade Volume Rule
+Which settled trades count toward traded volume, for Python and for SQL
+"""
+
+from sqlalchemy import or_
+
+from app.db.models import Trade
+
+
+def counts_toward_volume(trade: Trade) -> bool:
+    """
+    Whether a completed trade adds to traded volume.
+
+    Matches are stored as one fill per side, so only the buy side of a fill
+    is counted; trades from before matching (no order_id) count once each.
+    Market statistics, candles, volume buckets and trade analytics all
+    count by this rule.
+    """
+    return trade.order_id is None or trade.trade_type == "buy"
+
+
+# counts_toward_volume as a WHERE clause on the trades table
+COUNTS_TOWARD_VOLUME = or_(Trade.order_id.is_(None), Trade.trade_type == "buy")
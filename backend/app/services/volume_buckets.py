@@ -0,0 +1,191 @@
+"""
+Asset Volume Buckets
+Hourly settled volume per asset, kept current by settlement and used for rankings
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncio
+
+from sqlalchemy import and_, case, delete, func, literal, select, text
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.logging import get_logger
+from app.db.database import async_session_maker
+from app.db.models import AssetStatus, AssetVolumeBucket, RWAAsset, Trade, TradeStatus
+from app.services.candles import bucket_expression, bucket_start
+from app.services.trades import COUNTS_TOWARD_VOLUME, counts_toward_volume
+
+logger = get_logger(__name__)
+
+BUCKET_INTERVAL = "1h"
+
+# Ranking windows and the number of hourly buckets each one sums
+RANKING_WINDOWS: Dict[str, int] = {
+    "24h": 24,
+    "7d": 7 * 24,
+    "30d": 30 * 24,
+}
+
+RANKING_SORTS = ("volume", "gainers")
+
+
+@dataclass
+class Bucket:
+    """One asset's fills in one hour of a settlement pass."""
+    volume: float
+    trade_count: int
+    open_price: float
+    close_price: float
+
+
+def fold_fills(trades: Iterable[Trade]) -> Dict[Tuple[str, datetime], Bucket]:
+    """Group settled fills by (asset, hour), first to last fill."""
+    buckets: Dict[Tuple[str, datetime], Bucket] = {}
+    fills = sorted(
+        (trade for trade in trades if counts_toward_volume(trade)),
+        key=lambda t: (t.settled_at, t.created_at, t.id),
+    )
+    for trade in fills:
+        key = (trade.asset_id, bucket_start(trade.settled_at, BUCKET_INTERVAL))
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = Bucket(trade.total_amount, 1, trade.price_per_unit, trade.price_per_unit)
+            continue
+        bucket.volume += trade.total_amount
+        bucket.trade_count += 1
+        bucket.close_price = trade.price_per_unit
+    return buckets
+
+
+# ==================== Settlement ====================
+
+async def record_settled_volume(session: AsyncSession, completed: List[Trade], now: datetime) -> None:
+    """
+    Add fills completed in the caller's transaction to their hourly buckets.
+
+    One upsert adds volume and trade count and moves the close price; rows
+    are written in key order so concurrent settlement passes queue on them
+    instead of deadlocking. The caller commits.
+    """
+    buckets = fold_fills(completed)
+    if not buckets:
+        return
+    rows = [
+        {"asset_id": asset_id, "bucket_start": start, **vars(bucket), "updated_at": now}
+        for (asset_id, start), bucket in sorted(buckets.items())
+    ]
+    stmt = pg_insert(AssetVolumeBucket).values(rows)
+    await session.execute(stmt.on_conflict_do_update(
+        index_elements=["asset_id", "bucket_start"],
+        set_={
+            "volume": AssetVolumeBucket.volume + stmt.excluded.volume,
+            "trade_count": AssetVolumeBucket.trade_count + stmt.excluded.trade_count,
+            "close_price": stmt.excluded.close_price,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    ))
+
+
+# ==================== Rankings ====================
+
+def window_start(window: str, now: Optional[datetime] = None) -> datetime:
+    """First hour of a ranking window; the current, partial hour is the last."""
+    hours = RANKING_WINDOWS[window]
+    return bucket_start(now or datetime.utcnow(), BUCKET_INTERVAL) - timedelta(hours=hours - 1)
+
+
+def ranking_query(window: str, sort: str = "volume", limit: int = 5, now: Optional[datetime] = None):
+    """
+    Listed assets with the most volume, or the largest price gain, in a window.
+
+    Rows are (RWAAsset, volume, trade_count, price_change). Only the
+    window's bucket rows are read, through the (bucket_start, asset_id)
+    index, and the first and last hour of each asset are fetched by
+    primary key for the price change (percent, first open to last close).
+    Assets without fills in the window are not ranked.
+    """
+    if sort not in RANKING_SORTS:
+        raise ValueError(f"Unknown ranking sort: {sort}")
+    totals = select(
+        AssetVolumeBucket.asset_id,
+        func.sum(AssetVolumeBucket.volume).label("volume"),
+        func.sum(AssetVolumeBucket.trade_count).label("trade_count"),
+        func.min(AssetVolumeBucket.bucket_start).label("first_bucket"),
+        func.max(AssetVolumeBucket.bucket_start).label("last_bucket"),
+    ).where(
+        AssetVolumeBucket.bucket_start >= window_start(window, now)
+    ).group_by(AssetVolumeBucket.asset_id).subquery()
+
+    first = aliased(AssetVolumeBucket)
+    last = aliased(AssetVolumeBucket)
+    price_change = case(
+        (first.open_price > 0, (last.close_price - first.open_price) / first.open_price * 100),
+        else_=literal(0.0),
+    ).label("price_change")
+    order = totals.c.volume.desc() if sort == "volume" else price_change.desc()
+
+    return select(
+        RWAAsset, totals.c.volume, totals.c.trade_count, price_change
+    ).join(
+        totals, totals.c.asset_id == RWAAsset.id
+    ).join(
+        first, and_(first.asset_id == totals.c.asset_id, first.bucket_start == totals.c.first_bucket)
+    ).join(
+        last, and_(last.asset_id == totals.c.asset_id, last.bucket_start == totals.c.last_bucket)
+    ).where(
+        RWAAsset.status == AssetStatus.LISTED
+    ).order_by(order, RWAAsset.id).limit(limit)
+
+
+# ==================== Rebuild ====================
+
+async def rebuild_volume_buckets(session: AsyncSession) -> int:
+    """
+    Recompute every bucket from the completed trades and commit.
+
+    The table is locked against writes for the duration, so settlement
+    waits for the rebuild rather than adding to buckets it is about to
+    replace. Returns the number of buckets written.
+    """
+    await session.execute(text("LOCK TABLE asset_volume_buckets IN EXCLUSIVE MODE"))
+    await session.execute(delete(AssetVolumeBucket))
+
+    hour = bucket_expression(Trade.settled_at, BUCKET_INTERVAL)
+    price = Trade.price_per_unit
+    source = select(
+        Trade.asset_id,
+        hour,
+        func.sum(Trade.total_amount),
+        func.count(),
+        array_agg(aggregate_order_by(price, Trade.settled_at, Trade.created_at, Trade.id))[1],
+        array_agg(aggregate_order_by(price, Trade.settled_at.desc(), Trade.created_at.desc(), Trade.id.desc()))[1],
+        func.now(),
+    ).where(
+        Trade.status == TradeStatus.COMPLETED,
+        Trade.settled_at.is_not(None),
+        COUNTS_TOWARD_VOLUME,
+    ).group_by(Trade.asset_id, hour)
+    result = await session.execute(
+        pg_insert(AssetVolumeBucket).from_select(
+            ["asset_id", "bucket_start", "volume", "trade_count", "open_price", "close_price", "updated_at"],
+            source,
+        )
+    )
+    await session.commit()
+    logger.info(f"Rebuilt {result.rowcount} volume buckets from completed trades")
+    return result.rowcount
+
+
+async def run_volume_bucket_rebuild() -> None:
+    """Rebuild the buckets on their own session, for the command line."""
+    async with async_session_maker() as session:
+        await rebuild_volume_buckets(session)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_volume_bucket_rebuild())
@@ -0,0 +1,137 @@
+"""
+VeriAssets - Atomic Counter Benchmark
+
+Fires N concurrent buyers at one asset, each adding to its circulating
+supply, and compares the old ORM read-modify-write with the guarded
+atomic UPDATE in app.db.repository. Supply is reset so only `--buyers -
+--overflow` buys fit under total_supply; a correct strategy ends exactly
+at total_supply with the overflow buys rejected. Needs the Postgres used
+by the query-plan suite:
+
+    QUERY_PLAN_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.bench_atomic_counters --buyers 1000
+"""
+from dataclasses import dataclass
+import argparse
+import asyncio
+import os
+import time
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.models import RWAAsset
+from app.db.repository import add_circulating_supply
+from benchmarks.query_plans import DATABASE_URL_ENV, HOT_IDS, create_plan_engine, seed_database
+
+ASSET_ID = HOT_IDS["asset_id"]
+
+
+@dataclass
+class Outcome:
+    strategy: str
+    seconds: float
+    accepted: int
+    rejected: int
+    errors: int
+    start_supply: int
+    final_supply: int
+    total_supply: int
+
+    @property
+    def lost_updates(self) -> int:
+        """Buys reported as accepted whose increment never reached the row."""
+        return self.accepted - (self.final_supply - self.start_supply)
+
+    @property
+    def correct(self) -> bool:
+        return self.final_supply == self.total_supply and self.lost_updates == 0 and self.errors == 0
+
+
+async def read_modify_write(session: AsyncSession) -> bool:
+    """The old pattern: load the row, check and bump in Python, flush."""
+    asset = await session.get(RWAAsset, ASSET_ID, populate_existing=True)
+    if asset.circulating_supply + 1 > asset.total_supply:
+        return False
+    asset.circulating_supply += 1
+    await session.commit()
+    return True
+
+
+async def atomic_update(session: AsyncSession) -> bool:
+    accepted = await add_circulating_supply(session, ASSET_ID, 1) is not None
+    await session.commit()
+    return accepted
+
+
+async def run_strategy(engine: AsyncEngine, name: str, buy, buyers: int, overflow: int) -> Outcome:
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        total_supply = (await conn.execute(
+            select(RWAAsset.total_supply).where(RWAAsset.id == ASSET_ID)
+        )).scalar_one()
+        start_supply = total_supply - (buyers - overflow)
+        await conn.execute(
+            update(RWAAsset).where(RWAAsset.id == ASSET_ID).values(circulating_supply=start_supply)
+        )
+
+    async def buyer() -> bool:
+        async with session_maker() as session:
+            return await buy(session)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(buyer() for _ in range(buyers)), return_exceptions=True)
+    seconds = time.perf_counter() - start
+
+    async with engine.connect() as conn:
+        final_supply = (await conn.execute(
+            select(RWAAsset.circulating_supply).where(RWAAsset.id == ASSET_ID)
+        )).scalar_one()
+    return Outcome(
+        strategy=name,
+        seconds=seconds,
+        accepted=sum(1 for r in results if r is True),
+        rejected=sum(1 for r in results if r is False),
+        errors=sum(1 for r in results if isinstance(r, BaseException)),
+        start_supply=start_supply,
+        final_supply=final_supply,
+        total_supply=total_supply,
+    )
+
+
+async def run(buyers: int, overflow: int, pool_size: int) -> None:
+    seed_engine = create_plan_engine()
+    try:
+        await seed_database(seed_engine)
+    finally:
+        await seed_engine.dispose()
+
+    engine = create_async_engine(
+        os.environ[DATABASE_URL_ENV], pool_size=pool_size, max_overflow=0, pool_timeout=120,
+    )
+    try:
+        for name, buy in (("read-modify-write", read_modify_write), ("atomic UPDATE", atomic_update)):
+            outcome = await run_strategy(engine, name, buy, buyers, overflow)
+            print(
+                f"{outcome.strategy:18s}: {outcome.seconds * 1000:8.1f} ms, "
+                f"{buyers / outcome.seconds:8.0f} buys/s, {outcome.accepted} accepted, "
+                f"{outcome.rejected} rejected, {outcome.errors} errors, "
+                f"supply {outcome.final_supply}/{outcome.total_supply}, "
+                f"{outcome.lost_updates} lost updates ({'correct' if outcome.correct else 'WRONG'})"
+            )
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--buyers", type=int, default=1000)
+    parser.add_argument("--overflow", type=int, default=100, help="buys that should be rejected by the guard")
+    parser.add_argument("--pool-size", type=int, default=20)
+    args = parser.parse_args()
+    if not os.environ.get(DATABASE_URL_ENV):
+        raise SystemExit(f"Set {DATABASE_URL_ENV} to a scratch Postgres database")
+    asyncio.run(run(args.buyers, args.overflow, args.pool_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Composite indexes for keyset pagination
+
+Revision ID: 003_keyset_indexes
+Revises: 002_sync_models
+Create Date: 2026-10-16 09:00:00.000000
+
+Cursor pagination seeks on (sort column, id). Each sortable column gets a
+composite index with id as tie-breaker so pages are index range scans.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003_keyset_indexes'
+down_revision: Union[str, None] = '002_sync_models'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ==================== RWA Assets ====================
+    op.create_index('ix_rwa_assets_created_at_id', 'rwa_assets', ['created_at', 'id'])
+    op.create_index('ix_rwa_assets_price_per_unit_id', 'rwa_assets', ['price_per_unit', 'id'])
+    op.create_index('ix_rwa_assets_verification_score_id', 'rwa_assets', ['verification_score', 'id'])
+    op.create_index('ix_rwa_assets_name_id', 'rwa_assets', ['name', 'id'])
+
+    # ==================== Trades ====================
+    op.create_index('ix_trades_user_id_created_at_id', 'trades', ['user_id', 'created_at', 'id'])
+
+    # ==================== Nostromo Proposals ====================
+    op.create_index('ix_nostromo_proposals_created_at_id', 'nostromo_proposals', ['created_at', 'id'])
+    op.create_index(
+        'ix_nostromo_proposals_status_created_at_id',
+        'nostromo_proposals',
+        ['status', 'created_at', 'id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_nostromo_proposals_status_created_at_id', 'nostromo_proposals')
+    op.drop_index('ix_nostromo_proposals_created_at_id', 'nostromo_proposals')
+    op.drop_index('ix_trades_user_id_created_at_id', 'trades')
+    op.drop_index('ix_rwa_assets_name_id', 'rwa_assets')
+    op.drop_index('ix_rwa_assets_verification_score_id', 'rwa_assets')
+    op.drop_index('ix_rwa_assets_price_per_unit_id', 'rwa_assets')
+    op.drop_index('ix_rwa_assets_created_at_id', 'rwa_assets')
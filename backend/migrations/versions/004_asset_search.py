@@ -0,0 +1,67 @@
+"""Full-text and trigram search indexes for assets
+
+Revision ID: 004_asset_search
+Revises: 003_keyset_indexes
+Create Date: 2026-10-16 11:00:00.000000
+
+Adds a generated, weighted tsvector over name, symbol and description
+with a GIN index, plus pg_trgm GIN indexes so substring matches on name
+and symbol no longer scan the whole table.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004_asset_search'
+down_revision: Union[str, None] = '003_keyset_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Superseded by 015_asset_search_config, which parses every part with 'simple'
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(symbol, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # ==================== Full-Text Search ====================
+    op.add_column(
+        'rwa_assets',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_SQL, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        'ix_rwa_assets_search_vector', 'rwa_assets', ['search_vector'],
+        postgresql_using='gin',
+    )
+
+    # ==================== Trigram Indexes ====================
+    op.create_index(
+        'ix_rwa_assets_name_trgm', 'rwa_assets', ['name'],
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_rwa_assets_symbol_trgm', 'rwa_assets', ['symbol'],
+        postgresql_using='gin', postgresql_ops={'symbol': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_rwa_assets_symbol_trgm', 'rwa_assets')
+    op.drop_index('ix_rwa_assets_name_trgm', 'rwa_assets')
+    op.drop_index('ix_rwa_assets_search_vector', 'rwa_assets')
+    op.drop_column('rwa_assets', 'search_vector')
+    # pg_trgm is left installed; other objects may depend on it
@@ -0,0 +1,48 @@
+"""Store asset JSON documents as JSONB with GIN indexes
+
+Revision ID: 005_jsonb_asset_documents
+Revises: 004_asset_search
+Create Date: 2026-10-16 12:00:00.000000
+
+asset_metadata, verification_data and external_data_sources become JSONB
+so containment filters (@>) run in Postgres against jsonb_path_ops GIN
+indexes instead of in Python.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '005_jsonb_asset_documents'
+down_revision: Union[str, None] = '004_asset_search'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+JSONB_COLUMNS = ('asset_metadata', 'verification_data', 'external_data_sources')
+
+
+def upgrade() -> None:
+    for column in JSONB_COLUMNS:
+        op.alter_column(
+            'rwa_assets', column,
+            type_=postgresql.JSONB(),
+            postgresql_using=f'{column}::jsonb',
+        )
+        op.create_index(
+            f'ix_rwa_assets_{column}', 'rwa_assets', [column],
+            postgresql_using='gin', postgresql_ops={column: 'jsonb_path_ops'},
+        )
+
+
+def downgrade() -> None:
+    for column in reversed(JSONB_COLUMNS):
+        op.drop_index(f'ix_rwa_assets_{column}', 'rwa_assets')
+        op.alter_column(
+            'rwa_assets', column,
+            type_=sa.JSON(),
+            postgresql_using=f'{column}::json',
+        )
@@ -0,0 +1,51 @@
+"""Composite indexes found missing by the query plan suite
+
+Revision ID: 006_query_plan_indexes
+Revises: 005_jsonb_asset_documents
+Create Date: 2026-10-16 13:00:00.000000
+
+Without them the per-asset market stats and order book filter the asset's
+whole trade history, and the marketplace-wide 24h stats and active IPO
+list scan by status alone. Each gets an index matching its filter and
+sort columns; benchmarks/query_plans.py holds the routes to that.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '006_query_plan_indexes'
+down_revision: Union[str, None] = '005_jsonb_asset_documents'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ==================== Trades ====================
+    op.create_index(
+        'ix_trades_asset_id_status_created_at',
+        'trades',
+        ['asset_id', 'status', 'created_at'],
+    )
+    op.create_index(
+        'ix_trades_asset_id_status_type_price',
+        'trades',
+        ['asset_id', 'status', 'trade_type', 'price_per_unit'],
+    )
+    op.create_index('ix_trades_status_settled_at', 'trades', ['status', 'settled_at'])
+
+    # ==================== Nostromo Proposals ====================
+    op.create_index(
+        'ix_nostromo_proposals_status_ipo_end_time',
+        'nostromo_proposals',
+        ['status', 'ipo_end_time'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_nostromo_proposals_status_ipo_end_time', 'nostromo_proposals')
+    op.drop_index('ix_trades_status_settled_at', 'trades')
+    op.drop_index('ix_trades_asset_id_status_type_price', 'trades')
+    op.drop_index('ix_trades_asset_id_status_created_at', 'trades')
@@ -0,0 +1,33 @@
+"""Track order fills for the matching engine
+
+Revision ID: 007_order_matching
+Revises: 006_query_plan_indexes
+Create Date: 2026-10-16 14:00:00.000000
+
+Orders stay in trades and record how much of them has been matched in
+filled_quantity. Each match writes a fill trade per side whose order_id
+points at the order it filled.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '007_order_matching'
+down_revision: Union[str, None] = '006_query_plan_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('trades', sa.Column('filled_quantity', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('trades', sa.Column('order_id', sa.String(36), sa.ForeignKey('trades.id'), nullable=True))
+    op.create_index('ix_trades_order_id', 'trades', ['order_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_trades_order_id', 'trades')
+    op.drop_column('trades', 'order_id')
+    op.drop_column('trades', 'filled_quantity')
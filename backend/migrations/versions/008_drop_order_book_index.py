@@ -0,0 +1,34 @@
+"""Drop the order book price index
+
+Revision ID: 008_drop_order_book_index
+Revises: 007_order_matching
+Create Date: 2026-10-16 15:00:00.000000
+
+The order book endpoint is served from the matching engine's in-memory
+book, so trades(asset_id, status, trade_type, price_per_unit) no longer
+backs any query. Rebuilding a book reads open orders in time order
+through ix_trades_asset_id_status_created_at.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '008_drop_order_book_index'
+down_revision: Union[str, None] = '007_order_matching'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index('ix_trades_asset_id_status_type_price', 'trades')
+
+
+def downgrade() -> None:
+    op.create_index(
+        'ix_trades_asset_id_status_type_price',
+        'trades',
+        ['asset_id', 'status', 'trade_type', 'price_per_unit'],
+    )
@@ -0,0 +1,47 @@
+"""Add OHLCV price candles
+
+Revision ID: 009_price_candles
+Revises: 008_drop_order_book_index
+Create Date: 2026-10-16 16:00:00.000000
+
+Completed trades are folded into 1m candles and rolled up to 1h, 4h, 1d
+and 1w. The primary key doubles as the index for per-asset range reads.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '009_price_candles'
+down_revision: Union[str, None] = '008_drop_order_book_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'price_candles',
+        sa.Column('asset_id', sa.String(36), sa.ForeignKey('rwa_assets.id'), nullable=False),
+        sa.Column('timeframe', sa.String(4), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('open', sa.Float(), nullable=False),
+        sa.Column('high', sa.Float(), nullable=False),
+        sa.Column('low', sa.Float(), nullable=False),
+        sa.Column('close', sa.Float(), nullable=False),
+        sa.Column('volume', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('trade_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('asset_id', 'timeframe', 'bucket_start'),
+    )
+    op.create_index(
+        'ix_price_candles_timeframe_bucket_start',
+        'price_candles',
+        ['timeframe', 'bucket_start'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_price_candles_timeframe_bucket_start', 'price_candles')
+    op.drop_table('price_candles')
@@ -0,0 +1,34 @@
+"""Queue fill settlement for the background worker
+
+Revision ID: 010_settlement_queue
+Revises: 009_price_candles
+Create Date: 2026-10-16 17:00:00.000000
+
+Executing a fill now marks it settling under a settlement_id; the worker
+claims settling rows whose settle_after has passed.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '010_settlement_queue'
+down_revision: Union[str, None] = '009_price_candles'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('trades', sa.Column('settlement_id', sa.String(36), nullable=True))
+    op.add_column('trades', sa.Column('settle_after', sa.DateTime(), nullable=True))
+    op.create_index('ix_trades_settlement_id', 'trades', ['settlement_id'])
+    op.create_index('ix_trades_status_settle_after', 'trades', ['status', 'settle_after'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_trades_status_settle_after', 'trades')
+    op.drop_index('ix_trades_settlement_id', 'trades')
+    op.drop_column('trades', 'settle_after')
+    op.drop_column('trades', 'settlement_id')
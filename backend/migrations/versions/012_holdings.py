@@ -0,0 +1,42 @@
+"""Add the holdings ledger
+
+Revision ID: 012_holdings
+Revises: 011_idempotency_keys
+Create Date: 2026-10-16 20:00:00.000000
+
+One row per (user, asset), updated by trade settlement. The table
+starts empty; fill it from the trades with
+
+    python -m app.services.holdings
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '012_holdings'
+down_revision: Union[str, None] = '011_idempotency_keys'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'holdings',
+        sa.Column('user_id', sa.String(36), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('asset_id', sa.String(36), sa.ForeignKey('rwa_assets.id'), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('reserved_quantity', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('cost_basis', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('realized_pnl', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('trade_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('traded_volume', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('user_id', 'asset_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('holdings')
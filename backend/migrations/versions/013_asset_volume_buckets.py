@@ -0,0 +1,48 @@
+"""Add hourly per-asset volume buckets
+
+Revision ID: 013_asset_volume_buckets
+Revises: 012_holdings
+Create Date: 2026-10-16 22:00:00.000000
+
+Trade settlement adds each completed fill to its asset's hour, so volume
+rankings sum at most 720 rows per asset instead of scanning trades. The
+table starts empty; fill it from the trades with
+
+    python -m app.services.volume_buckets
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '013_asset_volume_buckets'
+down_revision: Union[str, None] = '012_holdings'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'asset_volume_buckets',
+        sa.Column('asset_id', sa.String(36), sa.ForeignKey('rwa_assets.id'), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('volume', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('trade_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('open_price', sa.Float(), nullable=False),
+        sa.Column('close_price', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('asset_id', 'bucket_start'),
+    )
+    op.create_index(
+        'ix_asset_volume_buckets_bucket_start_asset_id',
+        'asset_volume_buckets',
+        ['bucket_start', 'asset_id'],
+        postgresql_include=['volume', 'trade_count'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_asset_volume_buckets_bucket_start_asset_id', 'asset_volume_buckets')
+    op.drop_table('asset_volume_buckets')
@@ -0,0 +1,34 @@
+"""Index trades for per-asset analytics windows
+
+Revision ID: 014_trade_analytics_index
+Revises: 013_asset_volume_buckets
+Create Date: 2026-10-16 23:00:00.000000
+
+GET /stats/assets/{id}/analytics reads one asset's completed fills in a
+settled_at window, in settlement order. The key matches that filter and
+sort, and the included columns let it be answered from the index alone.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '014_trade_analytics_index'
+down_revision: Union[str, None] = '013_asset_volume_buckets'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_trades_asset_id_status_settled_at_id',
+        'trades',
+        ['asset_id', 'status', 'settled_at', 'id'],
+        postgresql_include=['price_per_unit', 'quantity', 'order_id', 'trade_type'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_trades_asset_id_status_settled_at_id', 'trades')
@@ -0,0 +1,65 @@
+"""Build the asset search vector with the query's text search config
+
+Revision ID: 015_asset_search_config
+Revises: 014_trade_analytics_index
+Create Date: 2026-10-17 09:00:00.000000
+
+The description part of the search vector was stemmed with 'english'
+while name and symbol used 'simple', and queries were parsed with
+'english', so a stemmed prefix like energi:* missed "energy" in a name.
+Every part of the vector and every query now use 'simple'. A generated
+column's expression can't be altered, so it is dropped and re-added.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '015_asset_search_config'
+down_revision: Union[str, None] = '014_trade_analytics_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Keep in sync with ASSET_SEARCH_VECTOR_SQL in app/db/models.py
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(symbol, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+# As created by 004_asset_search
+PREVIOUS_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(symbol, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+def _replace_search_vector(expression: str) -> None:
+    op.drop_index('ix_rwa_assets_search_vector', 'rwa_assets')
+    op.drop_column('rwa_assets', 'search_vector')
+    op.add_column(
+        'rwa_assets',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(expression, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        'ix_rwa_assets_search_vector', 'rwa_assets', ['search_vector'],
+        postgresql_using='gin',
+    )
+
+
+def upgrade() -> None:
+    _replace_search_vector(SEARCH_VECTOR_SQL)
+
+
+def downgrade() -> None:
+    _replace_search_vector(PREVIOUS_SEARCH_VECTOR_SQL)
@@ -0,0 +1,31 @@
+"""Link the two fills of a match
+
+Revision ID: 016_trade_match_id
+Revises: 015_asset_search_config
+Create Date: 2026-10-17 11:00:00.000000
+
+Both fills created by one match share a match_id, so the settlement
+worker queues, completes and fails them together. Fills from before
+this revision have no match_id and keep settling on their own.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '016_trade_match_id'
+down_revision: Union[str, None] = '015_asset_search_config'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('trades', sa.Column('match_id', sa.String(36), nullable=True))
+    op.create_index('ix_trades_match_id', 'trades', ['match_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_trades_match_id', 'trades')
+    op.drop_column('trades', 'match_id')
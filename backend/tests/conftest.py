@@ -198,6 +198,136 @@ def sample_user_data():
     }
 
 
+class SyncSessionAdapter:
+    """Runs async query helpers against a synchronous SQLite session."""
+
+    def __init__(self, session):
+        self.session = session
+
+    async def execute(self, statement, params=None):
+        return self.session.execute(statement, params)
+
+    async def commit(self):
+        self.session.commit()
+
+    async def rollback(self):
+        self.session.rollback()
+
+    def get_bind(self):
+        return self.session.get_bind()
+
+
+@pytest.fixture
+def proposal_db():
+    """In-memory SQLite session seeded with 25 proposals, two per timestamp."""
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from app.db.models import NostromoProposal
+
+    engine = create_engine("sqlite://")
+    NostromoProposal.__table__.create(engine)
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with Session(engine) as s:
+        for i in range(25):
+            s.add(NostromoProposal(
+                id=f"p{i:02d}",
+                asset_id=f"a{i:02d}",
+                title=f"Proposal {i}",
+                description="x" * 50,
+                # Pairs of rows share a timestamp to exercise id tie-breakers
+                created_at=base + timedelta(minutes=i // 2),
+                updated_at=base,
+            ))
+        s.commit()
+        yield SyncSessionAdapter(s)
+
+
+@pytest.fixture
+def order_db():
+    """In-memory SQLite session with two open sell orders on asset a1, s1 and s2, 5 units each."""
+    from datetime import datetime, timezone
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from app.db.models import Trade, TradeStatus
+
+    engine = create_engine("sqlite://")
+    Trade.__table__.create(engine)
+    now = datetime.now(timezone.utc)
+    # Objects stay as loaded across commits, like a request's session between queries
+    with Session(engine, expire_on_commit=False) as s:
+        for i, order_id in enumerate(("s1", "s2")):
+            s.add(Trade(
+                id=order_id, asset_id="a1", user_id=f"u{i}", trade_type="sell",
+                status=TradeStatus.PENDING, quantity=5, price_per_unit=10.0, total_amount=50.0,
+                created_at=now, updated_at=now,
+            ))
+        s.commit()
+        yield SyncSessionAdapter(s)
+
+
+@pytest.fixture
+def market_db():
+    """
+    In-memory SQLite session with 6 listed assets, 30 completed trades,
+    their hourly volume buckets and 3 active IPOs, for endpoint code that
+    takes a session directly.
+    """
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import Column, MetaData, Table, Text, create_engine
+    from sqlalchemy.orm import Session
+    from app.db.models import (
+        AssetStatus, AssetType, AssetVolumeBucket, NostromoProposal, ProposalStatus,
+        RWAAsset, Trade, TradeStatus, User,
+    )
+    from app.services.volume_buckets import fold_fills
+
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    for table in (
+        User.__table__, RWAAsset.__table__, Trade.__table__,
+        NostromoProposal.__table__, AssetVolumeBucket.__table__,
+    ):
+        # SQLite can't compute the Postgres search vector; a plain column stands in
+        Table(table.name, metadata, *[
+            Column(column.name, Text) if column.computed is not None else column._copy()
+            for column in table.columns
+        ])
+    metadata.create_all(engine)
+
+    now = datetime.now(timezone.utc)
+    stamps = {"created_at": now, "updated_at": now}
+    with Session(engine) as s:
+        s.add(User(id="u0", clerk_id="clerk-u0", email="u0@example.com", **stamps))
+        for i in range(6):
+            s.add(RWAAsset(
+                id=f"a{i}", creator_id="u0", name=f"Asset {i}", symbol=f"AST{i}",
+                description="x" * 50, asset_type=list(AssetType)[i % len(AssetType)],
+                status=AssetStatus.LISTED, total_supply=1000, price_per_unit=10.0 + i, **stamps,
+            ))
+        trades = [
+            Trade(
+                id=f"t{i:02d}", asset_id=f"a{i % 6}", user_id="u0", trade_type="buy",
+                status=TradeStatus.COMPLETED, quantity=1, price_per_unit=10.0, total_amount=10.0,
+                settled_at=now - timedelta(minutes=i), **stamps,
+            )
+            for i in range(30)
+        ]
+        s.add_all(trades)
+        for (asset_id, bucket_start), bucket in fold_fills(trades).items():
+            s.add(AssetVolumeBucket(
+                asset_id=asset_id, bucket_start=bucket_start, **vars(bucket), updated_at=now,
+            ))
+        for i in range(3):
+            s.add(NostromoProposal(
+                id=f"ipo{i}", asset_id=f"a{i}", title=f"IPO {i}", description="x" * 50,
+                status=ProposalStatus.IPO_ACTIVE, ipo_start_price=20.0, ipo_end_price=10.0,
+                ipo_total_shares=100, **stamps,
+            ))
+        s.commit()
+        yield SyncSessionAdapter(s)
+
+
 # Test environment setup
 def pytest_configure(config):
     """Configure pytest with custom markers."""
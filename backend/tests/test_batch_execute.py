@@ -0,0 +1,58 @@
+"""
+VeriAssets - Batch Trade Execution Tests
+"""
+from datetime import datetime, timezone
+
+import pytest
+
+from app.api.v1.trade import execute_trades_batch
+from app.db.models import Trade, TradeStatus, User
+from app.models.trade import TradeBatchExecuteRequest
+
+
+class _Idempotency:
+    """No Idempotency-Key sent: nothing to replay, the response passes through."""
+
+    async def begin(self, user, body):
+        return None
+
+    async def store(self, session, response, status_code=200):
+        return response
+
+
+def _fill(trade_id, user_id="u0", status=TradeStatus.PENDING, **kwargs):
+    now = datetime.now(timezone.utc)
+    return Trade(**{
+        "id": trade_id, "asset_id": "a1", "user_id": user_id, "order_id": "s1", "trade_type": "sell",
+        "status": status, "quantity": 1, "price_per_unit": 10.0, "total_amount": 10.0, "fee_burned": 0.03,
+        "created_at": now, "updated_at": now, **kwargs,
+    })
+
+
+async def test_batch_queues_runnable_fills_and_reports_the_rest(order_db):
+    order_db.session.add_all([
+        _fill("f1", match_id="m1"), _fill("f1-buy", user_id="u1", trade_type="buy", match_id="m1"), _fill("f2"), _fill("done", status=TradeStatus.COMPLETED), _fill("theirs", user_id="u1"),
+    ])
+    order_db.session.commit()
+
+    response = await execute_trades_batch(
+        TradeBatchExecuteRequest(trade_ids=["f1", "s1", "done", "theirs", "missing", "f2", "f1"]),
+        session=order_db,
+        current_user=User(id="u0", clerk_id="clerk-u0", email="u0@example.com"),
+        idempotency=_Idempotency(),
+    )
+
+    assert (response.queued, response.rejected) == (2, 4)
+    assert response.fee_burned == pytest.approx(0.06)
+    results = {result.trade_id: result for result in response.results}
+    assert list(results) == ["f1", "s1", "done", "theirs", "missing", "f2"]
+    assert results["f1"].status == results["f2"].status == TradeStatus.SETTLING.value
+    assert results["s1"].error.startswith("Orders settle through their fills")
+    assert results["done"].error == "Trade is already completed"
+    assert results["theirs"].error == "Not authorized to execute this trade"
+    assert results["missing"].error == "Trade not found"
+
+    queued = order_db.session.query(Trade).filter(Trade.status == TradeStatus.SETTLING).all()
+    # The buyer's side of f1's match settles with it, but isn't the caller's to report
+    assert sorted(trade.id for trade in queued) == ["f1", "f1-buy", "f2"]
+    assert {trade.settlement_id for trade in queued} == {response.settlement_id}
@@ -0,0 +1,124 @@
+"""
+VeriAssets - Bulk Asset Import Tests
+"""
+import json
+
+from app.services.bulk_import import BulkAssetImporter, iter_csv_rows, iter_ndjson_rows
+
+
+async def _chunks(data: bytes, size: int = 7):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+async def _collect(rows):
+    return [row async for row in rows]
+
+
+def _asset(symbol, **overrides):
+    return {
+        "name": f"Verra VCU {symbol}",
+        "symbol": symbol,
+        "description": "Verified carbon units, vintage lot",
+        "asset_type": "carbon_credit",
+        **overrides,
+    }
+
+
+async def test_ndjson_rows_survive_chunk_boundaries():
+    body = "\n".join([
+        json.dumps(_asset("VCU21", metadata={"registry": "Verra", "note": "Ümlaut"})),
+        "",
+        "{not json",
+        "[1, 2]",
+        json.dumps(_asset("VCU22")),
+    ]).encode()
+
+    rows = await _collect(iter_ndjson_rows(_chunks(body)))
+
+    assert [(line, error is None) for line, _, error in rows] == [(1, True), (3, False), (4, False), (5, True)]
+    assert rows[0][1]["metadata"]["note"] == "Ümlaut"
+
+
+async def test_csv_rows_with_quoted_multiline_and_json_cells():
+    body = (
+        "name,symbol,description,asset_type,document_urls,metadata\r\n"
+        'Lot A,LOTA,"Tranche A,\nsenior notes",treasury,https://a|https://b,"{""vintage"": 2021}"\r\n'
+        "Lot B,LOTB,short\r\n"
+        'Lot C,LOTC,Tranche C notes,treasury,,"{broken"\r\n'
+    ).encode()
+
+    rows = await _collect(iter_csv_rows(_chunks(body)))
+
+    line, data, error = rows[0]
+    assert (line, error) == (2, None)
+    assert data["description"] == "Tranche A,\nsenior notes"
+    assert data["document_urls"] == ["https://a", "https://b"]
+    assert data["metadata"] == {"vintage": 2021}
+    assert "image_url" not in data
+    assert rows[1][0] == 4 and rows[1][2].startswith("Expected 6 columns")
+    assert rows[2][0] == 5 and rows[2][2].startswith("Invalid JSON cell")
+
+
+async def test_importer_reports_invalid_and_duplicate_rows():
+    importer = BulkAssetImporter(session=None, creator_id="user_1", batch_size=100)
+
+    await importer.add(1, _asset("vcu21"))
+    await importer.add(2, _asset("VCU21"))
+    await importer.add(3, _asset("VCU22", total_supply=0))
+    await importer.add(4, None, "Invalid JSON: boom")
+
+    assert importer.result.total_rows == 4
+    assert importer.result.failed == 3
+    assert [(e.line, e.symbol) for e in importer.result.errors] == [(2, "VCU21"), (3, "VCU22"), (4, None)]
+    assert "total_supply" in importer.result.errors[1].error
+
+
+class _Scalars:
+    def all(self):
+        return []
+
+
+class _Result:
+    def scalars(self):
+        return _Scalars()
+
+
+class _RejectingSession:
+    """Fails any INSERT holding a row named `rejected`, as a constraint would."""
+
+    def __init__(self, rejected):
+        self.rejected = rejected
+        self.pending = []
+        self.committed = []
+
+    async def execute(self, statement):
+        if statement.is_select:
+            return _Result()
+        params = statement.compile().params
+        if self.rejected in params.values():
+            raise ValueError("violates check constraint")
+        self.pending += [value for key, value in params.items() if key.startswith("symbol")]
+
+    async def commit(self):
+        self.committed += self.pending
+        self.pending = []
+
+    async def rollback(self):
+        self.pending = []
+
+
+async def test_failed_batch_is_retried_row_by_row():
+    session = _RejectingSession("Broken lot")
+    importer = BulkAssetImporter(session=session, creator_id="user_1", batch_size=3)
+
+    await importer.add(1, _asset("VCU21"))
+    await importer.add(2, _asset("VCU22", name="Broken lot"))
+    await importer.add(3, _asset("VCU23"))
+    # The corrected row reuses the rejected symbol in the same import
+    await importer.add(4, _asset("VCU22"))
+    await importer.flush()
+
+    assert sorted(session.committed) == ["VCU21", "VCU22", "VCU23"]
+    assert (importer.result.created, importer.result.failed) == (3, 1)
+    assert [(e.line, e.symbol) for e in importer.result.errors] == [(2, "VCU22")]
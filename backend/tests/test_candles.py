@@ -0,0 +1,32 @@
+"""
+VeriAssets - Price Candle Tests
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.candles import ROLLUPS, INTERVAL_SECONDS, bucket_start, candles_to_candles, trades_to_candles
+
+
+def test_bucket_start_alignment():
+    ts = datetime(2026, 10, 15, 14, 37, 21, 500)  # a Thursday
+    assert bucket_start(ts, "1m") == datetime(2026, 10, 15, 14, 37)
+    assert bucket_start(ts, "1h") == datetime(2026, 10, 15, 14)
+    assert bucket_start(ts, "4h") == datetime(2026, 10, 15, 12)
+    assert bucket_start(ts, "1d") == datetime(2026, 10, 15)
+    assert bucket_start(ts, "1w") == datetime(2026, 10, 12)
+    with pytest.raises(ValueError):
+        bucket_start(ts, "5m")
+
+
+def test_rollups_divide_evenly():
+    for target, source in ROLLUPS:
+        assert INTERVAL_SECONDS[target] % INTERVAL_SECONDS[source] == 0
+
+
+def test_rollup_statements_upsert_on_primary_key():
+    since = datetime(2026, 10, 15)
+    for stmt in (trades_to_candles(since), candles_to_candles("4h", "1h", since)):
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (asset_id, timeframe, bucket_start) DO UPDATE" in sql
@@ -0,0 +1,57 @@
+"""
+VeriAssets - List Count Strategy Tests
+"""
+import pytest
+from sqlalchemy import select
+
+from app.core.cache import TTLCache
+from app.db import counting
+from app.db.counting import CountStrategy, count_cache_key, count_rows
+from app.db.models import NostromoProposal, ProposalStatus
+
+
+@pytest.fixture(autouse=True)
+def empty_count_cache():
+    counting._count_cache.invalidate()
+    yield
+    counting._count_cache.invalidate()
+
+
+def test_cache_key_ignores_unset_filters_and_order():
+    a = count_cache_key("trades", {"user_id": "u1", "asset_id": None, "status": ProposalStatus.VOTING})
+    b = count_cache_key("trades", {"status": "voting", "search": "", "user_id": "u1"})
+    assert a == b
+    assert a != count_cache_key("trades", {"user_id": "u2", "status": "voting"})
+
+
+def test_ttl_cache_expires(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(ttl_seconds=30, max_entries=2)
+
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    now[0] += 31
+    assert cache.get("a") is None
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert len(cache) == 2
+    assert cache.get("a") is None
+
+
+async def test_small_results_are_counted_exactly_then_cached(proposal_db):
+    query = select(NostromoProposal)
+
+    first = await count_rows(proposal_db, query, NostromoProposal, {"status": None})
+    assert (first.total, first.strategy) == (25, CountStrategy.EXACT)
+
+    second = await count_rows(proposal_db, query, NostromoProposal, {})
+    assert (second.total, second.strategy) == (25, CountStrategy.CACHED)
+
+
+async def test_filters_get_their_own_cache_entry(proposal_db):
+    query = select(NostromoProposal).where(NostromoProposal.status == ProposalStatus.APPROVED)
+    result = await count_rows(proposal_db, query, NostromoProposal, {"status": ProposalStatus.APPROVED})
+    assert (result.total, result.strategy) == (0, CountStrategy.EXACT)
@@ -0,0 +1,62 @@
+"""
+VeriAssets - Holdings Ledger Tests
+"""
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.holdings import Position, _reserved_query, apply_fill, is_issuer_sale
+
+
+def fill(trade_type, quantity, price, fee_rate=0.003):
+    total = quantity * price
+    return SimpleNamespace(trade_type=trade_type, quantity=quantity, total_amount=total, fee_amount=total * fee_rate)
+
+
+def test_average_cost_basis_and_realized_pnl():
+    position = Position()
+    apply_fill(position, fill("buy", 10, 10.0, fee_rate=0))
+    apply_fill(position, fill("buy", 10, 20.0, fee_rate=0))
+    assert (position.quantity, position.cost_basis) == (20, 300.0)
+
+    position.reserved_quantity = 5
+    apply_fill(position, fill("sell", 5, 30.0, fee_rate=0))
+
+    assert position.quantity == 15
+    assert position.cost_basis == pytest.approx(225.0)  # 15 units at an average of 15
+    assert position.realized_pnl == pytest.approx(150.0 - 75.0)
+    assert position.reserved_quantity == 0
+    assert (position.trade_count, position.traded_volume) == (3, 450.0)
+
+
+def test_fees_raise_basis_and_reduce_proceeds():
+    position = Position()
+    apply_fill(position, fill("buy", 10, 10.0, fee_rate=0.01))
+    apply_fill(position, fill("sell", 10, 10.0, fee_rate=0.01))
+
+    assert position.quantity == 0 and position.cost_basis == 0.0
+    assert position.realized_pnl == pytest.approx(-2.0)
+
+
+def test_oversell_closes_the_position():
+    position = Position()
+    apply_fill(position, fill("buy", 4, 10.0, fee_rate=0))
+    apply_fill(position, fill("sell", 6, 10.0, fee_rate=0))
+
+    assert (position.quantity, position.cost_basis) == (0, 0.0)
+    assert position.realized_pnl == pytest.approx(20.0)
+
+
+def test_only_the_creator_selling_is_issuance():
+    assert is_issuer_sale("sell", "creator", "creator")
+    assert not is_issuer_sale("buy", "creator", "creator")
+    assert not is_issuer_sale("sell", "holder", "creator")
+
+
+def test_rebuild_reserves_open_sells_and_unsettled_fills():
+    sql = str(_reserved_query().compile(dialect=postgresql.dialect()))
+
+    assert "UNION ALL" in sql
+    assert "trades.quantity - trades.filled_quantity" in sql
+    assert "rwa_assets.creator_id != " in sql
@@ -0,0 +1,65 @@
+"""
+VeriAssets - Idempotency Key Tests
+"""
+from datetime import datetime, timedelta
+
+from app.api.v1.idempotency import Idempotency, request_hash
+from app.core.config import settings
+from app.db.models import IdempotencyKey
+from app.models.trade import TradeCreate
+
+
+def _order(quantity=5):
+    return TradeCreate(asset_id="a1", trade_type="buy", quantity=quantity, price_per_unit=10.0)
+
+
+def test_request_hash_covers_method_path_and_body():
+    base = request_hash("POST", "/api/v1/trade", _order())
+    assert base == request_hash("POST", "/api/v1/trade", _order())
+    assert base != request_hash("POST", "/api/v1/trade", _order(quantity=6))
+    assert base != request_hash("POST", "/api/v1/trade/x/execute", _order())
+
+
+async def test_without_header_everything_is_a_no_op():
+    idempotency = Idempotency(request=None, key=None)
+    assert await idempotency.begin(user=None, body=_order()) is None
+    response = _order()
+    assert await idempotency.store(None, response) is response
+    await idempotency.release()
+
+
+async def test_store_writes_in_the_callers_transaction():
+    class Session:
+        def __init__(self):
+            self.statements = []
+
+        async def execute(self, statement):
+            self.statements.append(statement)
+
+    session = Session()
+    idempotency = Idempotency(request=None, key="k1")
+    idempotency._claimed = ("u1", "k1")
+    response = _order()
+
+    assert await idempotency.store(session, response, 201) is response
+    # Staged only: the handler's commit saves it together with the write
+    statement, = session.statements
+    assert statement.table.name == "idempotency_keys"
+    assert statement.compile().params["status_code"] == 201
+
+
+def test_expired_and_abandoned_keys_are_reclaimable():
+    now = datetime(2026, 10, 16, 12, 0, 0)
+    idempotency = Idempotency(request=None, key="k1")
+
+    def record(status_code, age_seconds, ttl_seconds=3600):
+        created_at = now - timedelta(seconds=age_seconds)
+        return IdempotencyKey(
+            user_id="u1", key="k1", request_hash="h", status_code=status_code,
+            created_at=created_at, expires_at=created_at + timedelta(seconds=ttl_seconds),
+        )
+
+    assert not idempotency._reclaimable(record(201, age_seconds=5), now)
+    assert not idempotency._reclaimable(record(None, age_seconds=5), now)
+    assert idempotency._reclaimable(record(None, age_seconds=settings.idempotency_lock_seconds + 1), now)
+    assert idempotency._reclaimable(record(201, age_seconds=7200), now)
@@ -0,0 +1,42 @@
+"""
+VeriAssets - Rolling Market Statistics Tests
+"""
+from app.services.market_stats import RollingWindow
+
+
+def test_window_totals_and_extremes():
+    window = RollingWindow(window_minutes=10)
+    for minute, price in ((0, 10.0), (1, 14.0), (1, 9.0), (5, 12.0)):
+        window.add(minute, price, price * 2)
+
+    stats = window.stats()
+    assert stats.trade_count == 4
+    assert stats.volume == 90.0
+    assert (stats.open, stats.high, stats.low, stats.last) == (10.0, 14.0, 9.0, 12.0)
+    assert stats.reference_price == 10.0  # nothing before the window yet
+
+
+def test_expiry_drops_minutes_and_moves_reference_price():
+    window = RollingWindow(window_minutes=10)
+    for minute, price in ((0, 10.0), (1, 14.0), (1, 9.0), (5, 12.0)):
+        window.add(minute, price, price * 2)
+
+    window.expire(11)  # window is now minutes 2..11
+    stats = window.stats()
+    assert stats.trade_count == 1
+    assert stats.volume == 24.0
+    assert (stats.open, stats.high, stats.low) == (12.0, 12.0, 12.0)
+    assert stats.reference_price == 9.0  # close of the last expired minute
+
+    window.expire(100)
+    stats = window.stats()
+    assert (stats.trade_count, stats.volume, stats.high, stats.last) == (0, 0.0, None, None)
+    assert stats.reference_price == 12.0
+
+
+def test_late_trade_folds_into_newest_minute():
+    window = RollingWindow(window_minutes=10)
+    window.add(3, 10.0, 1.0)
+    window.add(2, 11.0, 1.0)
+    assert len(window.buckets) == 1
+    assert window.stats().last == 11.0
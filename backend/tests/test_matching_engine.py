@@ -0,0 +1,155 @@
+"""
+VeriAssets - Matching Engine Tests
+"""
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+from sqlalchemy import update
+
+from app.db.models import Trade, TradeStatus
+from app.services import matching_engine as matching_engine_module
+from app.services.matching_engine import BUY, SELL, MatchingEngine, OrderBook, RestingOrder
+
+
+class _AwareDatetime(datetime):
+    @classmethod
+    def utcnow(cls):
+        return datetime.now(timezone.utc)
+
+
+def _order(order_id, side, price, quantity, user_id="u1"):
+    return RestingOrder(order_id, user_id, side, price, quantity, quantity)
+
+
+def test_price_then_time_priority_with_partial_fills():
+    book = OrderBook("a1")
+    for order in (
+        _order("s1", SELL, 101.0, 5),
+        _order("s2", SELL, 100.0, 3),
+        _order("s3", SELL, 100.0, 4),
+    ):
+        assert book.submit(order) == []
+
+    taker = _order("b1", BUY, 101.0, 9, user_id="u2")
+    fills = book.submit(taker)
+
+    # Best price first, oldest first within it, always at the maker's price
+    assert [(f.maker_order_id, f.price, f.quantity, f.maker_remaining) for f in fills] == [
+        ("s2", 100.0, 3, 0),
+        ("s3", 100.0, 4, 0),
+        ("s1", 101.0, 2, 3),
+    ]
+    assert taker.remaining == 0
+    assert book.asks.prices == [101.0]
+    assert book.asks.levels[101.0].quantity == 3
+    assert set(book.orders) == {"s1"}
+
+
+def test_unmatched_remainder_rests_on_book():
+    book = OrderBook("a1")
+    book.submit(_order("s1", SELL, 100.0, 2))
+
+    taker = _order("b1", BUY, 100.0, 5)
+    assert [f.quantity for f in book.submit(taker)] == [2]
+
+    assert taker.remaining == 3
+    assert book.bids.best().price == 100.0
+    assert book.asks.best() is None
+    # Below the best ask: rests without matching
+    assert book.submit(_order("b2", BUY, 99.0, 1)) == []
+    assert book.bids.prices == [99.0, 100.0]
+
+
+def test_cancelled_orders_are_skipped():
+    book = OrderBook("a1")
+    for order in (_order("s1", SELL, 100.0, 2), _order("s2", SELL, 100.0, 2), _order("s3", SELL, 102.0, 2)):
+        book.submit(order)
+
+    assert book.cancel("s1").order_id == "s1"
+    assert book.cancel("s1") is None
+    assert book.asks.levels[100.0].quantity == 2
+
+    fills = book.submit(_order("b1", BUY, 102.0, 3))
+    assert [(f.maker_order_id, f.quantity) for f in fills] == [("s2", 2), ("s3", 1)]
+
+    book.cancel("s3")
+    assert book.asks.prices == [] and book.orders == {}
+
+
+def test_snapshot_aggregates_levels_and_tracks_sequence():
+    book = OrderBook("a1")
+    for order in (
+        _order("b1", BUY, 99.0, 2),
+        _order("b2", BUY, 99.0, 3),
+        _order("b3", BUY, 98.0, 4),
+        _order("b4", BUY, 97.0, 1),
+        _order("s1", SELL, 101.0, 5),
+    ):
+        book.submit(order)
+
+    first = book.snapshot(depth=2)
+    assert [(l.price, l.quantity, l.orders, l.cumulative) for l in first.bids] == [
+        (99.0, 5, 2, 495.0),
+        (98.0, 4, 1, 887.0),
+    ]
+    assert [(l.price, l.quantity) for l in first.asks] == [(101.0, 5)]
+    # Unchanged book: same sequence, deeper reads extend the cached levels
+    assert book.snapshot(depth=3).sequence == first.sequence
+    assert [l.price for l in book.snapshot(depth=3).bids] == [99.0, 98.0, 97.0]
+
+    book.submit(_order("s2", SELL, 99.0, 4))
+    after = book.snapshot(depth=2)
+    assert after.sequence > first.sequence
+    assert [(l.price, l.quantity, l.orders) for l in after.bids] == [(99.0, 1, 1), (98.0, 4, 1)]
+
+
+async def test_cancel_rereads_the_order_under_the_lock(order_db, monkeypatch):
+    released = []
+
+    async def release_holding(session, user_id, asset_id, quantity):
+        released.append((user_id, quantity))
+
+    monkeypatch.setattr(matching_engine_module, "release_holding", release_holding)
+    # Newer SQLModel releases map datetime to timestamptz and reject naive values
+    if getattr(Trade.__table__.c.updated_at.type, "timezone", False):
+        monkeypatch.setattr(matching_engine_module, "datetime", _AwareDatetime)
+    engine = MatchingEngine()
+    book = await engine.get_book(order_db, "a1")
+    s1, s2 = (order_db.session.get(Trade, order_id) for order_id in ("s1", "s2"))
+
+    # Another request fills s1 and part of s2 after the cancels loaded them
+    book.submit(_order("b1", BUY, 10.0, 7))
+    order_db.session.execute(
+        update(Trade).where(Trade.id == "s1").values(filled_quantity=5, status=TradeStatus.FILLED)
+        .execution_options(synchronize_session=False)
+    )
+    order_db.session.execute(
+        update(Trade).where(Trade.id == "s2").values(filled_quantity=2)
+        .execution_options(synchronize_session=False)
+    )
+    order_db.session.commit()
+
+    assert await engine.cancel(order_db, s1) is False
+    assert s1.status == TradeStatus.FILLED
+    assert await engine.cancel(order_db, s2) is True
+    assert s2.status == TradeStatus.CANCELLED and book.orders == {}
+    # Only s2's unfilled 3 units, once
+    assert await engine.cancel(order_db, s2) is False
+    assert released == [("u1", 3)]
+
+
+async def test_snapshot_of_an_asset_without_orders_caches_nothing(order_db):
+    @asynccontextmanager
+    async def session_maker():
+        yield order_db
+
+    engine = MatchingEngine()
+    engine.session_maker = session_maker
+
+    empty = await engine.snapshot("no-such-asset", depth=10)
+    assert (empty.bids, empty.asks) == ([], [])
+    assert engine._books == {} and engine._locks == {}
+
+    book = await engine.snapshot("a1", depth=10)
+    assert [(l.price, l.quantity, l.orders) for l in book.asks] == [(10.0, 10, 2)]
+    assert list(engine._books) == ["a1"]
@@ -0,0 +1,72 @@
+"""
+VeriAssets - Keyset Pagination Tests
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from app.db.models import NostromoProposal
+from app.db.pagination import CursorError, decode_cursor, encode_cursor, Cursor, paginate_keyset
+
+
+async def _page(session, cursor=None, page_size=10, sort_order="desc"):
+    return await paginate_keyset(
+        session,
+        select(NostromoProposal),
+        sort_column=NostromoProposal.created_at,
+        id_column=NostromoProposal.id,
+        sort_order=sort_order,
+        page_size=page_size,
+        cursor=cursor,
+    )
+
+
+def test_cursor_round_trip():
+    value = datetime(2026, 3, 4, 5, 6, 7)
+    token = encode_cursor(Cursor("created_at", value, "abc", "prev"))
+    decoded = decode_cursor(token, NostromoProposal.created_at)
+    assert decoded.value == value
+    assert decoded.id == "abc"
+    assert decoded.direction == "prev"
+
+
+def test_cursor_rejects_garbage_and_foreign_sort():
+    with pytest.raises(CursorError):
+        decode_cursor("not-a-cursor", NostromoProposal.created_at)
+
+    token = encode_cursor(Cursor("votes_for", 3, "abc"))
+    with pytest.raises(CursorError):
+        decode_cursor(token, NostromoProposal.created_at)
+
+
+async def test_walks_forward_without_gaps_or_duplicates(proposal_db):
+    seen = []
+    cursor = None
+    while True:
+        page = await _page(proposal_db, cursor)
+        seen.extend(p.id for p in page.items)
+        if not page.next_cursor:
+            break
+        cursor = page.next_cursor
+
+    assert seen == [f"p{i:02d}" for i in reversed(range(25))]
+
+
+async def test_prev_cursor_returns_previous_page(proposal_db):
+    first = await _page(proposal_db)
+    second = await _page(proposal_db, first.next_cursor)
+    assert first.prev_cursor is None
+    assert second.prev_cursor is not None
+
+    back = await _page(proposal_db, second.prev_cursor)
+    assert [p.id for p in back.items] == [p.id for p in first.items]
+    assert back.prev_cursor is None
+    assert back.next_cursor is not None
+
+
+async def test_ascending_order(proposal_db):
+    page = await _page(proposal_db, page_size=5, sort_order="asc")
+    assert [p.id for p in page.items] == ["p00", "p01", "p02", "p03", "p04"]
+    page = await _page(proposal_db, page.next_cursor, page_size=5, sort_order="asc")
+    assert [p.id for p in page.items] == ["p05", "p06", "p07", "p08", "p09"]
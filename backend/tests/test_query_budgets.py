@@ -0,0 +1,69 @@
+"""
+VeriAssets - Query Budget Tests
+
+Endpoint code run against SQLite with every statement counted, so a
+per-row lookup creeping back in fails here before it reaches Postgres.
+"""
+from datetime import datetime, timezone
+
+from app.api.v1 import stats
+from app.api.v1.nostromo import compute_launchpad_stats, list_active_ipos
+from app.api.v1.stats import compute_market_analytics, get_quick_stats
+from app.db.models import Trade, TradeStatus
+from app.db.query_counter import count_queries
+
+
+class _AwareDatetime(datetime):
+    @classmethod
+    def utcnow(cls):
+        return datetime.now(timezone.utc)
+
+
+async def test_market_analytics_query_budget(market_db, monkeypatch):
+    # Newer SQLModel releases map datetime to timestamptz and reject naive values
+    if getattr(Trade.__table__.c.created_at.type, "timezone", False):
+        monkeypatch.setattr(stats, "datetime", _AwareDatetime)
+
+    with count_queries(market_db.get_bind()) as counter:
+        analytics = await compute_market_analytics(market_db)
+
+    counter.assert_at_most(7)
+    assert len(analytics.recent_trades) == 10
+    assert all(trade.asset_symbol.startswith("AST") for trade in analytics.recent_trades)
+
+
+async def test_active_ipos_single_query(market_db):
+    with count_queries(market_db.get_bind()) as counter:
+        ipos = await list_active_ipos(market_db)
+
+    counter.assert_at_most(1)
+    assert [ipo.proposal_id for ipo in ipos] == ["ipo0", "ipo1", "ipo2"]
+    assert ipos[0].symbol == "AST0" and ipos[0].tokens_remaining == 100
+
+
+async def test_launchpad_stats_single_query(market_db):
+    with count_queries(market_db.get_bind()) as counter:
+        stats = await compute_launchpad_stats(market_db)
+
+    counter.assert_at_most(1)
+    assert (stats.total_proposals, stats.active_ipos, stats.proposals_voting) == (3, 3, 0)
+
+
+async def test_summary_single_query(market_db):
+    # A match between two orders completes as a buy fill and a sell fill; it counts once
+    now = datetime.now(timezone.utc)
+    market_db.session.add_all([
+        Trade(
+            id=f"match-{side}", asset_id="a0", user_id="u0", order_id="o1", trade_type=side,
+            status=TradeStatus.COMPLETED, quantity=5, price_per_unit=10.0, total_amount=50.0,
+            settled_at=now, created_at=now, updated_at=now,
+        )
+        for side in ("buy", "sell")
+    ])
+    market_db.session.commit()
+
+    with count_queries(market_db.get_bind()) as counter:
+        summary = await get_quick_stats(market_db)
+
+    counter.assert_at_most(1)
+    assert (summary["total_assets"], summary["total_trades"], summary["total_volume"]) == (6, 31, 350.0)
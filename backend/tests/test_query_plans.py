@@ -0,0 +1,96 @@
+"""
+VeriAssets - Query Plan Regression Tests
+
+The endpoint cases need a dedicated Postgres database and are skipped
+unless QUERY_PLAN_DATABASE_URL is set; see benchmarks/query_plans.py.
+"""
+import asyncio
+import os
+
+import pytest
+
+from benchmarks.query_plans import (
+    CASES,
+    DATABASE_URL_ENV,
+    CapturedQuery,
+    PlanBudget,
+    PlanCase,
+    PlanReport,
+    build_app,
+    create_plan_engine,
+    find_plan_violations,
+    load_plan_user,
+    run_case,
+    seed_database,
+)
+
+
+def _explain(plan, execution_ms=1.0):
+    return {"Plan": plan, "Execution Time": execution_ms}
+
+
+def test_index_scan_within_budget():
+    plan = _explain({
+        "Node Type": "Limit",
+        "Plans": [{"Node Type": "Index Scan", "Relation Name": "trades", "Rows Removed by Filter": 12}],
+    })
+    assert find_plan_violations(plan, PlanBudget()) == []
+
+
+def test_seq_scan_on_large_table_fails_unless_allowed():
+    plan = _explain({
+        "Node Type": "Aggregate",
+        "Plans": [
+            {"Node Type": "Seq Scan", "Relation Name": "trades"},
+            {"Node Type": "Seq Scan", "Relation Name": "verifications"},
+        ],
+    })
+    assert find_plan_violations(plan, PlanBudget()) == ["Seq Scan on trades"]
+    assert find_plan_violations(plan, PlanBudget(seq_scan_allowed=("trades",))) == []
+
+
+def test_rows_removed_count_every_loop_and_time_budget():
+    plan = _explain({
+        "Node Type": "Nested Loop",
+        "Plans": [{
+            "Node Type": "Index Scan", "Relation Name": "rwa_assets",
+            "Rows Removed by Filter": 300, "Actual Loops": 100,
+        }],
+    }, execution_ms=80.0)
+
+    violations = find_plan_violations(plan, PlanBudget(max_rows_removed=20_000, max_execution_ms=50.0))
+
+    assert violations == [
+        "Index Scan on rwa_assets removed 30000 rows (budget 20000)",
+        "Execution took 80.0ms (budget 50ms)",
+    ]
+
+
+def test_query_count_budget():
+    case = PlanCase("recent", "/stats/recent", PlanBudget(max_queries=1))
+    query = (CapturedQuery("SELECT 1", {}), {}, [])
+    report = PlanReport(case, 200, [query, query])
+
+    assert report.violations == ["recent: issued 2 queries (budget 1)"]
+
+
+@pytest.fixture(scope="module")
+def plan_engine():
+    if not os.getenv(DATABASE_URL_ENV):
+        pytest.skip(f"{DATABASE_URL_ENV} not set")
+    engine = create_plan_engine()
+    asyncio.run(seed_database(engine))
+    return engine
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+@pytest.mark.parametrize("case", CASES, ids=[case.name for case in CASES])
+async def test_endpoint_query_plans(plan_engine, case):
+    app = build_app(plan_engine, await load_plan_user(plan_engine))
+    try:
+        report = await run_case(plan_engine, app, case)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert not report.violations, "\n".join(report.violations)
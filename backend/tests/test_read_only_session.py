@@ -0,0 +1,39 @@
+"""
+VeriAssets - Read-Only Session Tests
+"""
+import inspect
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.api.v1.deps import get_current_user, get_optional_user
+from app.db.database import ReadOnlySessionError, get_read_only_options, get_read_session
+from app.db.models import NostromoProposal
+
+
+def test_read_only_options():
+    assert get_read_only_options() == {"postgresql_readonly": True}
+    assert get_read_only_options(analytics=True, on_primary=True) == {
+        "postgresql_readonly": True,
+        "isolation_level": "SERIALIZABLE",
+        "postgresql_deferrable": True,
+    }
+    # Hot standbys reject SERIALIZABLE
+    assert get_read_only_options(analytics=True, on_primary=False)["isolation_level"] == "REPEATABLE READ"
+
+
+def test_read_only_session_refuses_to_flush():
+    engine = create_engine("sqlite://")
+    NostromoProposal.__table__.create(engine)
+    with Session(engine) as session:
+        session.info["read_only"] = True
+        session.add(NostromoProposal(asset_id="a1", title="Proposal", description="x" * 50))
+        with pytest.raises(ReadOnlySessionError):
+            session.flush()
+
+
+@pytest.mark.parametrize("dependency", [get_current_user, get_optional_user])
+def test_authentication_reads_through_read_session(dependency):
+    session = inspect.signature(dependency).parameters["session"].default
+    assert session.dependency is get_read_session
@@ -0,0 +1,36 @@
+"""
+VeriAssets - Repository Lookup Tests
+"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from app.db.models import NostromoProposal, ProposalStatus
+from app.db.repository import add_votes, get_proposal_by_id
+
+
+async def test_prebuilt_lookup_binds_per_call(proposal_db):
+    first = await get_proposal_by_id(proposal_db, "p03")
+    second = await get_proposal_by_id(proposal_db, "p17")
+
+    assert (first.id, second.id) == ("p03", "p17")
+    assert await get_proposal_by_id(proposal_db, "missing") is None
+
+
+async def test_add_votes_only_counts_open_proposals(proposal_db):
+    now = datetime(2026, 2, 1, tzinfo=timezone.utc)
+    await proposal_db.execute(
+        update(NostromoProposal)
+        .where(NostromoProposal.id.in_(["p03", "p04"]))
+        .values(status=ProposalStatus.VOTING, votes_for=10, votes_against=2)
+    )
+    await proposal_db.execute(
+        update(NostromoProposal)
+        .where(NostromoProposal.id == "p04")
+        .values(voting_deadline=now - timedelta(hours=1))
+    )
+
+    assert await add_votes(proposal_db, "p03", True, 3, now=now) == (13, 2)
+    assert await add_votes(proposal_db, "p03", False, 5, now=now) == (13, 7)
+    assert await add_votes(proposal_db, "p04", True, 1, now=now) is None  # past its deadline
+    assert await add_votes(proposal_db, "p05", True, 1, now=now) is None  # still a draft
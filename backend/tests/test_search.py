@@ -0,0 +1,81 @@
+"""
+VeriAssets - Asset Search Tests
+"""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.db.models import RWAAsset
+from app.db.search import (
+    asset_metadata_filter,
+    asset_search_filter,
+    build_prefix_tsquery,
+    parse_metadata_filters,
+)
+
+
+def test_prefix_tsquery_from_free_text():
+    assert build_prefix_tsquery("Solar  far") == "solar:* & far:*"
+    assert build_prefix_tsquery("TKN12") == "tkn12:*"
+
+
+def test_prefix_tsquery_strips_operators():
+    assert build_prefix_tsquery("gold & !silver | (bond):*") == "gold:* & silver:* & bond:*"
+    assert build_prefix_tsquery("  &|!_ ") is None
+
+
+def _compile(search):
+    return select(RWAAsset.id).where(asset_search_filter(search)).compile(dialect=postgresql.dialect())
+
+
+def test_search_filter_uses_vector_and_trigram_columns():
+    compiled = _compile("carbon")
+    sql = str(compiled)
+    assert "rwa_assets.search_vector @@ to_tsquery(" in sql
+    assert "rwa_assets.name ILIKE" in sql
+    assert "description" not in sql
+    assert "carbon:*" in compiled.params.values()
+    assert "simple" in compiled.params.values()
+
+
+def test_short_search_uses_only_the_vector():
+    # Two letters make no trigram, so an ILIKE would scan the table
+    sql = str(_compile("qu"))
+    assert "rwa_assets.search_vector @@ to_tsquery(" in sql
+    assert "ILIKE" not in sql
+    assert asset_search_filter("  ?! ") is None
+
+
+def test_search_vector_is_not_loaded_with_assets():
+    sql = str(select(RWAAsset).compile(dialect=postgresql.dialect()))
+    assert "rwa_assets.name" in sql
+    assert "search_vector" not in sql
+
+
+def test_search_filter_escapes_like_wildcards():
+    assert "%50\\%\\_off%" in _compile("50%_off").params.values()
+
+
+def test_parse_metadata_filters_nests_dotted_keys():
+    assert parse_metadata_filters(["registry:Verra", "project.country:BR", "project.name:Rio: Phase 2"]) == {
+        "registry": "Verra",
+        "project": {"country": "BR", "name": "Rio: Phase 2"},
+    }
+
+
+@pytest.mark.parametrize("pairs", [["registry"], [":Verra"], ["project:x", "project.country:BR"]])
+def test_parse_metadata_filters_rejects_malformed(pairs):
+    with pytest.raises(ValueError):
+        parse_metadata_filters(pairs)
+
+
+def test_metadata_filter_is_jsonb_containment():
+    compiled = (
+        select(RWAAsset.id)
+        .where(asset_metadata_filter({"registry": "Verra", "vintage": "2021"}))
+        .compile(dialect=postgresql.dialect())
+    )
+    assert str(compiled).count("rwa_assets.asset_metadata @>") == 3
+    assert sorted(compiled.params.values(), key=str) == [
+        {"registry": "Verra"}, {"vintage": "2021"}, {"vintage": 2021},
+    ]
@@ -0,0 +1,132 @@
+"""
+VeriAssets - Settlement Worker Tests
+"""
+from datetime import datetime
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.models import RWAAsset, Trade, TradeStatus
+from app.services.qubic_rpc import QubicRPCError
+from app.services.settlement import SETTLEMENT_TICK_OFFSET, SettlementWorker, retry_delay
+
+NOW = datetime(2026, 10, 16, 12, 0, 0)
+
+
+def _fill(trade_id, user_id="u1", **kwargs):
+    return Trade(**{
+        "id": trade_id, "asset_id": "a1", "user_id": user_id, "trade_type": "buy", "order_id": "o1",
+        "status": TradeStatus.SETTLING, "quantity": 1, "price_per_unit": 10.0, "total_amount": 10.0,
+        "settlement_data": {"attempts": 0}, **kwargs,
+    })
+
+
+def _circulating(market_db, asset_id):
+    return market_db.session.execute(
+        select(RWAAsset.circulating_supply).where(RWAAsset.id == asset_id)
+    ).scalar_one()
+
+
+def test_submit_spreads_each_user_over_consecutive_ticks():
+    worker = SettlementWorker()
+    trades = [_fill("t1"), _fill("t2", user_id="u2"), _fill("t3")]
+    updates = worker._submit(trades, current_tick=1000, now=NOW)
+
+    first = 1000 + SETTLEMENT_TICK_OFFSET
+    assert [t.qubic_tick for t in trades] == [first, first, first + 1]
+    assert all(t.qubic_tx_hash and t.settlement_data["attempts"] == 1 for t in trades)
+    assert all(t.settle_after > NOW for t in trades)
+    assert [stage for _, stage, _ in updates] == ["submitted"] * 3
+
+
+async def test_confirm_splits_landed_missing_and_unknown():
+    class Node:
+        async def get_transaction_status(self, tx_id):
+            if tx_id == "landed":
+                return {"transactionStatus": {"txId": tx_id, "moneyFlew": True}}
+            if tx_id == "missing":
+                raise QubicRPCError("not found", status_code=404)
+            raise QubicRPCError("timeout", status_code=503)
+
+    worker = SettlementWorker()
+    trades = [
+        _fill(tx_id, qubic_tx_hash=tx_id, qubic_tick=tick)
+        for tx_id, tick in (("landed", 90), ("missing", 90), ("flaky", 90), ("waiting", 150))
+    ]
+    confirmed, missing = await worker._confirm(Node(), trades, current_tick=100, now=NOW)
+
+    assert [t.id for t in confirmed] == ["landed"]
+    assert [t.id for t, _ in missing] == ["missing"]
+    assert trades[2].qubic_tx_hash == "flaky" and trades[2].settle_after > NOW
+    assert trades[3].settle_after > NOW
+
+
+def test_retry_backs_off_then_fails():
+    worker = SettlementWorker()
+    trade = _fill("t1", qubic_tx_hash="tx", qubic_tick=90)
+    trade.settlement_data = {"attempts": 1}
+
+    _, stage, _ = worker._retry(trade, "not included", NOW)
+    assert stage == "retrying"
+    assert trade.qubic_tx_hash is None and trade.status == TradeStatus.SETTLING
+    assert (trade.settle_after - NOW).total_seconds() == retry_delay(1)
+
+    trade.settlement_data = {"attempts": settings.settlement_max_attempts}
+    _, stage, error = worker._retry(trade, "not included", NOW)
+    assert stage == "failed" and trade.status == TradeStatus.FAILED
+    assert trade.settlement_data["error"] == error
+
+
+async def test_only_issuer_sales_add_to_supply(market_db):
+    # u0 created a0: its sale to u1 issues units, u1's resale to u2 does not
+    trades = [
+        _fill("issue-buy", user_id="u1", asset_id="a0", quantity=5),
+        _fill("issue-sell", user_id="u0", asset_id="a0", trade_type="sell", quantity=5),
+        _fill("resale-buy", user_id="u2", asset_id="a0", quantity=3),
+        _fill("resale-sell", user_id="u1", asset_id="a0", trade_type="sell", quantity=3),
+    ]
+    assert await SettlementWorker()._add_supply(market_db, trades) == set()
+    assert _circulating(market_db, "a0") == 5
+
+
+async def test_supply_guard_fails_only_the_issuance_that_does_not_fit(market_db):
+    def issue(trade_id, quantity):
+        return _fill(trade_id, user_id="u0", asset_id="a0", trade_type="sell", quantity=quantity)
+
+    worker = SettlementWorker()
+    # a0 has a total supply of 1000
+    assert await worker._add_supply(market_db, [issue("i1", 900)]) == set()
+    assert _circulating(market_db, "a0") == 900
+
+    # 140 more doesn't fit as a batch; fill by fill, only the 50 would pass 1000
+    assert await worker._add_supply(market_db, [issue("i2", 60), issue("i3", 50), issue("i4", 30)]) == {"i3"}
+    assert _circulating(market_db, "a0") == 990
+
+
+def test_a_match_completes_only_once_both_fills_confirm():
+    worker = SettlementWorker()
+    buy = _fill("buy", match_id="m1", qubic_tx_hash="tx-buy", qubic_tick=90, settle_after=NOW)
+    sell = _fill("sell", user_id="u0", trade_type="sell", match_id="m1")
+    done = [_fill("done-buy", match_id="m2"), _fill("done-sell", trade_type="sell", match_id="m2")]
+
+    # The sell side was just resubmitted, so the confirmed buy waits for it
+    sell.settle_after = NOW.replace(minute=5)
+    settled, updates = worker._resolve([[buy, sell], done], confirmed=[buy, *done], missing=[], now=NOW)
+
+    assert settled == [done] and updates == []
+    assert buy.status == sell.status == TradeStatus.SETTLING
+    assert buy.settle_after == sell.settle_after == NOW.replace(minute=5)
+
+
+def test_a_fill_that_runs_out_of_attempts_fails_its_match():
+    worker = SettlementWorker()
+    buy = _fill("buy", match_id="m1")
+    sell = _fill("sell", user_id="u0", trade_type="sell", match_id="m1", qubic_tx_hash="tx", qubic_tick=90)
+    sell.settlement_data = {"attempts": settings.settlement_max_attempts}
+
+    settled, updates = worker._resolve([[buy, sell]], confirmed=[buy], missing=[(sell, "not included")], now=NOW)
+
+    assert settled == []
+    assert [(trade.id, stage) for trade, stage, _ in updates] == [("sell", "failed"), ("buy", "failed")]
+    assert buy.status == sell.status == TradeStatus.FAILED
+    assert buy.settlement_data["error"].startswith("The other side of the match failed")
@@ -0,0 +1,107 @@
+"""
+VeriAssets - Background Snapshot Tests
+"""
+import asyncio
+import contextlib
+
+from app.core.snapshot import Snapshot
+
+
+def counting_snapshot(max_age_seconds=60.0):
+    calls = []
+
+    async def loader(session):
+        calls.append(session)
+        await asyncio.sleep(0)
+        return len(calls)
+
+    snapshot = Snapshot("test", loader, refresh_seconds=0, max_age_seconds=max_age_seconds)
+
+    @contextlib.asynccontextmanager
+    async def session_maker():
+        yield "session"
+
+    snapshot.session_maker = session_maker
+    return snapshot, calls
+
+
+async def test_serves_held_value_until_stale():
+    snapshot, calls = counting_snapshot()
+
+    assert await snapshot.get() == 1
+    assert await snapshot.get() == 1
+    assert calls == ["session"]
+    assert snapshot.updated_at is not None
+
+    assert await snapshot.get(max_age_seconds=0) == 2  # past the bound: recomputed first
+
+
+async def test_concurrent_reads_share_one_load():
+    snapshot, calls = counting_snapshot()
+
+    values = await asyncio.gather(*(snapshot.get() for _ in range(10)))
+
+    assert values == [1] * 10
+    assert len(calls) == 1
+
+
+async def test_refresh_and_reset_force_a_recompute():
+    snapshot, calls = counting_snapshot()
+    await snapshot.get()
+
+    assert await snapshot.refresh() == 2
+    snapshot.reset()
+    assert snapshot.value is None
+    assert await snapshot.get() == 3
+
+
+async def test_invalidation_during_a_load_is_not_kept():
+    snapshot, calls = counting_snapshot()
+    loading = asyncio.ensure_future(snapshot.get())
+    await asyncio.sleep(0)  # loader started, then a write lands
+    snapshot.invalidate()
+
+    assert await loading == 1
+    assert snapshot.value is None
+    assert await snapshot.get() == 2
+
+
+def test_invalidate_on_commit_waits_for_the_commit():
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import Session
+
+    from app.core.snapshot import invalidate_on_commit
+
+    snapshot, _ = counting_snapshot()
+    with Session(create_engine("sqlite://")) as session:
+        snapshot.value = "held"
+        session.execute(text("SELECT 1"))
+        invalidate_on_commit(session, snapshot)
+        session.rollback()
+        assert snapshot.value == "held"
+
+        session.execute(text("SELECT 1"))
+        invalidate_on_commit(session, snapshot)
+        assert snapshot.value == "held"
+        session.commit()
+        assert snapshot.value is None
+
+
+async def test_write_invalidated_snapshot_reloads_from_the_primary(monkeypatch):
+    from app.core import snapshot as snapshot_module
+
+    opened = []
+
+    @contextlib.asynccontextmanager
+    async def open_read_session(**options):
+        opened.append(options)
+        yield "session"
+
+    monkeypatch.setattr(snapshot_module, "open_read_session", open_read_session)
+
+    async def loader(session):
+        return session
+
+    await Snapshot("replica", loader, max_age_seconds=60.0).get()
+    await Snapshot("primary", loader, max_age_seconds=60.0, on_primary=True).get()
+    assert opened == [{"analytics": True, "primary": False}, {"analytics": True, "primary": True}]
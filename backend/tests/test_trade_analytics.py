@@ -0,0 +1,92 @@
+"""
+VeriAssets - Trade Analytics Engine Tests
+"""
+import math
+from datetime import datetime
+
+import numpy as np
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.trade_analytics import TradeArrays, compute_metrics, load_trade_arrays, trade_arrays_query
+
+WINDOW = (datetime(2026, 10, 1), datetime(2026, 10, 2))
+
+
+def arrays(rows):
+    """TradeArrays from (asset_id, price, quantity) rows already grouped by asset."""
+    assets = list(dict.fromkeys(asset for asset, _, _ in rows))
+    return TradeArrays(
+        assets=assets,
+        codes=np.array([assets.index(asset) for asset, _, _ in rows], dtype=np.int32),
+        timestamps=np.arange(len(rows), dtype=np.float64) + 1_800_000_000,
+        prices=np.array([price for _, price, _ in rows], dtype=np.float64),
+        quantities=np.array([quantity for _, _, quantity in rows], dtype=np.float64),
+    )
+
+
+def test_vwap_volume_and_turnover():
+    metrics, = compute_metrics(arrays([("a", 10.0, 1), ("a", 20.0, 3)]), {"a": 40})
+
+    assert (metrics.trade_count, metrics.volume, metrics.notional) == (2, 4.0, 70.0)
+    assert metrics.vwap == pytest.approx(17.5)
+    assert metrics.turnover == pytest.approx(0.1)
+    assert metrics.first_trade_at < metrics.last_trade_at
+
+
+def test_volatility_and_drawdown_stay_within_each_asset():
+    a, b = compute_metrics(arrays([
+        ("a", 100.0, 1), ("a", 120.0, 1), ("a", 90.0, 1), ("a", 110.0, 1),
+        ("b", 1.0, 1), ("b", 1.0, 1),
+    ]))
+
+    expected = math.sqrt(math.log(1.2) ** 2 + math.log(0.75) ** 2 + math.log(110 / 90) ** 2)
+    assert a.realized_volatility == pytest.approx(expected)
+    assert a.max_drawdown == pytest.approx(0.25)  # 120 -> 90
+    # b starts far below a's high and never moves: no return or drawdown leaks in
+    assert (b.realized_volatility, b.max_drawdown) == (0.0, 0.0)
+
+
+def test_no_trades_no_metrics():
+    assert compute_metrics(arrays([])) == []
+
+
+def test_loads_buy_side_grouped_by_asset():
+    sql = str(trade_arrays_query(["a"], *WINDOW).compile(dialect=postgresql.dialect()))
+
+    assert "EXTRACT(epoch FROM trades.settled_at)" in sql
+    assert "trades.order_id IS NULL OR trades.trade_type = " in sql
+    assert sql.endswith("ORDER BY trades.asset_id, trades.settled_at, trades.id")
+
+
+class _Result:
+    def __init__(self, partitions):
+        self._partitions = partitions
+
+    async def partitions(self):
+        for rows in self._partitions:
+            yield rows
+
+
+class _Session:
+    def __init__(self, partitions):
+        self.partitions = partitions
+
+    async def stream(self, query):
+        return _Result(self.partitions)
+
+
+async def test_load_keeps_an_asset_together_across_batches():
+    session = _Session([
+        [("a", 1.0, 10.0, 1), ("b", 2.0, 20.0, 2)],
+        [("b", 3.0, 21.0, 1), ("c", 4.0, 30.0, 5)],
+    ])
+    trades = await load_trade_arrays(session, None, *WINDOW)
+
+    assert trades.assets == ["a", "b", "c"]
+    assert trades.codes.tolist() == [0, 1, 1, 2]
+    assert trades.starts.tolist() == [0, 1, 3]
+    assert trades.prices.tolist() == [10.0, 20.0, 21.0, 30.0]
+
+    empty = await load_trade_arrays(_Session([]), None, *WINDOW)
+    assert empty.assets == [] and len(empty.prices) == 0
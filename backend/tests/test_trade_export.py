@@ -0,0 +1,78 @@
+"""
+VeriAssets - Trade Export Tests
+"""
+from datetime import datetime
+import csv
+import io
+import json
+
+from sqlalchemy.dialects import postgresql
+
+from app.db.models import TradeStatus
+from app.services.trade_export import EXPORT_FIELDS, build_export_query, format_csv, format_ndjson, stream_export
+
+ROW = (
+    "t-1", datetime(2026, 10, 1, 12, 30), None, "a-1", "buy", TradeStatus.COMPLETED,
+    10, 10, 2.5, 25.0, 0.075, 0.075, "o-1", 'tx,"quoted"', 42,
+)
+
+
+def test_csv_quotes_cells_and_blanks_nulls():
+    text = format_csv([ROW], header=True)
+    header, row = list(csv.reader(io.StringIO(text)))
+
+    assert header == EXPORT_FIELDS
+    record = dict(zip(header, row))
+    assert record["created_at"] == "2026-10-01T12:30:00Z"
+    assert record["settled_at"] == ""
+    assert record["status"] == "completed"
+    assert record["qubic_tx_hash"] == 'tx,"quoted"'
+
+
+def test_ndjson_one_object_per_line():
+    lines = format_ndjson([ROW, ROW]).splitlines()
+
+    assert len(lines) == 2
+    record = json.loads(lines[0])
+    assert record["settled_at"] is None
+    assert record["quantity"] == 10
+    assert record["status"] == "completed"
+
+
+def test_export_query_walks_the_user_index_in_order():
+    query = build_export_query("u-1", asset_id="a-1", start=datetime(2026, 1, 1), end=datetime(2026, 2, 1))
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert "trades.created_at >= " in sql and "trades.created_at < " in sql
+    assert sql.endswith("ORDER BY trades.created_at, trades.id")
+
+
+class _Result:
+    def __init__(self, partitions):
+        self._partitions = partitions
+
+    async def partitions(self):
+        for rows in self._partitions:
+            yield rows
+
+
+class _Session:
+    def __init__(self, partitions):
+        self.partitions = partitions
+        self.yield_per = None
+
+    async def stream(self, query):
+        self.yield_per = query.get_execution_options()["yield_per"]
+        return _Result(self.partitions)
+
+
+async def test_stream_export_writes_header_once_per_export():
+    session = _Session([[ROW, ROW], [ROW]])
+    chunks = [chunk async for chunk in stream_export(session, build_export_query("u-1"), "csv", batch_size=2)]
+
+    assert session.yield_per == 2
+    assert len(chunks) == 2
+    assert chunks[0].startswith("id,created_at,") and not chunks[1].startswith("id,")
+
+    empty = [chunk async for chunk in stream_export(_Session([]), build_export_query("u-1"), "csv")]
+    assert empty == [",".join(EXPORT_FIELDS) + "\r\n"]
@@ -0,0 +1,58 @@
+"""
+VeriAssets - Asset Volume Bucket Tests
+"""
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.db.models import AssetVolumeBucket
+from app.services.volume_buckets import fold_fills, ranking_query, window_start
+
+
+def fill(trade_id, settled_at, price, order_id="o1", trade_type="buy", asset_id="a"):
+    return SimpleNamespace(
+        id=trade_id, asset_id=asset_id, order_id=order_id, trade_type=trade_type,
+        price_per_unit=price, total_amount=price * 2, settled_at=settled_at, created_at=settled_at,
+    )
+
+
+def test_fold_counts_each_match_once_per_hour():
+    hour = datetime(2026, 10, 16, 9)
+    buckets = fold_fills([
+        fill("t2", hour + timedelta(minutes=40), 12.0),
+        fill("t1", hour + timedelta(minutes=5), 10.0),
+        fill("t1-sell", hour + timedelta(minutes=5), 10.0, trade_type="sell"),
+        fill("legacy", hour + timedelta(minutes=50), 11.0, order_id=None, trade_type="sell"),
+        fill("t3", hour + timedelta(hours=1), 13.0),
+    ])
+
+    first = buckets[("a", hour)]
+    assert (first.volume, first.trade_count) == (66.0, 3)
+    assert (first.open_price, first.close_price) == (10.0, 11.0)
+    assert buckets[("a", hour + timedelta(hours=1))].trade_count == 1
+
+
+def test_window_includes_the_current_hour():
+    now = datetime(2026, 10, 16, 9, 30)
+    assert window_start("24h", now) == datetime(2026, 10, 15, 10)
+    with pytest.raises(ValueError):
+        ranking_query("24h", "losers")
+
+
+async def test_rankings_sum_only_the_window(market_db):
+    now = datetime.now(timezone.utc)
+    # An old burst for a5: outside 24h, inside 7d, and the start of its price rise
+    market_db.session.add(AssetVolumeBucket(
+        asset_id="a5", bucket_start=now.replace(minute=0, second=0, microsecond=0) - timedelta(days=3),
+        volume=1000.0, trade_count=1, open_price=5.0, close_price=5.0, updated_at=now,
+    ))
+    market_db.session.flush()
+
+    day = (await market_db.execute(ranking_query("24h", "volume", limit=3, now=now))).all()
+    week = (await market_db.execute(ranking_query("7d", "volume", limit=3, now=now))).all()
+    gainers = (await market_db.execute(ranking_query("7d", "gainers", limit=1, now=now))).all()
+
+    assert [(asset.id, volume) for asset, volume, _, _ in day] == [("a0", 50.0), ("a1", 50.0), ("a2", 50.0)]
+    assert [(asset.id, volume) for asset, volume, _, _ in week][0] == ("a5", 1050.0)
+    assert gainers[0][0].id == "a5" and gainers[0][3] == pytest.approx(100.0)